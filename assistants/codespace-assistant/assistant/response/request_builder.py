@@ -17,6 +17,7 @@ from openai.types.chat import (
 )
 from openai_client import (
     OpenAIRequestConfig,
+    num_tokens_for_message_batch,
     num_tokens_from_messages,
     num_tokens_from_tools_and_messages,
 )
@@ -136,6 +137,9 @@ async def build_request(
         token_budget=message_history_token_budget,
         token_counter=lambda messages: num_tokens_from_messages(messages=messages, model=request_config.model),
         message_provider=history_message_provider,
+        batch_token_counter=lambda messages: num_tokens_for_message_batch(
+            messages=messages, model=request_config.model
+        ),
     )
 
     # Add history messages
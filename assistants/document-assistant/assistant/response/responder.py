@@ -44,6 +44,7 @@ from openai.types.chat import (
 from openai_client import (
     create_client,
     num_tokens_from_message,
+    num_tokens_for_message_batch,
     num_tokens_from_messages,
     num_tokens_from_tools,
 )
@@ -424,6 +425,7 @@ class ConversationResponder:
             token_budget=message_history_token_budget,
             token_counter=lambda messages: num_tokens_from_messages(messages=messages, model="gpt-4o"),
             message_provider=message_provider,
+            batch_token_counter=lambda messages: num_tokens_for_message_batch(messages=messages, model="gpt-4o"),
         )
         chat_history: list[ChatCompletionMessageParam] = list(budgeted_messages_result.messages)
         chat_history.insert(0, main_system_prompt)
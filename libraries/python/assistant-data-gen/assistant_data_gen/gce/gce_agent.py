@@ -18,6 +18,7 @@ from chat_context_toolkit.history.tool_abbreviations import (
 )
 from liquid import render
 from openai_client import (
+    num_tokens_for_message_batch,
     num_tokens_from_messages,
 )
 from pydantic import BaseModel, Field
@@ -252,6 +253,7 @@ async def process_message_history_with_budget(
         token_budget=token_budget,
         token_counter=lambda messages: num_tokens_from_messages(messages=messages, model="gpt-4o"),
         message_provider=message_provider,
+        batch_token_counter=lambda messages: num_tokens_for_message_batch(messages=messages, model="gpt-4o"),
     )
     return convert_openai_to_pydantic_ai(budget_result.messages)
 
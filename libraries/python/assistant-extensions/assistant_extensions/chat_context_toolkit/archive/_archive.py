@@ -4,7 +4,8 @@ from chat_context_toolkit.archive import ArchiveReader, ArchiveTaskConfig, Archi
 from chat_context_toolkit.archive import MessageProvider as ArchiveMessageProvider
 from chat_context_toolkit.archive.summarization import LLMArchiveSummarizer, LLMArchiveSummarizerConfig
 from openai_client import OpenAIRequestConfig, ServiceConfig, create_client
-from openai_client.tokens import num_tokens_from_messages
+from openai.types.chat import ChatCompletionMessageParam
+from openai_client.tokens import TokenCountCache, num_tokens_for_message_batch, num_tokens_from_messages
 from semantic_workbench_assistant.assistant_app import ConversationContext, storage_directory_for_context
 
 from assistant_extensions.attachments._model import Attachment
@@ -71,6 +72,7 @@ def _archive_task_queue_for(
     context: ConversationContext,
     attachments: list[Attachment],
     archive_summarizer: LLMArchiveSummarizer,
+    token_count_cache: TokenCountCache,
     archive_task_config: ArchiveTaskConfig = ArchiveTaskConfig(),
     token_counting_model: str = "gpt-4o",
     archive_storage_sub_directory: str = "archives",
@@ -78,15 +80,24 @@ def _archive_task_queue_for(
     """
     Create an archive task queue for the conversation context.
     """
+    storage_provider = ArchiveStorageProvider(context=context, sub_directory=archive_storage_sub_directory)
+
+    def token_counter(messages: list[ChatCompletionMessageParam]) -> int:
+        return num_tokens_from_messages(messages=messages, model=token_counting_model, cache=token_count_cache)
+
+    def batch_token_counter(messages: list[ChatCompletionMessageParam]) -> list[int]:
+        return num_tokens_for_message_batch(messages=messages, model=token_counting_model, cache=token_count_cache)
+
     return ArchiveTaskQueue(
-        storage_provider=ArchiveStorageProvider(context=context, sub_directory=archive_storage_sub_directory),
+        storage_provider=storage_provider,
         message_provider=archive_message_provider_for(
             context=context,
             attachments=attachments,
         ),
-        token_counter=lambda messages: num_tokens_from_messages(messages=messages, model=token_counting_model),
+        token_counter=token_counter,
         summarizer=archive_summarizer,
         config=archive_task_config,
+        batch_token_counter=batch_token_counter,
     )
 
 
@@ -97,6 +108,7 @@ class ArchiveTaskQueues:
 
     def __init__(self) -> None:
         self._queues: dict[str, ArchiveTaskQueue] = {}
+        self._token_count_caches: dict[str, TokenCountCache] = {}
 
     async def enqueue_run(
         self,
@@ -108,12 +120,20 @@ class ArchiveTaskQueues:
         """Get the archive task queue for the given context, creating it if it does not exist."""
         context_id = context.id
         if context_id not in self._queues:
+            # token counts are persisted per conversation, so that messages are not re-encoded after a restart
+            self._token_count_caches[context_id] = TokenCountCache(
+                path=storage_directory_for_context(context) / "token_counts.json"
+            )
             self._queues[context_id] = _archive_task_queue_for(
                 context=context,
                 attachments=attachments,
                 archive_summarizer=archive_summarizer,
+                token_count_cache=self._token_count_caches[context_id],
                 archive_task_config=archive_task_config,
             )
+
+        # saves the counts from the previous runs
+        self._token_count_caches[context_id].save()
         await self._queues[context_id].enqueue_run()
 
 
@@ -182,58 +182,36 @@ async def _get_history_manager_messages(
 
     history: list[HistoryMessageWithAbbreviation] = []
 
-    batch_size = 100
-    before_message_id = None
-
-    # each call to get_messages will return a maximum of `batch_size` messages
-    # so we need to loop until all messages are retrieved
-    while True:
-        # get the next batch of messages, including chat and tool result messages
-        messages_response = await context.get_messages(
-            limit=batch_size,
-            before=before_message_id,
+    # get all the messages, oldest first, including chat and tool result messages, in a single request.
+    # the messages are read in full before formatting, so that the request is not held open while formatting.
+    messages = [
+        message
+        async for message in context.iter_messages(
             message_types=[MessageType.chat, MessageType.note],
             after=uuid.UUID(after_id) if after_id else None,
         )
-        messages_list = messages_response.messages
+    ]
 
-        if not messages_list:
-            # if there are no more messages, we are done
-            break
-
-        # set the before_message_id for the next batch of messages
-        before_message_id = messages_list[0].id
-
-        batch: list[HistoryMessageWithAbbreviation] = []
-        for message in messages_list:
-            # format the message
-            formatted_message = await conversation_message_to_chat_message_param(
-                context, message, participants, attachments=attachments
-            )
+    for message in messages:
+        # format the message
+        formatted_message = await conversation_message_to_chat_message_param(
+            context, message, participants, attachments=attachments
+        )
 
-            if not formatted_message:
-                # if the message could not be formatted, skip it
-                logger.warning("message %s could not be formatted, skipping.", message.id)
-                continue
-
-            # prepend the formatted messages to the history list
-            batch.append(
-                HistoryMessageWithAbbreviation(
-                    id=str(message.id),
-                    openai_message=formatted_message,
-                    tool_abbreviations=tool_abbreviations,
-                    tool_name_for_tool_message=tool_name_for_tool_message(message),
-                    timestamp=message.timestamp,
-                )
+        if not formatted_message:
+            # if the message could not be formatted, skip it
+            logger.warning("message %s could not be formatted, skipping.", message.id)
+            continue
+
+        history.append(
+            HistoryMessageWithAbbreviation(
+                id=str(message.id),
+                openai_message=formatted_message,
+                tool_abbreviations=tool_abbreviations,
+                tool_name_for_tool_message=tool_name_for_tool_message(message),
+                timestamp=message.timestamp,
             )
-
-        # add the formatted messages to the history
-        history = batch + history
-
-        if len(messages_list) < batch_size:
-            # if we received less than `batch_size` messages, we have reached the end of the conversation.
-            # exit early to avoid another unnecessary message query.
-            break
+        )
 
     # return the formatted messages
     return history
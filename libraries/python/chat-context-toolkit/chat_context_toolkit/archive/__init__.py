@@ -7,6 +7,7 @@ from ._types import (
     ArchiveManifest,
     ArchivesState,
     ArchiveTaskConfig,
+    BatchTokenCounter,
     MessageProtocol,
     MessageProvider,
     StorageProvider,
@@ -21,6 +22,7 @@ __all__ = [
     "ArchiveManifest",
     "ArchivesState",
     "ArchiveTaskConfig",
+    "BatchTokenCounter",
     "MessageProvider",
     "MessageProtocol",
     "StorageProvider",
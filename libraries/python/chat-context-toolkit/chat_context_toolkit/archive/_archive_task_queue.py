@@ -7,6 +7,7 @@ from ._types import (
     ArchiveContent,
     ArchiveManifest,
     ArchiveTaskConfig,
+    BatchTokenCounter,
     MessageProtocol,
     MessageProvider,
     StorageProvider,
@@ -33,11 +34,13 @@ class ArchiveTaskQueue:
         token_counter: TokenCounter,
         summarizer: Summarizer,
         config: ArchiveTaskConfig = ArchiveTaskConfig(),
+        batch_token_counter: BatchTokenCounter | None = None,
     ) -> None:
         self._state_storage = StateStorage(storage_provider)
         self._message_provider = message_provider
         self._storage_provider = storage_provider
         self._token_counter = token_counter
+        self._batch_token_counter = batch_token_counter
         self._summarizer = summarizer
         self._queue = asyncio.Queue[None]()
         self._task = asyncio.create_task(self._run_for_every_queue_item())
@@ -59,34 +62,84 @@ class ArchiveTaskQueue:
     async def _run(self) -> None:
         """
         The main job logic for archiving messages.
-        It retrieves messages from the message provider, looking for chunks of messages that exceed the token
-        count threshold, and archives them.
+        It retrieves the messages after those already counted, adding their token counts to the running total of the
+        pending chunk, and archives every chunk that reaches the token count threshold.
         """
 
         config = self._config
         state = await self._state_storage.read_state()
-        messages = await self._message_provider(after_id=state.most_recent_archived_message_id)
+        messages = await self._message_provider(
+            after_id=state.most_recent_counted_message_id or state.most_recent_archived_message_id
+        )
 
-        logger.info("running archive job; message count: %d", len(messages))
+        logger.info(
+            "running archive job; message count: %d, pending token count: %d",
+            len(messages),
+            state.pending_token_count,
+        )
 
+        if not messages:
+            return
+
+        if (
+            state.most_recent_counted_message_timestamp is not None
+            and messages[0].timestamp < state.most_recent_counted_message_timestamp
+        ):
+            # the most recent counted message no longer exists, and the provider returned messages before it
+            await self._recount_from_most_recent_archive(state.most_recent_counted_message_id)
+            return
+
+        if self._batch_token_counter is not None:
+            token_counts = self._batch_token_counter([message.openai_message for message in messages])
+        else:
+            token_counts = [self._token_counter([message.openai_message]) for message in messages]
+
+        chunks: list[list[MessageProtocol]] = []
         start_index = 0
+        pending_token_count = state.pending_token_count
+
+        for index, token_count in enumerate(token_counts):
+            pending_token_count += token_count
+
+            if pending_token_count < config.chunk_token_count_threshold:
+                continue
+
+            chunks.append(list(messages[start_index : index + 1]))
+            start_index = index + 1
+            pending_token_count = 0
+
+        if chunks and state.most_recent_counted_message_id is not None:
+            # the first chunk starts with the messages counted by earlier runs
+            pending_messages = await self._pending_messages(
+                state.most_recent_archived_message_id, state.most_recent_counted_message_id
+            )
+            if pending_messages is None:
+                await self._recount_from_most_recent_archive(state.most_recent_counted_message_id)
+                return
+
+            chunks[0] = pending_messages + chunks[0]
+
+        semaphore = asyncio.Semaphore(config.max_concurrent_summaries)
+
+        async def summarize(chunk: Sequence[MessageProtocol]) -> str:
+            async with semaphore:
+                return await self._summarizer.summarize([message.openai_message for message in chunk])
 
-        token_counts = [self._token_counter([message.openai_message]) for message in messages]
+        summaries = await asyncio.gather(*(summarize(chunk) for chunk in chunks), return_exceptions=True)
 
         archive_count = 0
         archived_message_count = 0
 
-        for index in range(len(messages)):
-            token_count = sum(token_counts[start_index : index + 1])
+        # chunks are archived in order, so that the state never skips past a chunk that failed to summarize
+        for chunk, summary in zip(chunks, summaries):
+            if isinstance(summary, BaseException):
+                # the state is left at the most recent archived chunk, so the remaining messages are counted again on
+                # the next run
+                raise summary
 
-            if token_count < config.chunk_token_count_threshold:
-                continue
-
-            chunk = messages[start_index : index + 1]
-            manifest = await self._archive_chunk(chunk)
+            manifest = await self._archive_chunk(chunk, summary)
             archive_count += 1
             archived_message_count += len(chunk)
-            start_index = index + 1
             logger.info(
                 "archived chunk; filename: %s, message count: %d, total archived: %d",
                 manifest.filename,
@@ -94,22 +147,60 @@ class ArchiveTaskQueue:
                 archived_message_count,
             )
 
+        async with self._state_storage.update_state() as state:
+            most_recent_counted_message = messages[-1] if start_index < len(messages) else None
+            state.most_recent_counted_message_id = (
+                most_recent_counted_message.id if most_recent_counted_message else None
+            )
+            state.most_recent_counted_message_timestamp = (
+                most_recent_counted_message.timestamp if most_recent_counted_message else None
+            )
+            state.pending_token_count = pending_token_count
+
         logger.info(
-            "archive job completed; archive count: %d, archived message count: %d",
+            "archive job completed; archive count: %d, archived message count: %d, pending token count: %d",
             archive_count,
             archived_message_count,
+            pending_token_count,
         )
 
-    async def _archive_chunk(self, messages: Sequence[MessageProtocol]) -> ArchiveManifest:
+    async def _recount_from_most_recent_archive(self, most_recent_counted_message_id: str | None) -> None:
+        """
+        Clears the pending chunk, when the most recent counted message is no longer provided, and runs again, counting
+        the messages after the most recent archived message.
+        """
+        logger.warning(
+            "most recent counted message not found, recounting from most recent archived message; message id: %s",
+            most_recent_counted_message_id,
+        )
+        async with self._state_storage.update_state() as state:
+            state.most_recent_counted_message_id = None
+            state.most_recent_counted_message_timestamp = None
+            state.pending_token_count = 0
+        await self._run()
+
+    async def _pending_messages(
+        self, most_recent_archived_message_id: str | None, most_recent_counted_message_id: str
+    ) -> list[MessageProtocol] | None:
+        """
+        Retrieves the messages counted towards the pending chunk by earlier runs, or None if the most recent counted
+        message is no longer provided.
+        """
+        messages = await self._message_provider(after_id=most_recent_archived_message_id)
+        for index, message in enumerate(messages):
+            if message.id == most_recent_counted_message_id:
+                return list(messages[: index + 1])
+        return None
+
+    async def _archive_chunk(self, messages: Sequence[MessageProtocol], summary: str) -> ArchiveManifest:
         """
-        Archives the provided messages, creating a manifest and content file.
+        Archives the provided messages, creating a manifest and content file, and advances the most recent archived
+        message in the state, leaving no messages pending.
 
         Args:
             messages (list[MessageProtocol]): The messages to archive.
+            summary (str): The summary of the messages.
         """
-        # Here you would implement the logic to archive the messages,
-        # such as writing them to a file or database.
-        # For now, we will just log the number of messages archived.
         logger.info("Archiving %d messages.", len(messages))
 
         if not messages:
@@ -126,7 +217,6 @@ class ArchiveTaskQueue:
         await self._storage_provider.write_text_file(CONTENT_SUB_DIR_PATH / filename, content_json)
         filesize = len(content_json.encode("utf-8"))
 
-        summary = await self._summarizer.summarize([msg.openai_message for msg in messages])
         manifest = ArchiveManifest(
             summary=summary,
             message_ids=[msg.id for msg in messages],
@@ -141,5 +231,8 @@ class ArchiveTaskQueue:
         most_recent_message = messages[-1]
         async with self._state_storage.update_state() as state:
             state.most_recent_archived_message_id = most_recent_message.id
+            state.most_recent_counted_message_id = None
+            state.most_recent_counted_message_timestamp = None
+            state.pending_token_count = 0
 
         return manifest
@@ -3,7 +3,7 @@ import logging
 import pathlib
 from typing import Protocol, Sequence
 
-from attr import dataclass
+from attr import dataclass, field, validators
 from openai.types.chat import (
     ChatCompletionMessageParam,
 )
@@ -28,10 +28,20 @@ class TokenCounter(Protocol):
         ...
 
 
+class BatchTokenCounter(Protocol):
+    def __call__(self, messages: list[ChatCompletionMessageParam]) -> list[int]:
+        """
+        Returns the token count of each of the given OpenAI messages, counting them as a batch.
+        """
+        ...
+
+
 @dataclass
 class ArchiveTaskConfig:
     chunk_token_count_threshold: int = 30_000
     """Token count threshold for archiving chunks."""
+    max_concurrent_summaries: int = field(default=4, validator=validators.ge(1))
+    """Maximum number of chunks summarized concurrently, when a run finds more than one chunk to archive."""
 
 
 class MessageProtocol(Protocol):
@@ -113,6 +123,18 @@ class ArchivesState(BaseModel):
 
     most_recent_archived_message_id: str | None = None
     """The ID of the most recent archived message."""
+    most_recent_counted_message_id: str | None = None
+    """
+    The ID of the most recent message counted towards the pending chunk, which has not yet reached the threshold.
+    None when no messages are pending.
+    """
+    most_recent_counted_message_timestamp: datetime.datetime | None = None
+    """
+    The timestamp of the most recent counted message, for detecting a message provider that returns earlier messages
+    when the most recent counted message no longer exists.
+    """
+    pending_token_count: int = 0
+    """The token count of the messages after the most recent archived message, up to the most recent counted one."""
 
 
 class ArchiveManifest(BaseModel):
@@ -2,6 +2,7 @@
 
 from ._history import apply_budget_to_history_messages
 from ._types import (
+    BatchTokenCounter,
     HistoryMessage,
     HistoryMessageProtocol,
     HistoryMessageProvider,
@@ -13,6 +14,7 @@ from ._types import (
 
 __all__ = [
     "apply_budget_to_history_messages",
+    "BatchTokenCounter",
     "HistoryMessageProtocol",
     "HistoryMessage",
     "HistoryMessageProvider",
@@ -37,6 +37,9 @@ def abbreviate_messages(
         budget_decisions=result_decisions,
     )
 
+    # the token count is kept up to date as decisions change, rather than recounted for every message
+    current_token_count = initial_token_count
+
     # iterate the messages from oldest to newest, abbreviating until we are within the token budget
     for message_index, message in enumerate(messages):
         if message_index >= before_index:
@@ -47,10 +50,6 @@ def abbreviate_messages(
             # this message has already been omitted, skip it
             continue
 
-        current_token_count = token_count_with_budget_applied(
-            messages=messages, token_counts=token_counts, budget_decisions=result_decisions
-        )
-
         if current_token_count <= token_budget:
             # we've gone under the token budget. we're done.
             break
@@ -58,6 +57,12 @@ def abbreviate_messages(
         abbreviated_message = message.abbreviated_openai_message
         if abbreviated_message is None:
             # message provider has chosen to omit this message
+            current_token_count -= message_token_count_with_budget_applied(
+                message=message,
+                message_index=message_index,
+                token_counts=token_counts,
+                budget_decision=result_decisions[message_index],
+            )
             result_decisions[message_index] = BudgetDecision.omitted
             continue
 
@@ -69,14 +74,10 @@ def abbreviate_messages(
 
         if result_decisions[message_index] == BudgetDecision.original:
             result_decisions[message_index] = BudgetDecision.abbreviated
+            current_token_count += abbreviated_message_token_count - full_message_token_count
 
-    resulting_token_count = token_count_with_budget_applied(
-        messages=messages,
-        token_counts=token_counts,
-        budget_decisions=result_decisions,
-    )
     logger.info(
-        "abbreviated %d messages from %d tokens to %d tokens", len(messages), initial_token_count, resulting_token_count
+        "abbreviated %d messages from %d tokens to %d tokens", len(messages), initial_token_count, current_token_count
     )
 
     return result_decisions
@@ -99,26 +100,25 @@ def truncate_messages(token_budget: int, message_collection: MessageCollection)
         budget_decisions=result_decisions,
     )
 
-    # iterate the messages from oldest to newest, truncating until we are within the token budget
+    # iterate the messages from oldest to newest, truncating until we are within the token budget, keeping the
+    # token count up to date as messages are omitted, rather than recounting it for every message
+    resulting_token_count = initial_token_count
     current_token_count = 0
-    for message_index in range(len(messages)):
-        current_token_count = token_count_with_budget_applied(
-            messages=messages,
-            token_counts=token_counts,
-            budget_decisions=result_decisions,
-        )
+    for message_index, message in enumerate(messages):
+        current_token_count = resulting_token_count
 
         if current_token_count <= token_budget:
             # we've gone under the token budget. we're done.
             break
 
+        resulting_token_count -= message_token_count_with_budget_applied(
+            message=message,
+            message_index=message_index,
+            token_counts=token_counts,
+            budget_decision=result_decisions[message_index],
+        )
         result_decisions[message_index] = BudgetDecision.omitted
 
-    resulting_token_count = token_count_with_budget_applied(
-        messages=messages,
-        token_counts=token_counts,
-        budget_decisions=result_decisions,
-    )
     logger.info(
         "truncated %d messages from %d tokens to %d tokens", len(messages), initial_token_count, resulting_token_count
     )
@@ -141,24 +141,40 @@ def token_count_with_budget_applied(
     Counts the tokens in the messages, applying the budget decisions to determine the effective token count.
     """
 
-    token_count = 0
-    for message_index, (message, decision) in enumerate(zip(messages, budget_decisions)):
-        match decision:
-            case BudgetDecision.omitted:
-                # message is omitted, do not include it in the count
-                continue
-            case BudgetDecision.abbreviated:
-                # message is abbreviated, use the abbreviated token count
-                if message.abbreviated_openai_message is None:
-                    # if the abbreviated message is None, it means the message was omitted
-                    continue
-                # use the abbreviated token count
-                token_count += token_counts.abbreviated_openai_message_token_counts[message_index]
-            case BudgetDecision.original:
-                # message is original, use the full token count
-                token_count += token_counts.openai_message_token_counts[message_index]
+    return sum(
+        message_token_count_with_budget_applied(
+            message=message,
+            message_index=message_index,
+            token_counts=token_counts,
+            budget_decision=decision,
+        )
+        for message_index, (message, decision) in enumerate(zip(messages, budget_decisions))
+    )
 
-    return token_count
+
+def message_token_count_with_budget_applied(
+    message: HistoryMessageProtocol,
+    message_index: int,
+    token_counts: TokenCounts,
+    budget_decision: BudgetDecision,
+) -> int:
+    """
+    Counts the tokens in a single message, applying its budget decision.
+    """
+    match budget_decision:
+        case BudgetDecision.omitted:
+            # message is omitted, do not include it in the count
+            return 0
+        case BudgetDecision.abbreviated:
+            # message is abbreviated, use the abbreviated token count
+            if message.abbreviated_openai_message is None:
+                # if the abbreviated message is None, it means the message was omitted
+                return 0
+            # use the abbreviated token count
+            return token_counts.abbreviated_openai_message_token_counts[message_index]
+        case BudgetDecision.original:
+            # message is original, use the full token count
+            return token_counts.openai_message_token_counts[message_index]
 
 
 def apply_budget_decisions(
@@ -4,34 +4,51 @@ from functools import wraps
 from inspect import iscoroutinefunction
 from time import perf_counter
 
+from openai_client.tokens import TokenCountCacheMetrics, token_count_cache_metrics
+
 timing_logger = logging.getLogger("history.timing")
 
 
+def _log_timing(name: str, duration: float, start_metrics: TokenCountCacheMetrics) -> None:
+    end_metrics = token_count_cache_metrics()
+    hit_count = end_metrics.hit_count - start_metrics.hit_count
+    miss_count = end_metrics.miss_count - start_metrics.miss_count
+    if hit_count + miss_count == 0:
+        timing_logger.info("function timing; name: %s, duration: %s", name, datetime.timedelta(seconds=duration))
+        return
+
+    # the counts include any token counting done concurrently, such as by other conversations
+    timing_logger.info(
+        "function timing; name: %s, duration: %s, token count cache hits: %d, misses: %d, hit rate: %.1f%%",
+        name,
+        datetime.timedelta(seconds=duration),
+        hit_count,
+        miss_count,
+        hit_count / (hit_count + miss_count) * 100,
+    )
+
+
 def log_timing(func):
     if iscoroutinefunction(func):
         # If the function is a coroutine, we need to use an async wrapper
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
+            start_metrics = token_count_cache_metrics()
             start_time = perf_counter()
             result = await func(*args, **kwargs)
             end_time = perf_counter()
-            timing_logger.info(
-                "function timing; name: %s, duration: %s",
-                func.__name__,
-                datetime.timedelta(seconds=end_time - start_time),
-            )
+            _log_timing(func.__name__, end_time - start_time, start_metrics)
             return result
 
         return async_wrapper
 
     @wraps(func)
     def wrapper(*args, **kwargs):
+        start_metrics = token_count_cache_metrics()
         start_time = perf_counter()
         result = func(*args, **kwargs)
         end_time = perf_counter()
-        timing_logger.info(
-            "function timing; name: %s, duration: %s", func.__name__, datetime.timedelta(seconds=end_time - start_time)
-        )
+        _log_timing(func.__name__, end_time - start_time, start_metrics)
         return result
 
     return wrapper
@@ -4,6 +4,7 @@ from . import _budget as budget
 from . import _prioritize as prioritize
 from ._decorators import log_timing
 from ._types import (
+    BatchTokenCounter,
     BudgetDecision,
     HistoryMessageProtocol,
     HistoryMessageProvider,
@@ -23,10 +24,14 @@ async def apply_budget_to_history_messages(
     token_budget: int,
     token_counter: TokenCounter,
     message_provider: HistoryMessageProvider,
+    batch_token_counter: BatchTokenCounter | None = None,
 ) -> MessageHistoryBudgetResult:
     """
     Retrieves the history messages for a given turn, applying message content abbreviation and truncation
     to guarantee that the total token count of the messages fits within the specified token budget.
+
+    When a batch token counter is provided, it is used to count the tokens of all messages in a single call,
+    instead of calling the token counter for each message.
     """
     messages = await message_provider()
 
@@ -35,7 +40,9 @@ async def apply_budget_to_history_messages(
     message_collection = MessageCollection(
         messages=messages,
         # count all tokens for all messages - this will be used by the various budgeting functions
-        token_counts=count_tokens(messages=messages, token_counter=token_counter),
+        token_counts=count_tokens(
+            messages=messages, token_counter=token_counter, batch_token_counter=batch_token_counter
+        ),
         # initialize budget decisions for all messages
         budget_decisions=[BudgetDecision.original for _ in range(len(messages))],
     )
@@ -112,10 +119,28 @@ def get_resulting_messages(message_collection: MessageCollection) -> MessageHist
     return result
 
 
-def count_tokens(messages: Sequence[HistoryMessageProtocol], token_counter: TokenCounter) -> TokenCounts:
+@log_timing
+def count_tokens(
+    messages: Sequence[HistoryMessageProtocol],
+    token_counter: TokenCounter,
+    batch_token_counter: BatchTokenCounter | None = None,
+) -> TokenCounts:
     """
     Counts the tokens in the messages, both for the original OpenAI message and the abbreviated version.
     """
+    if batch_token_counter is not None:
+        abbreviated_messages = [msg.abbreviated_openai_message for msg in messages]
+        token_counts = iter(
+            batch_token_counter([
+                *(msg.openai_message for msg in messages),
+                *(msg for msg in abbreviated_messages if msg),
+            ])
+        )
+        return TokenCounts(
+            openai_message_token_counts=[next(token_counts) for _ in messages],
+            abbreviated_openai_message_token_counts=[next(token_counts) if msg else 0 for msg in abbreviated_messages],
+        )
+
     original_token_counts = [token_counter([msg.openai_message]) for msg in messages]
     abbreviated_token_counts = [
         token_counter([msg.abbreviated_openai_message]) if msg.abbreviated_openai_message else 0 for msg in messages
@@ -42,12 +42,14 @@ def _high_priority_start_index(
     high_priority_start_index = 0
     turn_start_message_index = len(messages) - 1
 
+    # the token count of the most recent i + 1 messages, accumulated from the newest message backwards
+    token_count = 0
     for i in range(len(messages)):
         if turn_start_message_id and messages[i].id == turn_start_message_id:
             turn_start_message_index = i
 
         if high_priority_start_index == 0:
-            token_count = sum(token_counts.openai_message_token_counts[-i - 1 :])
+            token_count += token_counts.openai_message_token_counts[-i - 1]
             if token_count > high_priority_token_budget:
                 high_priority_start_index = len(messages) - i
 
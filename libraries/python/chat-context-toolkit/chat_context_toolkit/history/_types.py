@@ -22,6 +22,14 @@ class TokenCounter(Protocol):
         ...
 
 
+class BatchTokenCounter(Protocol):
+    def __call__(self, messages: list[ChatCompletionMessageParam]) -> list[int]:
+        """
+        Returns the token count of each of the given OpenAI messages, counting them as a batch.
+        """
+        ...
+
+
 OpenAIHistoryMessageParam = (
     ChatCompletionUserMessageParam | ChatCompletionAssistantMessageParam | ChatCompletionToolMessageParam
 )
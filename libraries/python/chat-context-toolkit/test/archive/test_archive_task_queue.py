@@ -0,0 +1,297 @@
+import asyncio
+import datetime
+import logging
+import os
+import pathlib
+import random
+import time
+from typing import AsyncIterator, Callable, Sequence
+
+import pytest
+from chat_context_toolkit.archive import ArchiveTaskConfig, ArchiveTaskQueue
+from chat_context_toolkit.archive._types import ArchiveManifest, ArchivesState
+from chat_context_toolkit.history import OpenAIHistoryMessageParam
+
+logger = logging.getLogger(__name__)
+
+# set CHAT_CONTEXT_TOOLKIT_PYTEST_BENCHMARK_MESSAGE_COUNTS=1000,10000,100000 for the full benchmark
+MESSAGE_COUNTS = [
+    int(count)
+    for count in (os.environ.get("CHAT_CONTEXT_TOOLKIT_PYTEST_BENCHMARK_MESSAGE_COUNTS") or "1000,10000").split(",")
+]
+
+
+class Message:
+    def __init__(self, index: int, content: str) -> None:
+        self.id = f"message-{index:06d}"
+        self.timestamp = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(minutes=index)
+        self.openai_message: OpenAIHistoryMessageParam = {"role": "user", "content": content}
+
+
+class MemoryStorageProvider:
+    def __init__(self) -> None:
+        self.files: dict[str, str] = {}
+
+    async def read_text_file(self, relative_file_path: pathlib.PurePath) -> str | None:
+        return self.files.get(str(relative_file_path))
+
+    async def write_text_file(self, relative_file_path: pathlib.PurePath, content: str) -> None:
+        self.files[str(relative_file_path)] = content
+
+    async def list_files(self, relative_directory_path: pathlib.PurePath) -> list[pathlib.PurePath]:
+        return [
+            pathlib.PurePath(path) for path in self.files if pathlib.PurePath(path).parent == relative_directory_path
+        ]
+
+    def state(self) -> ArchivesState:
+        return ArchivesState.model_validate_json(self.files["archive_state.json"])
+
+    def archived_message_ids(self) -> list[list[str]]:
+        manifests = [
+            ArchiveManifest.model_validate_json(content)
+            for path, content in self.files.items()
+            if path.startswith("manifests/")
+        ]
+        return [manifest.message_ids for manifest in sorted(manifests, key=lambda manifest: manifest.message_ids[0])]
+
+
+class Conversation:
+    def __init__(self) -> None:
+        self.messages: list[Message] = []
+        self._indexes: dict[str, int] = {}
+        self._next_index = 0
+
+    def add(self, content: str) -> None:
+        message = Message(self._next_index, content)
+        self._next_index += 1
+        self._indexes[message.id] = len(self.messages)
+        self.messages.append(message)
+
+    def delete(self, message_id: str) -> None:
+        self.messages = [message for message in self.messages if message.id != message_id]
+        self._indexes = {message.id: index for index, message in enumerate(self.messages)}
+
+    async def provider(self, after_id: str | None) -> Sequence[Message]:
+        # like the workbench messages api, an unknown after_id is ignored
+        index = self._indexes.get(after_id) if after_id is not None else None
+        if index is None:
+            return self.messages
+        return self.messages[index + 1 :]
+
+
+class Summarizer:
+    def __init__(self, delay: float = 0, fail_on_content: str | None = None) -> None:
+        self.delay = delay
+        self.fail_on_content = fail_on_content
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def summarize(self, messages: Sequence[OpenAIHistoryMessageParam]) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_on_content is not None and any(
+                message.get("content") == self.fail_on_content for message in messages
+            ):
+                raise RuntimeError("summarization failed")
+            return f"summary of {len(messages)} messages"
+        finally:
+            self.in_flight -= 1
+
+
+class TokenCounter:
+    def __init__(self) -> None:
+        self.counted_message_count = 0
+
+    def __call__(self, messages: Sequence[OpenAIHistoryMessageParam]) -> int:
+        self.counted_message_count += len(messages)
+        return sum(len(str(message.get("content") or "")) for message in messages)
+
+
+def _recounted_chunks(messages: Sequence[Message], threshold: int) -> list[list[str]]:
+    """The chunking as it was before the pending token count was kept, re-summing the window per message."""
+    token_counts = [len(str(message.openai_message.get("content") or "")) for message in messages]
+    chunks = []
+    start_index = 0
+    for index in range(len(messages)):
+        if sum(token_counts[start_index : index + 1]) < threshold:
+            continue
+        chunks.append([message.id for message in messages[start_index : index + 1]])
+        start_index = index + 1
+    return chunks
+
+
+TaskQueueFactory = Callable[
+    [MemoryStorageProvider, Conversation, TokenCounter, Summarizer, ArchiveTaskConfig], ArchiveTaskQueue
+]
+
+
+@pytest.fixture
+async def task_queue_factory() -> AsyncIterator[TaskQueueFactory]:
+    task_queues: list[ArchiveTaskQueue] = []
+
+    def factory(
+        storage_provider: MemoryStorageProvider,
+        conversation: Conversation,
+        token_counter: TokenCounter,
+        summarizer: Summarizer,
+        config: ArchiveTaskConfig,
+    ) -> ArchiveTaskQueue:
+        task_queue = ArchiveTaskQueue(
+            storage_provider=storage_provider,
+            message_provider=conversation.provider,
+            token_counter=token_counter,
+            summarizer=summarizer,
+            config=config,
+        )
+        task_queues.append(task_queue)
+        return task_queue
+
+    yield factory
+
+    # runs are awaited directly by the tests, so the queue tasks are idle
+    for task_queue in task_queues:
+        task_queue._task.cancel()
+
+
+@pytest.mark.parametrize("seed", range(10))
+async def test_incremental_runs_match_recounted_chunks(seed: int, task_queue_factory: TaskQueueFactory) -> None:
+    rng = random.Random(seed)
+    storage_provider = MemoryStorageProvider()
+    conversation = Conversation()
+    token_counter = TokenCounter()
+    config = ArchiveTaskConfig(chunk_token_count_threshold=500)
+    task_queue = task_queue_factory(storage_provider, conversation, token_counter, Summarizer(), config)
+
+    for _ in range(rng.randint(1, 20)):
+        for _ in range(rng.randint(0, 15)):
+            conversation.add("x" * rng.randint(1, 200))
+        await task_queue._run()
+
+    # every message is counted once, across all runs
+    assert token_counter.counted_message_count == len(conversation.messages)
+
+    expected_chunks = _recounted_chunks(conversation.messages, config.chunk_token_count_threshold)
+    assert storage_provider.archived_message_ids() == expected_chunks
+
+    archived_count = sum(len(chunk) for chunk in expected_chunks)
+    pending_messages = conversation.messages[archived_count:]
+    if "archive_state.json" in storage_provider.files:
+        state = storage_provider.state()
+        assert state.pending_token_count == sum(len(str(m.openai_message.get("content"))) for m in pending_messages)
+        assert state.most_recent_counted_message_id == (pending_messages[-1].id if pending_messages else None)
+
+
+async def test_chunks_are_summarized_concurrently_with_limit(task_queue_factory: TaskQueueFactory) -> None:
+    storage_provider = MemoryStorageProvider()
+    conversation = Conversation()
+    for _ in range(10):
+        conversation.add("x" * 100)
+    summarizer = Summarizer(delay=0.01)
+    task_queue = task_queue_factory(
+        storage_provider,
+        conversation,
+        TokenCounter(),
+        summarizer,
+        ArchiveTaskConfig(chunk_token_count_threshold=100, max_concurrent_summaries=3),
+    )
+
+    await task_queue._run()
+
+    assert summarizer.max_in_flight == 3
+    assert storage_provider.archived_message_ids() == [[message.id] for message in conversation.messages]
+    state = storage_provider.state()
+    assert state.most_recent_archived_message_id == conversation.messages[-1].id
+    assert state.most_recent_counted_message_id is None
+    assert state.pending_token_count == 0
+
+
+async def test_failed_summary_leaves_state_at_most_recent_archived_chunk(task_queue_factory: TaskQueueFactory) -> None:
+    storage_provider = MemoryStorageProvider()
+    conversation = Conversation()
+    for content in ["a" * 50, "b" * 50, "c" * 50, "d" * 50, "e" * 50, "f" * 20]:
+        conversation.add(content)
+    summarizer = Summarizer(fail_on_content="c" * 50)
+    token_counter = TokenCounter()
+    task_queue = task_queue_factory(
+        storage_provider,
+        conversation,
+        token_counter,
+        summarizer,
+        ArchiveTaskConfig(chunk_token_count_threshold=100),
+    )
+
+    with pytest.raises(RuntimeError):
+        await task_queue._run()
+
+    state = storage_provider.state()
+    assert state.most_recent_archived_message_id == conversation.messages[1].id
+    assert state.most_recent_counted_message_id is None
+    assert state.pending_token_count == 0
+
+    summarizer.fail_on_content = None
+    await task_queue._run()
+
+    assert storage_provider.archived_message_ids() == _recounted_chunks(conversation.messages, 100)
+    state = storage_provider.state()
+    assert state.most_recent_counted_message_id == conversation.messages[-1].id
+    assert state.pending_token_count == 70
+
+
+async def test_deleted_counted_message_is_recounted(task_queue_factory: TaskQueueFactory) -> None:
+    storage_provider = MemoryStorageProvider()
+    conversation = Conversation()
+    for _ in range(3):
+        conversation.add("x" * 50)
+    task_queue = task_queue_factory(
+        storage_provider,
+        conversation,
+        TokenCounter(),
+        Summarizer(),
+        ArchiveTaskConfig(chunk_token_count_threshold=500),
+    )
+
+    await task_queue._run()
+    assert storage_provider.state().pending_token_count == 150
+
+    conversation.delete(conversation.messages[-1].id)
+    conversation.add("x" * 50)
+    await task_queue._run()
+
+    state = storage_provider.state()
+    assert state.most_recent_counted_message_id == conversation.messages[-1].id
+    assert state.pending_token_count == 150
+    assert storage_provider.archived_message_ids() == []
+
+
+def test_max_concurrent_summaries_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        ArchiveTaskConfig(max_concurrent_summaries=0)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("message_count", MESSAGE_COUNTS)
+async def test_archive_task_queue_benchmark(message_count: int, task_queue_factory: TaskQueueFactory) -> None:
+    rng = random.Random(message_count)
+    storage_provider = MemoryStorageProvider()
+    conversation = Conversation()
+    token_counter = TokenCounter()
+    config = ArchiveTaskConfig(chunk_token_count_threshold=30_000)
+    task_queue = task_queue_factory(storage_provider, conversation, token_counter, Summarizer(), config)
+
+    # a run per new message, as when a run is enqueued for every turn of the conversation
+    start = time.perf_counter()
+    for _ in range(message_count):
+        conversation.add("x" * rng.randint(1, 200))
+        await task_queue._run()
+    duration = time.perf_counter() - start
+
+    logger.info(
+        "archive task queue benchmark; messages: %d, chunks: %d, counted messages: %d, duration: %.3fs",
+        message_count,
+        len(storage_provider.archived_message_ids()),
+        token_counter.counted_message_count,
+        duration,
+    )
+    assert token_counter.counted_message_count == message_count
@@ -0,0 +1,186 @@
+import logging
+import os
+import random
+import time
+from typing import Sequence
+from uuid import uuid4
+
+import pytest
+from chat_context_toolkit.history import NewTurn, OpenAIHistoryMessageParam, apply_budget_to_history_messages
+from chat_context_toolkit.history._budget import abbreviate_messages, truncate_messages
+from chat_context_toolkit.history._prioritize import _high_priority_start_index
+from chat_context_toolkit.history._types import BudgetDecision, MessageCollection, TokenCounts
+
+logger = logging.getLogger(__name__)
+
+# set CHAT_CONTEXT_TOOLKIT_PYTEST_BENCHMARK_MESSAGE_COUNTS=1000,10000,100000 for the full benchmark
+MESSAGE_COUNTS = [
+    int(count)
+    for count in (os.environ.get("CHAT_CONTEXT_TOOLKIT_PYTEST_BENCHMARK_MESSAGE_COUNTS") or "1000,10000").split(",")
+]
+
+
+class Message:
+    def __init__(self, content: str, abbreviated_content: str | None) -> None:
+        self.id = uuid4().hex
+        self.openai_message: OpenAIHistoryMessageParam = {"role": "user", "content": content}
+        self.abbreviated_openai_message: OpenAIHistoryMessageParam | None = (
+            {"role": "user", "content": abbreviated_content} if abbreviated_content is not None else None
+        )
+
+
+def synthetic_messages(count: int, seed: int) -> list[Message]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        content = "x" * rng.randint(1, 200)
+        match rng.random():
+            case value if value < 0.1:
+                abbreviated_content = None
+            case value if value < 0.2:
+                # abbreviations that are longer than the original are not applied
+                abbreviated_content = content + "x"
+            case _:
+                abbreviated_content = content[: rng.randint(0, len(content))]
+        messages.append(Message(content, abbreviated_content))
+    return messages
+
+
+def token_counter(messages: Sequence[OpenAIHistoryMessageParam]) -> int:
+    return sum(len(str(message.get("content") or "")) for message in messages)
+
+
+def token_counts_for(messages: Sequence[Message]) -> TokenCounts:
+    return TokenCounts(
+        openai_message_token_counts=[token_counter([message.openai_message]) for message in messages],
+        abbreviated_openai_message_token_counts=[
+            token_counter([message.abbreviated_openai_message]) if message.abbreviated_openai_message else 0
+            for message in messages
+        ],
+    )
+
+
+def _recounted_token_count(
+    messages: Sequence[Message], token_counts: TokenCounts, decisions: Sequence[BudgetDecision]
+) -> int:
+    token_count = 0
+    for index, (message, decision) in enumerate(zip(messages, decisions)):
+        if decision == BudgetDecision.original:
+            token_count += token_counts.openai_message_token_counts[index]
+        elif decision == BudgetDecision.abbreviated and message.abbreviated_openai_message is not None:
+            token_count += token_counts.abbreviated_openai_message_token_counts[index]
+    return token_count
+
+
+def _recounted_abbreviate_messages(
+    token_budget: int, messages: Sequence[Message], token_counts: TokenCounts, before_index: int
+) -> list[BudgetDecision]:
+    """
+    The budgeting as it was before token counts were kept as running totals, recounting every message per step.
+    """
+    decisions = [BudgetDecision.original for _ in messages]
+    for index, message in enumerate(messages[:before_index]):
+        if _recounted_token_count(messages, token_counts, decisions) <= token_budget:
+            break
+        if message.abbreviated_openai_message is None:
+            decisions[index] = BudgetDecision.omitted
+            continue
+        if (
+            token_counts.abbreviated_openai_message_token_counts[index]
+            > token_counts.openai_message_token_counts[index]
+        ):
+            continue
+        decisions[index] = BudgetDecision.abbreviated
+    return decisions
+
+
+def _recounted_truncate_messages(
+    token_budget: int, messages: Sequence[Message], token_counts: TokenCounts, decisions: Sequence[BudgetDecision]
+) -> list[BudgetDecision]:
+    decisions = list(decisions)
+    for index in range(len(messages)):
+        if _recounted_token_count(messages, token_counts, decisions) <= token_budget:
+            break
+        decisions[index] = BudgetDecision.omitted
+    return decisions
+
+
+def _recounted_high_priority_start_index(token_counts: TokenCounts, high_priority_token_budget: int) -> int:
+    counts = token_counts.openai_message_token_counts
+    for i in range(len(counts)):
+        if sum(counts[-i - 1 :]) > high_priority_token_budget:
+            return len(counts) - i
+    return 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_budget_decisions_match_recounted_budgeting(seed: int) -> None:
+    rng = random.Random(seed)
+    messages = synthetic_messages(count=rng.randint(0, 300), seed=seed)
+    token_counts = token_counts_for(messages)
+    total_token_count = sum(token_counts.openai_message_token_counts)
+    token_budget = rng.randint(0, total_token_count + 1)
+    high_priority_token_budget = rng.randint(0, total_token_count + 1)
+
+    high_priority_start_index = _high_priority_start_index(
+        messages=messages, token_counts=token_counts, high_priority_token_budget=high_priority_token_budget
+    )
+    expected_start_index = min(
+        _recounted_high_priority_start_index(token_counts, high_priority_token_budget), len(messages) - 1
+    )
+    assert high_priority_start_index == expected_start_index
+
+    abbreviated_decisions = abbreviate_messages(
+        token_budget=token_budget,
+        message_collection=MessageCollection(
+            messages=messages,
+            token_counts=token_counts,
+            budget_decisions=[BudgetDecision.original for _ in messages],
+        ),
+        before_index=high_priority_start_index,
+    )
+    expected_abbreviated_decisions = _recounted_abbreviate_messages(
+        token_budget, messages, token_counts, high_priority_start_index
+    )
+    assert abbreviated_decisions == expected_abbreviated_decisions
+
+    truncated_decisions = truncate_messages(
+        token_budget=token_budget,
+        message_collection=MessageCollection(
+            messages=messages, token_counts=token_counts, budget_decisions=abbreviated_decisions
+        ),
+    )
+    assert truncated_decisions == _recounted_truncate_messages(
+        token_budget, messages, token_counts, expected_abbreviated_decisions
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("message_count", MESSAGE_COUNTS)
+async def test_apply_budget_to_history_messages_benchmark(message_count: int) -> None:
+    messages = synthetic_messages(count=message_count, seed=message_count)
+
+    async def message_provider() -> Sequence[Message]:
+        return messages
+
+    total_token_count = sum(token_counter([message.openai_message]) for message in messages)
+
+    start = time.perf_counter()
+    result = await apply_budget_to_history_messages(
+        turn=NewTurn(high_priority_token_count=total_token_count // 10),
+        # a budget that requires both abbreviation and truncation
+        token_budget=total_token_count // 5,
+        token_counter=token_counter,
+        message_provider=message_provider,
+    )
+    duration = time.perf_counter() - start
+
+    logger.info(
+        "history budget benchmark; messages: %d, tokens: %d, retained messages: %d, duration: %.3fs",
+        message_count,
+        total_token_count,
+        len(result.messages),
+        duration,
+    )
+    assert 0 < len(result.messages) < message_count
+    assert token_counter(result.messages) <= total_token_count // 5
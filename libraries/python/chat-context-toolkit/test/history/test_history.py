@@ -2,11 +2,13 @@ from uuid import uuid4
 
 import pytest
 from chat_context_toolkit.history import (
+    HistoryMessage,
     HistoryMessageProtocol,
     NewTurn,
     OpenAIHistoryMessageParam,
     apply_budget_to_history_messages,
 )
+from chat_context_toolkit.history._history import count_tokens
 from openai.types.chat import (
     ChatCompletionAssistantMessageParam,
     ChatCompletionMessageParam,
@@ -489,3 +491,41 @@ async def test_high_priority_for_turn_with_large_latest_message():
     ]
 
     assert result.messages == expected
+
+
+async def test_batch_token_counter() -> None:
+    """Test that counting tokens with a batch token counter gives the same counts and result."""
+    messages = [
+        user_message("this is a very long message", abbreviated_content="short"),
+        HistoryMessage(
+            id=uuid4().hex,
+            openai_message=ChatCompletionUserMessageParam(role="user", content="omitted when abbreviated"),
+            abbreviator=lambda: None,
+        ),
+        assistant_message("hello world"),
+        user_message("bye"),
+    ]
+    batch_calls: list[int] = []
+
+    def batch_token_counter(messages: list[ChatCompletionMessageParam]) -> list[int]:
+        batch_calls.append(len(messages))
+        return [token_counter([message]) for message in messages]
+
+    assert count_tokens(messages=messages, token_counter=token_counter, batch_token_counter=batch_token_counter) == (
+        count_tokens(messages=messages, token_counter=token_counter)
+    )
+    # the original and abbreviated messages are counted in a single batch
+    assert batch_calls == [7]
+
+    result = await apply_budget_to_history_messages(
+        turn=NewTurn(15),
+        token_budget=20,
+        token_counter=token_counter,
+        message_provider=MockMessageProvider(messages),
+        batch_token_counter=batch_token_counter,
+    )
+    assert result.messages == [
+        ChatCompletionUserMessageParam(role="user", content="short"),
+        ChatCompletionAssistantMessageParam(role="assistant", content="hello world"),
+        ChatCompletionUserMessageParam(role="user", content="bye"),
+    ]
@@ -35,12 +35,15 @@ from .messages import (
     truncate_messages_for_logging,
 )
 from .tokens import (
+    TokenCountCache,
     get_encoding_for_model,
+    num_tokens_for_message_batch,
     num_tokens_from_message,
     num_tokens_from_messages,
     num_tokens_from_string,
     num_tokens_from_tools,
     num_tokens_from_tools_and_messages,
+    token_count_cache_metrics,
 )
 
 logger = _logging.getLogger(__name__)
@@ -67,6 +70,7 @@ __all__ = [
     "make_completion_args_serializable",
     "message_content_from_completion",
     "message_from_completion",
+    "num_tokens_for_message_batch",
     "num_tokens_from_message",
     "num_tokens_from_messages",
     "num_tokens_from_string",
@@ -75,6 +79,8 @@ __all__ = [
     "OpenAIServiceConfig",
     "OpenAIRequestConfig",
     "ServiceConfig",
+    "TokenCountCache",
+    "token_count_cache_metrics",
     "truncate_messages_for_logging",
     "validate_completion",
     "completion_structured",
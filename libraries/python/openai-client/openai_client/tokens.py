@@ -1,7 +1,13 @@
 import base64
+import dataclasses
+import hashlib
+import json
 import logging
 import math
+import os
+import pathlib
 import re
+from collections import OrderedDict
 from fractions import Fraction
 from functools import lru_cache
 from io import BytesIO
@@ -71,6 +77,106 @@ def get_encoding_for_model(model: str) -> tiktoken.Encoding:
     return _get_cached_encoding(resolve_model_name(model))
 
 
+@dataclasses.dataclass
+class TokenCountCacheMetrics:
+    hit_count: int = 0
+    miss_count: int = 0
+
+
+# totals across all token count caches
+_token_count_cache_metrics = TokenCountCacheMetrics()
+
+
+def token_count_cache_metrics() -> TokenCountCacheMetrics:
+    """Return the hit and miss counts of all token count caches, since the process started."""
+    return dataclasses.replace(_token_count_cache_metrics)
+
+
+class TokenCountCache:
+    """
+    Caches the token counts of individual messages, keyed by the resolved model, which determines the encoding, and
+    a hash of the message content. The least recently used counts are evicted once there are more than max_size.
+
+    When a path is set, the counts are loaded from that file, and written to it by save(), so that they can be
+    persisted, for example, per conversation.
+    """
+
+    def __init__(self, max_size: int = 100_000, path: pathlib.Path | None = None) -> None:
+        self._max_size = max_size
+        self._path = path
+        self._counts: OrderedDict[str, int] = OrderedDict()
+        self._dirty = False
+        self.metrics = TokenCountCacheMetrics()
+
+        if path is not None:
+            self._load(path)
+
+    def get(self, key: str) -> int | None:
+        count = self._counts.get(key)
+        if count is None:
+            self.metrics.miss_count += 1
+            _token_count_cache_metrics.miss_count += 1
+            return None
+
+        self._counts.move_to_end(key)
+        self.metrics.hit_count += 1
+        _token_count_cache_metrics.hit_count += 1
+        return count
+
+    def set(self, key: str, count: int) -> None:
+        self._counts[key] = count
+        self._counts.move_to_end(key)
+        while len(self._counts) > self._max_size:
+            self._counts.popitem(last=False)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the counts to the path, if set and there are changes since they were loaded or last saved."""
+        if self._path is None or not self._dirty:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._path.with_name(f"{self._path.name}.tmp")
+        temp_path.write_text(json.dumps(self._counts), encoding="utf-8")
+        os.replace(temp_path, self._path)
+        self._dirty = False
+
+    def _load(self, path: pathlib.Path) -> None:
+        try:
+            counts = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("failed to load token count cache; path: %s", path, exc_info=True)
+            return
+
+        for key, count in counts.items():
+            self.set(key, count)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+# shared by all token counting that is not given a cache of its own
+default_token_count_cache = TokenCountCache()
+
+
+def _token_count_cache_key(message: ChatCompletionMessageParam, specific_model: str) -> str:
+    # images are not included in the cached counts, so their urls, which can be data URIs of several MB, are left
+    # out of the key
+    content = json.dumps(
+        {
+            key: [item for item in value if item.get("type") != "image_url"] if isinstance(value, list) else value
+            for key, value in message.items()
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return f"{specific_model}:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+
 def num_tokens_from_message(message: ChatCompletionMessageParam, model: str) -> int:
     """
     Return the number of tokens used by a single message.
@@ -88,10 +194,15 @@ def num_tokens_from_string(string: str, model: str) -> int:
     return len(encoding.encode(string))
 
 
-def num_tokens_from_messages(messages: Iterable[ChatCompletionMessageParam], model: str) -> int:
+def num_tokens_from_messages(
+    messages: Iterable[ChatCompletionMessageParam], model: str, cache: TokenCountCache | None = None
+) -> int:
     """
     Return the number of tokens used by a list of messages.
 
+    The count for each message is cached, in the given cache or the default cache, so that messages are only
+    encoded once. The tokens for images are counted on every call, from their memoized dimensions.
+
     Note that the exact way that tokens are counted from messages may change from model to model.
     Consider the counts from this function an estimate, not a timeless guarantee.
 
@@ -101,56 +212,146 @@ def num_tokens_from_messages(messages: Iterable[ChatCompletionMessageParam], mod
     Reference: https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken#6-counting-tokens-for-chat-completions-api-calls
     """
 
+    if cache is None:
+        cache = default_token_count_cache
+
     total_tokens = 0
     # Resolve the specific model name using the helper function.
     specific_model = resolve_model_name(model)
 
-    # Use extra token counts determined experimentally.
-    tokens_per_message = 3
-    tokens_per_name = 1
-
     # Get the encoding for the specific model
     encoding = get_encoding_for_model(model)
 
     # Calculate the total tokens for all messages
     for message in messages:
-        # Start with the tokens added per message
-        num_tokens = tokens_per_message
-
-        # Add tokens for each key-value pair in the message
-        for key, value in message.items():
-            # Calculate the tokens for the value
-            if isinstance(value, list):
-                # For GPT-4-vision support, based on the OpenAI cookbook
-                for item in value:
-                    # Note: item["type"] does not seem to be counted in the token count
-                    if item["type"] == "text":
-                        num_tokens += len(encoding.encode(item["text"]))
-                    elif item["type"] == "image_url":
-                        num_tokens += count_tokens_for_image(
-                            item["image_url"]["url"],
-                            model=specific_model,
-                            detail=item["image_url"].get("detail", "auto"),
-                        )
-            elif isinstance(value, str):
-                num_tokens += len(encoding.encode(value))
-            elif value is None:
-                # Null values do not consume tokens
-                pass
-            else:
-                raise ValueError(f"Could not encode unsupported message value type: {type(value)}")
-
-            # Add tokens for the name key
-            if key == "name":
-                num_tokens += tokens_per_name
+        cache_key = _token_count_cache_key(message, specific_model)
+        num_tokens = cache.get(cache_key)
+        if num_tokens is None:
+            num_tokens = _num_tokens_from_message(message, encoding=encoding)
+            cache.set(cache_key, num_tokens)
 
         # Add the total tokens for this message to the running total
-        total_tokens += num_tokens
+        total_tokens += num_tokens + _num_tokens_for_images(message, specific_model=specific_model)
 
     # Return the total token count for all messages
     return total_tokens
 
 
+def num_tokens_for_message_batch(
+    messages: Sequence[ChatCompletionMessageParam],
+    model: str,
+    cache: TokenCountCache | None = None,
+    num_threads: int = 8,
+) -> list[int]:
+    """
+    Return the number of tokens used by each of the messages.
+
+    The text of the messages that are not cached is encoded in a single batch, which tiktoken encodes on up to
+    num_threads threads, releasing the GIL while encoding.
+    """
+    if cache is None:
+        cache = default_token_count_cache
+
+    specific_model = resolve_model_name(model)
+    encoding = get_encoding_for_model(model)
+
+    token_counts: list[int] = []
+    uncached_keys: dict[int, str] = {}
+    texts: list[str] = []
+    # the index of the message of each text
+    text_message_indices: list[int] = []
+
+    for message_index, message in enumerate(messages):
+        cache_key = _token_count_cache_key(message, specific_model)
+        num_tokens = cache.get(cache_key)
+        if num_tokens is None:
+            message_texts, num_tokens = _message_texts(message)
+            texts.extend(message_texts)
+            text_message_indices.extend(message_index for _ in message_texts)
+            uncached_keys[message_index] = cache_key
+        token_counts.append(num_tokens)
+
+    for message_index, text_tokens in zip(text_message_indices, _encode_batch(encoding, texts, num_threads)):
+        token_counts[message_index] += len(text_tokens)
+
+    for message_index, cache_key in uncached_keys.items():
+        cache.set(cache_key, token_counts[message_index])
+
+    return [
+        num_tokens + _num_tokens_for_images(message, specific_model=specific_model)
+        for message, num_tokens in zip(messages, token_counts)
+    ]
+
+
+def _encode_batch(encoding: tiktoken.Encoding, texts: list[str], num_threads: int) -> list[list[int]]:
+    if num_threads <= 1 or len(texts) < num_threads:
+        # a thread pool costs more than it saves for a handful of texts
+        return [encoding.encode(text) for text in texts]
+    return encoding.encode_batch(texts, num_threads=num_threads)
+
+
+def _num_tokens_from_message(message: ChatCompletionMessageParam, encoding: tiktoken.Encoding) -> int:
+    """Return the number of tokens used by the message, other than by its images."""
+    texts, num_tokens = _message_texts(message)
+    for text in texts:
+        num_tokens += len(encoding.encode(text))
+    return num_tokens
+
+
+def _message_texts(message: ChatCompletionMessageParam) -> tuple[list[str], int]:
+    """
+    Return the texts in the message that are to be encoded, and the number of tokens used by the rest of the message,
+    other than by its images.
+    """
+    # Use extra token counts determined experimentally.
+    tokens_per_message = 3
+    tokens_per_name = 1
+
+    texts: list[str] = []
+
+    # Start with the tokens added per message
+    num_tokens = tokens_per_message
+
+    # Add tokens for each key-value pair in the message
+    for key, value in message.items():
+        # Calculate the tokens for the value
+        if isinstance(value, list):
+            # For GPT-4-vision support, based on the OpenAI cookbook
+            for item in value:
+                # Note: item["type"] does not seem to be counted in the token count
+                if item["type"] == "text":
+                    texts.append(item["text"])
+        elif isinstance(value, str):
+            texts.append(value)
+        elif value is None:
+            # Null values do not consume tokens
+            pass
+        else:
+            raise ValueError(f"Could not encode unsupported message value type: {type(value)}")
+
+        # Add tokens for the name key
+        if key == "name":
+            num_tokens += tokens_per_name
+
+    return texts, num_tokens
+
+
+def _num_tokens_for_images(message: ChatCompletionMessageParam, specific_model: str) -> int:
+    """Return the number of tokens used by the images in the message."""
+    num_tokens = 0
+    for value in message.values():
+        if not isinstance(value, list):
+            continue
+        for item in value:
+            if item["type"] == "image_url":
+                num_tokens += count_tokens_for_image(
+                    item["image_url"]["url"],
+                    model=specific_model,
+                    detail=item["image_url"].get("detail", "auto"),
+                )
+    return num_tokens
+
+
 def count_jsonschema_tokens(schema, encoding, prop_key, enum_item, enum_init) -> Any | int:
     """
     Recursively count tokens in any JSON-serializable object (i.e. a JSON Schema)
@@ -255,15 +456,138 @@ def num_tokens_from_tools_and_messages(
     return messages_token_count + tools_token_count
 
 
+_IMAGE_DATA_URI_PREFIX = re.compile(r"data:image\/\w+;base64,")
+
+# the image dimensions are memoized by a hash of this many leading base64 characters of the image, when the
+# dimensions are read from within them
+_IMAGE_DIMS_KEY_CHARS = 4096
+_IMAGE_DIMS_CACHE_SIZE = 1024
+_image_dims_cache: OrderedDict[bytes, tuple[int, int]] = OrderedDict()
+
+# JPEG start of frame markers, which hold the image dimensions
+_JPEG_SOF_MARKERS = frozenset([0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF])
+# JPEG markers without a length or payload
+_JPEG_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xD9)])
+
+
 def get_image_dims(image_uri: str) -> tuple[int, int]:
+    """
+    Return the width and height of a base64 encoded image. The dimensions of PNG, JPEG, GIF and WebP images are read
+    from their headers, decoding only the leading bytes of the image. Other formats are decoded in full by PIL.
+    """
     # From https://github.com/openai/openai-cookbook/pull/881/files
-    if re.match(r"data:image\/\w+;base64", image_uri):
-        image_uri = re.sub(r"data:image\/\w+;base64,", "", image_uri)
-        with Image.open(BytesIO(base64.b64decode(image_uri))) as image:
-            return image.size
-    else:
+    if not re.match(r"data:image\/\w+;base64", image_uri):
         raise ValueError("Image must be a base64 string.")
 
+    # the payload is referenced by its offset, rather than sliced, to avoid copying images that can be several MB
+    prefix = _IMAGE_DATA_URI_PREFIX.match(image_uri)
+    payload = _Base64Payload(image_uri, prefix.end() if prefix is not None else len(image_uri))
+
+    key = hashlib.sha256(payload.chars(_IMAGE_DIMS_KEY_CHARS).encode("utf-8")).digest()
+    dims = _image_dims_cache.get(key)
+    if dims is not None:
+        _image_dims_cache.move_to_end(key)
+        return dims
+
+    try:
+        probed = _probe_image_dims(payload)
+    except ValueError:
+        # not valid base64, or a malformed header; left to PIL to report
+        probed = None
+
+    if probed is None:
+        with Image.open(BytesIO(base64.b64decode(_IMAGE_DATA_URI_PREFIX.sub("", image_uri)))) as image:
+            return image.size
+
+    dims, header_byte_count = probed
+    if header_byte_count <= _IMAGE_DIMS_KEY_CHARS // 4 * 3:
+        _image_dims_cache[key] = dims
+        if len(_image_dims_cache) > _IMAGE_DIMS_CACHE_SIZE:
+            _image_dims_cache.popitem(last=False)
+    return dims
+
+
+@dataclasses.dataclass
+class _Base64Payload:
+    uri: str
+    start: int
+
+    def chars(self, count: int) -> str:
+        return self.uri[self.start : self.start + count]
+
+    def decode_prefix(self, byte_count: int) -> bytes:
+        """Decode at least the leading byte_count bytes, or all of them, if there are fewer."""
+        return base64.b64decode(self.chars(math.ceil(byte_count / 3) * 4), validate=True)
+
+
+def _probe_image_dims(payload: _Base64Payload) -> tuple[tuple[int, int], int] | None:
+    """
+    Return the dimensions of a PNG, JPEG, GIF or WebP image, read from its header, along with the number of bytes
+    of the image they were read from. Returns None for other formats.
+    """
+    header = payload.decode_prefix(32)
+
+    if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+        return (int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")), 24
+
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return (int.from_bytes(header[6:8], "little"), int.from_bytes(header[8:10], "little")), 10
+
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP" and len(header) >= 30:
+        match header[12:16]:
+            case b"VP8 " if header[23:26] == b"\x9d\x01\x2a":
+                width = int.from_bytes(header[26:28], "little") & 0x3FFF
+                height = int.from_bytes(header[28:30], "little") & 0x3FFF
+                return (width, height), 30
+            case b"VP8L" if header[20] == 0x2F:
+                bits = int.from_bytes(header[21:25], "little")
+                return ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1), 25
+            case b"VP8X":
+                width = int.from_bytes(header[24:27], "little") + 1
+                height = int.from_bytes(header[27:30], "little") + 1
+                return (width, height), 30
+        return None
+
+    if header.startswith(b"\xff\xd8"):
+        return _probe_jpeg_dims(payload)
+
+    return None
+
+
+def _probe_jpeg_dims(payload: _Base64Payload) -> tuple[tuple[int, int], int] | None:
+    # walks the segments of the image to the start of frame, decoding more of the image as needed, as the segments
+    # before it, such as EXIF metadata with thumbnails, can be large
+    byte_count = 4096
+    data = payload.decode_prefix(byte_count)
+    offset = 2
+    while True:
+        # the marker, its length, and the dimensions in the start of frame segment
+        while offset + 9 > len(data):
+            if len(data) < byte_count:
+                # the whole image is decoded
+                return None
+            byte_count = max(byte_count * 4, offset + 9)
+            data = payload.decode_prefix(byte_count)
+
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # fill byte
+            offset += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[offset + 5 : offset + 7], "big")
+            width = int.from_bytes(data[offset + 7 : offset + 9], "big")
+            return (width, height), offset + 9
+        if marker in _JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker == 0xD9 or marker == 0xDA:
+            # end of image, or start of scan, without a start of frame
+            return None
+        offset += 2 + int.from_bytes(data[offset + 2 : offset + 4], "big")
+
 
 def count_tokens_for_image(image_uri: str, detail: str, model: str) -> int:
     # From https://github.com/openai/openai-cookbook/pull/881/files
@@ -1,8 +1,14 @@
+import base64
+import io
 import os
+import pathlib
 
 import openai_client
 import pytest
+import tiktoken
 from openai import OpenAI
+from openai_client import tokens
+from PIL import Image
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
 
 
@@ -151,3 +157,137 @@ def test_num_tokens_for_tools_and_messages(model: str, client: OpenAI) -> None:
     assert actual_num_tokens == expected_num_tokens, (
         f"num_tokens_from_tools_and_messages() does not match the OpenAI API response for model {model}."
     )
+
+
+@pytest.fixture
+def byte_encoding(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    An encoding with a token per byte, so that token counting does not need to download the tiktoken encodings.
+    """
+    encoding = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(tokens, "get_encoding_for_model", lambda model: encoding)
+
+
+def test_num_tokens_from_messages_caches_message_counts(byte_encoding: None) -> None:
+    cache = tokens.TokenCountCache()
+    messages: list[ChatCompletionMessageParam] = [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi there", "name": "assistant"},
+    ]
+
+    # 3 per message, plus a token per byte of each value, plus 1 for the name
+    assert openai_client.num_tokens_from_messages(messages=messages, model="gpt-4o", cache=cache) == 42
+    assert cache.metrics == tokens.TokenCountCacheMetrics(hit_count=0, miss_count=2)
+
+    assert openai_client.num_tokens_from_messages(messages=messages, model="gpt-4o", cache=cache) == 42
+    assert cache.metrics == tokens.TokenCountCacheMetrics(hit_count=2, miss_count=2)
+
+    # counts are cached per resolved model
+    openai_client.num_tokens_from_messages(messages=messages[:1], model="gpt-4o-2024-08-06", cache=cache)
+    openai_client.num_tokens_from_messages(messages=messages[:1], model="gpt-4", cache=cache)
+    assert cache.metrics == tokens.TokenCountCacheMetrics(hit_count=3, miss_count=3)
+    assert len(cache) == 3
+
+
+def test_token_count_cache_eviction_and_persistence(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "conversation" / "token_counts.json"
+    cache = tokens.TokenCountCache(max_size=2, path=path)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    # the least recently used count is evicted
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    cache.save()
+
+    loaded_cache = tokens.TokenCountCache(max_size=2, path=path)
+    assert loaded_cache.get("a") == 1
+    assert loaded_cache.get("c") == 3
+    assert len(loaded_cache) == 2
+
+    path.write_text("not json")
+    assert len(tokens.TokenCountCache(path=path)) == 0
+
+
+def test_num_tokens_for_message_batch(byte_encoding: None) -> None:
+    messages: list[ChatCompletionMessageParam] = [
+        {"role": "user", "content": f"message {index} " * index, "name": "user" if index % 2 else None}
+        for index in range(40)
+    ]
+    messages.append({"role": "user", "content": [{"type": "text", "text": "part 1"}, {"type": "text", "text": "2"}]})
+
+    expected_counts = [
+        openai_client.num_tokens_from_messages(messages=[message], model="gpt-4o", cache=tokens.TokenCountCache())
+        for message in messages
+    ]
+
+    cache = tokens.TokenCountCache()
+    assert tokens.num_tokens_for_message_batch(messages=messages, model="gpt-4o", cache=cache) == expected_counts
+    assert tokens.num_tokens_for_message_batch(messages=messages, model="gpt-4o", cache=cache) == expected_counts
+    assert cache.metrics == tokens.TokenCountCacheMetrics(hit_count=len(messages), miss_count=len(messages))
+
+    # serially encoded batches are counted the same
+    assert (
+        tokens.num_tokens_for_message_batch(
+            messages=messages, model="gpt-4o", cache=tokens.TokenCountCache(), num_threads=1
+        )
+        == expected_counts
+    )
+
+
+def test_num_tokens_from_messages_counts_images_outside_cache(byte_encoding: None) -> None:
+    def image_message(size: tuple[int, int]) -> ChatCompletionMessageParam:
+        buffer = io.BytesIO()
+        Image.new("RGB", size).save(buffer, format="PNG")
+        image_uri = f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+        return {
+            "role": "user",
+            "content": [{"type": "text", "text": "look"}, {"type": "image_url", "image_url": {"url": image_uri}}],
+        }
+
+    small, large = image_message((64, 64)), image_message((2048, 2048))
+    expected_counts = [
+        tokens.num_tokens_from_messages(messages=[message], model="gpt-4o", cache=tokens.TokenCountCache())
+        for message in (small, large)
+    ]
+    assert expected_counts[0] < expected_counts[1]
+
+    # the messages differ only in their images, which are not part of the cached counts
+    cache = tokens.TokenCountCache()
+    assert [
+        tokens.num_tokens_from_messages(messages=[message], model="gpt-4o", cache=cache) for message in (small, large)
+    ] == expected_counts
+    assert tokens.num_tokens_for_message_batch(messages=[small, large], model="gpt-4o", cache=cache) == expected_counts
+    assert cache.metrics == tokens.TokenCountCacheMetrics(hit_count=3, miss_count=1)
+
+
+@pytest.mark.parametrize(
+    ("image_format", "save_args"),
+    [
+        ("PNG", {}),
+        ("GIF", {}),
+        ("JPEG", {}),
+        ("JPEG", {"progressive": True}),
+        # metadata segments that push the start of frame beyond the leading bytes that are decoded first
+        ("JPEG", {"exif": b"Exif\x00\x00" + bytes(60_000)}),
+        ("WEBP", {"lossless": False}),
+        ("WEBP", {"lossless": True}),
+        ("WEBP", {"exif": b"Exif\x00\x00"}),
+        # not probed, read with PIL
+        ("BMP", {}),
+    ],
+)
+@pytest.mark.parametrize("size", [(1, 1), (513, 77), (3840, 2160)])
+def test_get_image_dims(image_format: str, save_args: dict, size: tuple[int, int]) -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=(size[0] % 256, 128, 64)).save(buffer, format=image_format, **save_args)
+    image_uri = f"data:image/{image_format.lower()};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+    assert tokens.get_image_dims(image_uri) == size
+    # memoized
+    assert tokens.get_image_dims(image_uri) == size
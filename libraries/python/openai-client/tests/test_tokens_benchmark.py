@@ -0,0 +1,138 @@
+import base64
+import io
+import logging
+import os
+import random
+import time
+
+import pytest
+import tiktoken
+from openai.types.chat import ChatCompletionMessageParam
+from openai_client import tokens
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.benchmark
+
+# set OPENAI_CLIENT_PYTEST_BENCHMARK_MESSAGE_COUNT=100000 for the full benchmark
+MESSAGE_COUNT = int(os.environ.get("OPENAI_CLIENT_PYTEST_BENCHMARK_MESSAGE_COUNT") or 5_000)
+IMAGE_COUNT = int(os.environ.get("OPENAI_CLIENT_PYTEST_BENCHMARK_IMAGE_COUNT") or 20)
+TURN_COUNT = int(os.environ.get("OPENAI_CLIENT_PYTEST_BENCHMARK_TURN_COUNT") or 5)
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do", "eiusmod"]
+
+
+@pytest.fixture
+def encoding(monkeypatch: pytest.MonkeyPatch) -> tiktoken.Encoding:
+    try:
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # the encoding is downloaded on first use; without network access, an encoding with a token per byte is used
+        logger.info("o200k_base encoding is not available; benchmarking with a byte encoding")
+        encoding = tiktoken.Encoding(
+            name="bytes",
+            pat_str=r"\S+|\s+",
+            mergeable_ranks={bytes([i]): i for i in range(256)},
+            special_tokens={},
+        )
+    monkeypatch.setattr(tokens, "get_encoding_for_model", lambda model: encoding)
+    return encoding
+
+
+def test_num_tokens_for_message_batch_benchmark(encoding: tiktoken.Encoding) -> None:
+    rng = random.Random(0)
+    messages: list[ChatCompletionMessageParam] = [
+        {"role": "user", "content": " ".join(rng.choices(WORDS, k=rng.randint(10, 500)))} for _ in range(MESSAGE_COUNT)
+    ]
+
+    # the messages are unique, so every message is a cache miss on both paths
+    start = time.perf_counter()
+    serial_counts = [
+        tokens.num_tokens_from_messages(messages=[message], model="gpt-4o", cache=tokens.TokenCountCache())
+        for message in messages
+    ]
+    serial_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_counts = tokens.num_tokens_for_message_batch(
+        messages=messages, model="gpt-4o", cache=tokens.TokenCountCache()
+    )
+    batch_duration = time.perf_counter() - start
+
+    assert batch_counts == serial_counts
+    logger.info(
+        "token counting benchmark; encoding: %s, cpus: %s, messages: %d, tokens: %d,"
+        " per message: %.0f messages/s, batched: %.0f messages/s",
+        encoding.name,
+        os.cpu_count(),
+        MESSAGE_COUNT,
+        sum(batch_counts),
+        MESSAGE_COUNT / serial_duration,
+        MESSAGE_COUNT / batch_duration,
+    )
+
+
+def _screenshot_uri(seed: int) -> str:
+    """A 4K PNG with a band of noise, so that it is a few MB, like a screenshot with detailed content."""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (3840, 2160), color=(rng.randrange(256), 255, 255))
+    image.paste(Image.frombytes("RGB", (3840, 200), rng.randbytes(3840 * 200 * 3)), (0, rng.randrange(1960)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+def _decoded_image_dims(image_uri: str) -> tuple[int, int]:
+    """The dimensions as read before image headers were probed, by decoding the whole image."""
+    payload = image_uri.split(",", 1)[1]
+    with Image.open(io.BytesIO(base64.b64decode(payload))) as image:
+        return image.size
+
+
+def test_count_tokens_for_image_benchmark(encoding: tiktoken.Encoding, monkeypatch: pytest.MonkeyPatch) -> None:
+    # a conversation with a screenshot per user message, counted in full on every turn, as by the assistants
+    messages: list[ChatCompletionMessageParam] = []
+    for seed in range(IMAGE_COUNT):
+        messages.append({
+            "role": "user",
+            "content": [
+                {"type": "text", "text": f"what is in screenshot {seed}?"},
+                {"type": "image_url", "image_url": {"url": _screenshot_uri(seed), "detail": "high"}},
+            ],
+        })
+        messages.append({"role": "assistant", "content": f"screenshot {seed} shows a band of noise"})
+    expected_count = tokens.num_tokens_from_messages(messages=messages, model="gpt-4o", cache=tokens.TokenCountCache())
+
+    def count_for_every_turn() -> tuple[float, float]:
+        tokens._image_dims_cache.clear()
+        cache = tokens.TokenCountCache()
+        start = time.perf_counter()
+        for _ in range(TURN_COUNT):
+            assert tokens.num_tokens_from_messages(messages=messages, model="gpt-4o", cache=cache) == expected_count
+        serial_duration = time.perf_counter() - start
+
+        tokens._image_dims_cache.clear()
+        cache = tokens.TokenCountCache()
+        start = time.perf_counter()
+        for _ in range(TURN_COUNT):
+            counts = tokens.num_tokens_for_message_batch(messages=messages, model="gpt-4o", cache=cache)
+            assert sum(counts) == expected_count
+        return serial_duration, time.perf_counter() - start
+
+    probed_durations = count_for_every_turn()
+    with monkeypatch.context() as context:
+        context.setattr(tokens, "get_image_dims", _decoded_image_dims)
+        decoded_durations = count_for_every_turn()
+
+    logger.info(
+        "image token counting benchmark; images: %d, payload: %.1f MB, turns: %d,"
+        " decoded: %.2f ms/turn (batched: %.2f ms/turn), probed: %.3f ms/turn (batched: %.3f ms/turn)",
+        IMAGE_COUNT,
+        sum(len(str(message["content"])) for message in messages) / 1_000_000,
+        TURN_COUNT,
+        decoded_durations[0] / TURN_COUNT * 1_000,
+        decoded_durations[1] / TURN_COUNT * 1_000,
+        probed_durations[0] / TURN_COUNT * 1_000,
+        probed_durations[1] / TURN_COUNT * 1_000,
+    )
@@ -31,8 +31,10 @@ HEADER_API_KEY = "X-API-Key"
 
 
 # HTTPX transport factory can be overridden to return an ASGI transport for testing
-def httpx_transport_factory() -> httpx.AsyncHTTPTransport:
-    return httpx.AsyncHTTPTransport(retries=3)
+def httpx_transport_factory(limits: httpx.Limits | None = None, http2: bool = False) -> httpx.AsyncBaseTransport:
+    if limits is None:
+        return httpx.AsyncHTTPTransport(retries=3, http2=http2)
+    return httpx.AsyncHTTPTransport(retries=3, limits=limits, http2=http2)
 
 
 class AuthParams(BaseModel):
@@ -139,6 +141,22 @@ class AssistantClient:
         if not http_response.is_success:
             raise AssistantResponseError(http_response)
 
+    async def post_conversation_events(self, events: list[ConversationEvent]) -> None:
+        """
+        Posts the events, in order, in a single request. The events can be from any of the assistant's
+        conversations.
+        """
+        try:
+            http_response = await self._client.post(
+                "/events",
+                json=[event.model_dump(mode="json") for event in events],
+            )
+        except httpx.RequestError as e:
+            raise AssistantConnectionError(e) from e
+
+        if not http_response.is_success:
+            raise AssistantResponseError(http_response)
+
     async def get_config(self) -> ConfigResponseModel:
         try:
             http_response = await self._client.get("/config")
@@ -336,13 +354,16 @@ class AssistantServiceClientBuilder:
         self,
         base_url: str,
         api_key: str,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         self._base_url = base_url.strip("/")
         self._api_key = api_key
+        # the clients share the transport, and its connection pool, when one is provided
+        self._transport = transport
 
     def _client(self, *additional_paths: str) -> httpx.AsyncClient:
         return httpx.AsyncClient(
-            transport=httpx_transport_factory(),
+            transport=self._transport or httpx_transport_factory(),
             base_url="/".join([self._base_url, *additional_paths]),
             timeout=httpx.Timeout(5.0, connect=10.0, read=60.0),
             headers={
@@ -193,6 +193,9 @@ class ConversationMessageDebug(BaseModel):
 
 class ConversationMessageList(BaseModel):
     messages: list[ConversationMessage]
+    # opaque cursors for the first and last messages, for use as before_cursor and after_cursor when paging
+    first_cursor: str | None = None
+    last_cursor: str | None = None
 
 
 class File(BaseModel):
@@ -234,6 +237,9 @@ class UpdateFile(BaseModel):
 class ConversationImportResult(BaseModel):
     conversation_ids: list[uuid.UUID]
     assistant_ids: list[uuid.UUID]
+    # the number of records imported, by record type
+    record_counts: dict[str, int] = {}
+    file_count: int = 0
 
 
 class EditorData(BaseModel):
@@ -208,6 +208,8 @@ class ConversationAPIClient:
         participant_ids: Iterable[str] | None = None,
         participant_role: workbench_model.ParticipantRole | None = None,
         limit: int | None = None,
+        before_cursor: str | None = None,
+        after_cursor: str | None = None,
     ) -> workbench_model.ConversationMessageList:
         params: dict[str, str | list[str]] = {}
         if message_types:
@@ -220,6 +222,10 @@ class ConversationAPIClient:
             params["before"] = str(before)
         if after:
             params["after"] = str(after)
+        if before_cursor:
+            params["before_cursor"] = before_cursor
+        if after_cursor:
+            params["after_cursor"] = after_cursor
         if limit:
             params["limit"] = str(limit)
 
@@ -229,6 +235,38 @@ class ConversationAPIClient:
         http_response.raise_for_status()
         return workbench_model.ConversationMessageList.model_validate(http_response.json())
 
+    async def iter_messages(
+        self,
+        after: uuid.UUID | None = None,
+        message_types: Iterable[workbench_model.MessageType] = (workbench_model.MessageType.chat,),
+        participant_ids: Iterable[str] | None = None,
+        participant_role: workbench_model.ParticipantRole | None = None,
+        after_cursor: str | None = None,
+    ) -> AsyncIterator[workbench_model.ConversationMessage]:
+        """
+        Iterates over all the messages after the given message id or cursor, oldest first, in a single request.
+        """
+        params: dict[str, str | list[str]] = {}
+        if message_types:
+            params["message_type"] = [mt.value for mt in message_types]
+        if participant_ids:
+            params["participant_id"] = list(participant_ids)
+        if participant_role:
+            params["participant_role"] = participant_role.value
+        if after:
+            params["after"] = str(after)
+        if after_cursor:
+            params["after_cursor"] = after_cursor
+
+        async with self._client.stream(
+            "GET", f"/conversations/{self._conversation_id}/messages-stream", params=params, headers=self._headers
+        ) as http_response:
+            http_response.raise_for_status()
+            async for line in http_response.aiter_lines():
+                if not line:
+                    continue
+                yield workbench_model.ConversationMessage.model_validate_json(line)
+
     async def send_messages(
         self,
         *messages: workbench_model.NewConversationMessage,
@@ -280,9 +318,16 @@ class ConversationAPIClient:
         self,
         filename: str,
         chunk_size: int | None = None,
+        offset: int = 0,
+        length: int | None = None,
     ) -> AsyncGenerator[AsyncIterator[bytes], Any]:
+        headers = dict(self._headers)
+        if offset or length is not None:
+            # the service returns the requested range of the content
+            headers["Range"] = f"bytes={offset}-{'' if length is None else offset + length - 1}"
+
         request = self._client.build_request(
-            "GET", f"/conversations/{self._conversation_id}/files/{filename}", headers=self._headers
+            "GET", f"/conversations/{self._conversation_id}/files/{filename}", headers=headers
         )
         http_response = await self._client.send(request, stream=True)
         http_response.raise_for_status()
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from semantic_workbench_api_model import workbench_model
+
+logger = logging.getLogger(__name__)
+
+SendStateEvent = Callable[[workbench_model.AssistantStateEvent], Awaitable[None]]
+SendStatus = Callable[[str | None], Awaitable[None]]
+
+
+@dataclass
+class ConversationUpdateCoalescerMetrics:
+    state_event_count: int
+    collapsed_state_event_count: int
+    status_update_count: int
+    collapsed_status_update_count: int
+
+
+@dataclass
+class _PendingUpdates:
+    # the latest update for each state_id and event, and for the status, in the order the latest updates arrived
+    updates: dict[tuple[str, ...], Callable[[], Awaitable[None]]] = field(default_factory=dict)
+    flush_task: asyncio.Task | None = None
+
+
+@dataclass
+class _Sender:
+    # sends for a conversation are serialized, so that a slow send is not overtaken by those of a later window
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    waiting_count: int = 0
+
+
+class ConversationUpdateCoalescer:
+    """
+    Merges the assistant state events and participant status updates that an assistant sends for a conversation
+    within a short window, so that a burst results in a single request for each state and for the status.
+
+    State events with the same state id and event are collapsed into the latest. Status updates are collapsed into
+    the latest status, so transient statuses shorter than the window are not sent. Updates are sent in the order
+    that the latest of each arrived, and the updates of a window are sent after those of earlier windows.
+    """
+
+    def __init__(self, window_seconds: float) -> None:
+        self._window_seconds = window_seconds
+        self._pending: dict[tuple[str, str], _PendingUpdates] = {}
+        self._senders: dict[tuple[str, str], _Sender] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        self._state_event_count = 0
+        self._collapsed_state_event_count = 0
+        self._status_update_count = 0
+        self._collapsed_status_update_count = 0
+
+    def state_event(
+        self,
+        assistant_id: str,
+        conversation_id: str,
+        state_event: workbench_model.AssistantStateEvent,
+        send: SendStateEvent,
+    ) -> None:
+        self._state_event_count += 1
+        if self._add_update(
+            assistant_id, conversation_id, ("state", state_event.state_id, state_event.event), lambda: send(state_event)
+        ):
+            self._collapsed_state_event_count += 1
+
+    def status(self, assistant_id: str, conversation_id: str, status: str | None, send: SendStatus) -> None:
+        self._status_update_count += 1
+        if self._add_update(assistant_id, conversation_id, ("status",), lambda: send(status)):
+            self._collapsed_status_update_count += 1
+
+    def _add_update(
+        self, assistant_id: str, conversation_id: str, key: tuple[str, ...], send: Callable[[], Awaitable[None]]
+    ) -> bool:
+        """
+        Adds the update to those pending for the conversation, returning whether it replaced a pending update.
+        """
+        pending = self._pending_for(assistant_id, conversation_id)
+        # moved to the end, so that the update is sent in the order it arrived
+        collapsed = pending.updates.pop(key, None) is not None
+        pending.updates[key] = send
+        return collapsed
+
+    def _pending_for(self, assistant_id: str, conversation_id: str) -> _PendingUpdates:
+        key = (assistant_id, conversation_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingUpdates()
+            self._pending[key] = pending
+            pending.flush_task = asyncio.create_task(self._flush_after_window(key))
+            self._flush_tasks.add(pending.flush_task)
+            pending.flush_task.add_done_callback(self._flush_tasks.discard)
+        return pending
+
+    async def _flush_after_window(self, key: tuple[str, str]) -> None:
+        await asyncio.sleep(self._window_seconds)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            await self._send(key, pending)
+
+    async def flush(self) -> None:
+        """
+        Sends all pending updates immediately, and waits for updates that are being sent.
+        """
+        pending_updates, self._pending = self._pending, {}
+        for key, pending in pending_updates.items():
+            if pending.flush_task is not None:
+                pending.flush_task.cancel()
+            await self._send(key, pending)
+
+        await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def _send(self, key: tuple[str, str], pending: _PendingUpdates) -> None:
+        sender = self._senders.get(key)
+        if sender is None:
+            sender = _Sender()
+            self._senders[key] = sender
+
+        sender.waiting_count += 1
+        try:
+            async with sender.lock:
+                for send in pending.updates.values():
+                    await send()
+
+        except Exception:
+            # callers are not waiting for coalesced updates, so failures are only logged
+            logger.exception("error sending conversation updates; assistant_id: %s, conversation_id: %s", *key)
+
+        finally:
+            sender.waiting_count -= 1
+            if sender.waiting_count == 0:
+                del self._senders[key]
+
+    def metrics(self) -> ConversationUpdateCoalescerMetrics:
+        return ConversationUpdateCoalescerMetrics(
+            state_event_count=self._state_event_count,
+            collapsed_state_event_count=self._collapsed_state_event_count,
+            status_update_count=self._status_update_count,
+            collapsed_status_update_count=self._collapsed_status_update_count,
+        )
@@ -13,6 +13,8 @@ import semantic_workbench_api_model.workbench_service_client
 from semantic_workbench_api_model import workbench_model
 
 from .. import settings
+from ..message_cache import ConversationMessageCache
+from .coalescer import ConversationUpdateCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +35,16 @@ class ConversationContext:
         title: str,
         assistant: AssistantContext,
         httpx_client: httpx.AsyncClient,
+        message_cache: ConversationMessageCache | None = None,
+        update_coalescer: ConversationUpdateCoalescer | None = None,
     ) -> None:
         self.id = id
         self.title = title
         self.assistant = assistant
 
         self._httpx_client = httpx_client
+        self._message_cache = message_cache
+        self._update_coalescer = update_coalescer
 
         self._status_lock = asyncio.Lock()
         self._status_stack: list[str | None] = []
@@ -53,6 +59,8 @@ class ConversationContext:
             title="",
             assistant=self.assistant,
             httpx_client=self._httpx_client,
+            message_cache=self._message_cache,
+            update_coalescer=self._update_coalescer,
         )
 
     @property
@@ -91,7 +99,12 @@ class ConversationContext:
     ) -> workbench_model.ConversationMessageList:
         if not isinstance(messages, list):
             messages = [messages]
-        return await self._conversation_client.send_messages(*messages)
+        try:
+            return await self._conversation_client.send_messages(*messages)
+        finally:
+            if self._message_cache is not None:
+                # the sent messages are read from the workbench, rather than waiting on their events
+                self._message_cache.mark_stale(self.assistant.id, self.id)
 
     async def update_participant_me(
         self, participant: workbench_model.UpdateParticipant
@@ -112,15 +125,23 @@ class ConversationContext:
         async with self._status_lock:
             self._status_stack.append(self._prior_status)
             self._prior_status = status
-        await self._conversation_client.update_participant_me(workbench_model.UpdateParticipant(status=status))
+        await self._update_status(status)
         try:
             yield
         finally:
             async with self._status_lock:
                 revert_to_status = self._status_stack.pop()
-            await self._conversation_client.update_participant_me(
-                workbench_model.UpdateParticipant(status=revert_to_status)
-            )
+            await self._update_status(revert_to_status)
+
+    async def _update_status(self, status: str | None) -> None:
+        if self._update_coalescer is not None:
+            self._update_coalescer.status(self.assistant.id, self.id, status, send=self._send_status)
+            return
+
+        await self._send_status(status)
+
+    async def _send_status(self, status: str | None) -> None:
+        await self._conversation_client.update_participant_me(workbench_model.UpdateParticipant(status=status))
 
     async def get_conversation(self) -> workbench_model.Conversation:
         return await self._conversation_client.get_conversation()
@@ -140,6 +161,21 @@ class ConversationContext:
         participant_role: workbench_model.ParticipantRole | None = None,
         limit: int | None = None,
     ) -> workbench_model.ConversationMessageList:
+        if self._message_cache is not None:
+            messages = await self._message_cache.get_messages(
+                self.assistant.id,
+                self.id,
+                load=self._iter_all_messages,
+                before=before,
+                after=after,
+                message_types=message_types,
+                participant_ids=participant_ids,
+                participant_role=participant_role,
+                # the workbench service default
+                limit=limit or 100,
+            )
+            return workbench_model.ConversationMessageList(messages=messages)
+
         return await self._conversation_client.get_messages(
             before=before,
             after=after,
@@ -149,8 +185,68 @@ class ConversationContext:
             limit=limit,
         )
 
+    def iter_messages(
+        self,
+        after: uuid.UUID | None = None,
+        message_types: list[workbench_model.MessageType] = [workbench_model.MessageType.chat],
+        participant_ids: list[str] | None = None,
+        participant_role: workbench_model.ParticipantRole | None = None,
+    ) -> AsyncIterator[workbench_model.ConversationMessage]:
+        if self._message_cache is not None:
+            return self._iter_cached_messages(
+                after=after,
+                message_types=message_types,
+                participant_ids=participant_ids,
+                participant_role=participant_role,
+            )
+
+        return self._conversation_client.iter_messages(
+            after=after,
+            message_types=message_types,
+            participant_ids=participant_ids,
+            participant_role=participant_role,
+        )
+
+    async def _iter_cached_messages(
+        self,
+        after: uuid.UUID | None,
+        message_types: list[workbench_model.MessageType],
+        participant_ids: list[str] | None,
+        participant_role: workbench_model.ParticipantRole | None,
+    ) -> AsyncIterator[workbench_model.ConversationMessage]:
+        assert self._message_cache is not None
+        messages = await self._message_cache.get_messages(
+            self.assistant.id,
+            self.id,
+            load=self._iter_all_messages,
+            after=after,
+            message_types=message_types,
+            participant_ids=participant_ids,
+            participant_role=participant_role,
+        )
+        for message in messages:
+            yield message
+
+    def _iter_all_messages(self, after: uuid.UUID | None) -> AsyncIterator[workbench_model.ConversationMessage]:
+        return self._conversation_client.iter_messages(after=after, message_types=list(workbench_model.MessageType))
+
     async def send_conversation_state_event(self, state_event: workbench_model.AssistantStateEvent) -> None:
-        return await self._conversation_client.send_conversation_state_event(self.assistant.id, state_event)
+        """
+        Sends the state event to the workbench. When update coalescing is enabled, with the
+        conversation_update_coalesce_window_seconds setting, the event is sent after a short window, merged with any
+        other events for the same state; this then returns before the event is sent, and failures to send it are
+        logged rather than raised.
+        """
+        if self._update_coalescer is not None:
+            self._update_coalescer.state_event(
+                self.assistant.id, self.id, state_event, send=self._send_conversation_state_event
+            )
+            return
+
+        await self._send_conversation_state_event(state_event)
+
+    async def _send_conversation_state_event(self, state_event: workbench_model.AssistantStateEvent) -> None:
+        await self._conversation_client.send_conversation_state_event(self.assistant.id, state_event)
 
     async def write_file(
         self,
@@ -162,9 +258,11 @@ class ConversationContext:
 
     @asynccontextmanager
     async def read_file(
-        self, filename: str, chunk_size: int | None = None
+        self, filename: str, chunk_size: int | None = None, offset: int = 0, length: int | None = None
     ) -> AsyncGenerator[AsyncIterator[bytes], Any]:
-        async with self._conversation_client.read_file(filename, chunk_size=chunk_size) as stream:
+        async with self._conversation_client.read_file(
+            filename, chunk_size=chunk_size, offset=offset, length=length
+        ) as stream:
             yield stream
 
     async def get_file(self, filename: str) -> workbench_model.File | None:
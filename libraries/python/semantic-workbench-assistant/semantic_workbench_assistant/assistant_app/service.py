@@ -27,7 +27,10 @@ from semantic_workbench_api_model import assistant_model, workbench_model
 
 from .. import settings
 from ..assistant_service import FastAPIAssistantService
-from ..storage import read_model, write_model
+from ..event_scheduler import ConversationEventScheduler
+from ..message_cache import ConversationMessageCache
+from ..storage import read_model, write_text
+from .coalescer import ConversationUpdateCoalescer
 from .context import AssistantContext, ConversationContext
 from .error import BadRequestError, ConflictError, NotFoundError
 from .protocol import (
@@ -137,14 +140,33 @@ class AssistantService(FastAPIAssistantService):
 
         self._root_path = pathlib.Path(settings.storage.root)
         self._assistant_states_path = self._root_path / "assistant_states.json"
-        self._event_queue_lock = asyncio.Lock()
-        self._conversation_event_queues: dict[tuple[str, str], asyncio.Queue[_Event]] = {}
+        # the assistant states are read from the file once, and persisted from memory after changes
+        self._assistant_states: _PersistedAssistantStates | None = None
+        self._assistant_states_dirty = False
+        self._assistant_states_persist_lock = asyncio.Lock()
+        self._assistant_states_persist_task: asyncio.Task | None = None
+        self._event_scheduler = ConversationEventScheduler[_Event](
+            process=self._forward_queued_event,
+            max_concurrency=settings.event_scheduler.max_concurrency,
+            max_concurrency_per_assistant=settings.event_scheduler.max_concurrency_per_assistant,
+            metrics_log_interval_seconds=settings.event_scheduler.metrics_log_interval_seconds,
+        )
         self._conversation_event_tasks: set[asyncio.Task] = set()
         self._workbench_httpx_client = httpx.AsyncClient(
             transport=semantic_workbench_api_model.workbench_service_client.httpx_transport_factory(),
             timeout=httpx.Timeout(5.0, connect=10.0, read=60.0),
             base_url=str(settings.workbench_service_url),
         )
+        self._message_cache = (
+            ConversationMessageCache(max_messages=settings.message_cache.max_messages)
+            if settings.message_cache.enabled
+            else None
+        )
+        self._update_coalescer = (
+            ConversationUpdateCoalescer(window_seconds=settings.conversation_update_coalesce_window_seconds)
+            if settings.conversation_update_coalesce_window_seconds > 0
+            else None
+        )
         register_lifespan_handler(self.lifespan)
 
     @asynccontextmanager
@@ -154,9 +176,13 @@ class AssistantService(FastAPIAssistantService):
         try:
             yield
         finally:
+            if self._update_coalescer is not None:
+                await self._update_coalescer.flush()
             await self._workbench_httpx_client.aclose()
             await self.assistant_app.events._on_service_shutdown_handlers(True)
 
+            await self._event_scheduler.stop()
+
             for task in self._conversation_event_tasks:
                 task.cancel()
 
@@ -168,7 +194,47 @@ class AssistantService(FastAPIAssistantService):
                 if isinstance(result, Exception):
                     logging.exception("event handling task raised exception", exc_info=result)
 
+            # persisted before cancelling the delayed write, so that a write in progress is not interrupted
+            await self.persist_assistant_states()
+            if self._assistant_states_persist_task is not None:
+                self._assistant_states_persist_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._assistant_states_persist_task
+
     def read_assistant_states(self) -> _PersistedAssistantStates:
+        """
+        Returns a copy of the assistant states, which are read from the file on first use and held in memory. Changes
+        to the copy take effect when saved with write_assistant_states, so a change that fails part way through is not
+        applied. Reads and writes happen on the event loop, so a change made without awaiting between the read and
+        the write is not interleaved with other changes.
+        """
+        return self._shared_assistant_states().model_copy(deep=True)
+
+    def _assistant_states_for_update(
+        self, assistant_id: str
+    ) -> tuple[_PersistedAssistantStates, _AssistantState | None]:
+        """
+        Returns a copy of the assistant states for changing one assistant and its conversations, along with the copy of
+        that assistant's state. Only the containers that the change can modify are copied, so that changes stay cheap
+        for assistants with many conversations.
+        """
+        shared_states = self._shared_assistant_states()
+        states = shared_states.model_copy(update={"assistants": dict(shared_states.assistants)})
+        assistant_state = states.assistants.get(assistant_id)
+        if assistant_state is not None:
+            assistant_state = assistant_state.model_copy(update={"conversations": dict(assistant_state.conversations)})
+            states.assistants[assistant_id] = assistant_state
+        return states, assistant_state
+
+    def _shared_assistant_states(self) -> _PersistedAssistantStates:
+        """
+        Returns the assistant states held in memory, for lookups that do not change them.
+        """
+        if self._assistant_states is None:
+            self._assistant_states = self._read_assistant_states_file()
+        return self._assistant_states
+
+    def _read_assistant_states_file(self) -> _PersistedAssistantStates:
         states = None
         try:
             states = read_model(self._assistant_states_path, _PersistedAssistantStates)
@@ -184,7 +250,47 @@ class AssistantService(FastAPIAssistantService):
         return states or _PersistedAssistantStates()
 
     def write_assistant_states(self, new_states: _PersistedAssistantStates) -> None:
-        write_model(self._assistant_states_path, new_states)
+        """
+        Updates the assistant states in memory and schedules them to be persisted, so that a burst of changes results
+        in a single write of the file.
+        """
+        self._assistant_states = new_states
+        self._assistant_states_dirty = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            write_text(self._assistant_states_path, new_states.model_dump_json(indent=2))
+            self._assistant_states_dirty = False
+            return
+
+        if self._assistant_states_persist_task is None or self._assistant_states_persist_task.done():
+            self._assistant_states_persist_task = loop.create_task(self._persist_assistant_states_after_delay())
+
+    async def _persist_assistant_states_after_delay(self) -> None:
+        while self._assistant_states_dirty:
+            await asyncio.sleep(settings.assistant_states_persist_delay_seconds)
+            try:
+                await self.persist_assistant_states()
+            except Exception:
+                logger.exception("error persisting assistant states; path: %s", self._assistant_states_path)
+
+    async def persist_assistant_states(self) -> None:
+        """
+        Writes the assistant states to the file, if they have changed since they were last written.
+        """
+        async with self._assistant_states_persist_lock:
+            if not self._assistant_states_dirty or self._assistant_states is None:
+                return
+
+            # serialized on the event loop, so that the written states are consistent, and written off of it
+            data_json = self._assistant_states.model_dump_json(indent=2)
+            self._assistant_states_dirty = False
+            try:
+                await asyncio.to_thread(write_text, self._assistant_states_path, data_json)
+            except BaseException:
+                self._assistant_states_dirty = True
+                raise
 
     def _build_assistant_context(self, assistant_id: str, template_id: str, assistant_name: str) -> AssistantContext:
         return AssistantContext(
@@ -195,7 +301,7 @@ class AssistantService(FastAPIAssistantService):
         )
 
     def get_assistant_context(self, assistant_id: str) -> AssistantContext | None:
-        states = self.read_assistant_states()
+        states = self._shared_assistant_states()
         assistant_state = states.assistants.get(assistant_id)
         if assistant_state is None:
             return None
@@ -206,7 +312,7 @@ class AssistantService(FastAPIAssistantService):
         )
 
     def get_conversation_context(self, assistant_id: str, conversation_id: str) -> ConversationContext | None:
-        states = self.read_assistant_states()
+        states = self._shared_assistant_states()
         assistant_state = states.assistants.get(assistant_id)
         if assistant_state is None:
             return None
@@ -222,6 +328,8 @@ class AssistantService(FastAPIAssistantService):
             id=conversation_state.conversation_id,
             title=conversation_state.title,
             httpx_client=self._workbench_httpx_client,
+            message_cache=self._message_cache,
+            update_coalescer=self._update_coalescer,
         )
 
         content_interceptor = self.assistant_app.content_interceptor
@@ -278,9 +386,9 @@ class AssistantService(FastAPIAssistantService):
         from_export: IO[bytes] | None = None,
     ) -> assistant_model.AssistantResponseModel:
         is_new = False
-        states = self.read_assistant_states()
+        states, assistant_state = self._assistant_states_for_update(assistant_id)
 
-        assistant_state = states.assistants.get(assistant_id) or _AssistantState(
+        assistant_state = assistant_state or _AssistantState(
             assistant_id=assistant_id,
             assistant_name=assistant.assistant_name,
             template_id=assistant.template_id,
@@ -345,20 +453,22 @@ class AssistantService(FastAPIAssistantService):
         if assistant_context is None:
             return
 
-        states = self.read_assistant_states()
-        assistant_state = states.assistants.get(assistant_id)
+        assistant_state = self._shared_assistant_states().assistants.get(assistant_id)
 
         if assistant_state is None:
             return
 
         # delete conversations
-        for conversation_id in assistant_state.conversations:
+        for conversation_id in list(assistant_state.conversations):
             await self.delete_conversation(assistant_id, conversation_id)
 
-        states = self.read_assistant_states()
+        states, _ = self._assistant_states_for_update(assistant_id)
         states.assistants.pop(assistant_id, None)
         self.write_assistant_states(states)
 
+        if self._message_cache is not None:
+            self._message_cache.invalidate_assistant(assistant_id)
+
         await self.assistant_app.events.assistant._on_deleted_handlers(True, assistant_context)
 
     @translate_assistant_errors
@@ -390,16 +500,11 @@ class AssistantService(FastAPIAssistantService):
         conversation: assistant_model.ConversationPutRequestModel,
         from_export: IO[bytes] | None = None,
     ) -> assistant_model.ConversationResponseModel:
-        states = self.read_assistant_states()
-        assistant_state = require_found(states.assistants.get(assistant_id))
+        states, assistant_state = self._assistant_states_for_update(assistant_id)
+        assistant_state = require_found(assistant_state)
 
-        conversation_state = assistant_state.conversations.get(conversation_id) or _ConversationState(
-            conversation_id=conversation_id,
-            title=conversation.title,
-        )
         is_new = conversation_id not in assistant_state.conversations
-
-        conversation_state.title = conversation.title
+        conversation_state = _ConversationState(conversation_id=conversation_id, title=conversation.title)
 
         assistant_state.conversations[conversation_id] = conversation_state
         self.write_assistant_states(states)
@@ -444,85 +549,48 @@ class AssistantService(FastAPIAssistantService):
         if conversation_context is None:
             return None
 
-        states = self.read_assistant_states()
-        assistant_state = require_found(states.assistants.get(assistant_id))
+        states, assistant_state = self._assistant_states_for_update(assistant_id)
+        assistant_state = require_found(assistant_state)
         if assistant_state.conversations.pop(conversation_id, None) is None:
             return
         self.write_assistant_states(states)
 
+        if self._message_cache is not None:
+            self._message_cache.invalidate(assistant_id, conversation_id)
+
         await self.assistant_app.events.conversation._on_deleted_handlers(True, conversation_context)
 
-    async def _get_or_create_queue(self, assistant_id: str, conversation_id: str) -> asyncio.Queue[_Event]:
-        key = (assistant_id, conversation_id)
-        queue = self._conversation_event_queues.get(key)
-        if queue is not None:
-            return queue
-
-        async with self._event_queue_lock:
-            queue = self._conversation_event_queues.get(key)
-            if queue is not None:
-                return queue
-
-            queue = asyncio.Queue()
-            self._conversation_event_queues[key] = queue
-            task = asyncio.create_task(self._forward_events_from_queue(queue))
-            self._conversation_event_tasks.add(task)
-            task.add_done_callback(self._conversation_event_tasks.discard)
-            return queue
-
-    async def _forward_events_from_queue(self, queue: asyncio.Queue[_Event]) -> None:
+    async def _forward_queued_event(self, wrapper: _Event) -> None:
         """
-        De-queues events and makes the call to process_workbench_event.
+        Makes the call to process_workbench_event for an event, called by the event scheduler.
         """
-        while True:
-            try:
-                wrapper = None
-                try:
-                    async with asyncio.timeout(1):
-                        wrapper = await queue.get()
-                except asyncio.TimeoutError:
-                    continue
-
-                except RuntimeError as e:
-                    logging.exception("exception in _forward_events_from_queue loop")
-                    if e.args[0] == "Event loop is closed":
-                        break
-
-                queue.task_done()
+        assistant_id = wrapper.assistant_id
+        event = wrapper.event
 
-                if wrapper is None:
-                    continue
+        asgi_correlation_id.correlation_id.set(event.correlation_id)
 
-                assistant_id = wrapper.assistant_id
-                event = wrapper.event
-
-                asgi_correlation_id.correlation_id.set(event.correlation_id)
-
-                conversation_context = self.get_conversation_context(
-                    assistant_id=assistant_id,
-                    conversation_id=str(event.conversation_id),
-                )
-                if conversation_context is None:
-                    continue
-
-                timestamp_now = datetime.datetime.now(datetime.UTC)
+        conversation_context = self.get_conversation_context(
+            assistant_id=assistant_id,
+            conversation_id=str(event.conversation_id),
+        )
+        if conversation_context is None:
+            return
 
-                start = perf_counter()
-                await self._forward_event(conversation_context, event)
-                end = perf_counter()
+        timestamp_now = datetime.datetime.now(datetime.UTC)
 
-                logger.debug(
-                    "forwarded event to event handler; assistant_id: %s, conversation_id: %s, event_id: %s, event: %s, time-since-event: %s, time-taken: %s",
-                    assistant_id,
-                    event.conversation_id,
-                    event.id,
-                    event.event,
-                    timestamp_now - event.timestamp,
-                    datetime.timedelta(seconds=end - start),
-                )
+        start = perf_counter()
+        await self._forward_event(conversation_context, event)
+        end = perf_counter()
 
-            except Exception:
-                logging.exception("exception in _forward_events_from_queue loop")
+        logger.debug(
+            "forwarded event to event handler; assistant_id: %s, conversation_id: %s, event_id: %s, event: %s, time-since-event: %s, time-taken: %s",
+            assistant_id,
+            event.conversation_id,
+            event.id,
+            event.event,
+            timestamp_now - event.timestamp,
+            datetime.timedelta(seconds=end - start),
+        )
 
     @translate_assistant_errors
     async def post_conversation_event(
@@ -532,13 +600,17 @@ class AssistantService(FastAPIAssistantService):
         event: workbench_model.ConversationEvent,
     ) -> None:
         """
-        Receives events from semantic workbench and buffers them in a queue to avoid keeping
+        Receives events from semantic workbench and queues them with the event scheduler to avoid keeping
         the workbench waiting.
         """
         _ = require_found(self.get_conversation_context(assistant_id, conversation_id))
 
-        queue = await self._get_or_create_queue(assistant_id=assistant_id, conversation_id=conversation_id)
-        await queue.put(_Event(assistant_id=assistant_id, event=event))
+        # applied on receipt, in the order sent by the workbench, so that reads from event handlers see the same
+        # messages as they would from the workbench
+        if self._message_cache is not None:
+            self._message_cache.apply_event(assistant_id, event)
+
+        self._event_scheduler.submit(assistant_id, conversation_id, _Event(assistant_id=assistant_id, event=event))
 
     async def _forward_event(
         self,
@@ -446,6 +446,29 @@ def _assistant_service_api(
     ) -> None:
         return await service.post_conversation_event(assistant_id, conversation_id, event)
 
+    @app.post(
+        "/{assistant_id}/events",
+        description="Notify assistant of events in its conversations, in order",
+        status_code=status.HTTP_204_NO_CONTENT,
+    )
+    async def post_conversation_events(
+        assistant_id: str,
+        events: list[workbench_model.ConversationEvent],
+    ) -> None:
+        for event in events:
+            try:
+                await service.post_conversation_event(assistant_id, str(event.conversation_id), event)
+            except HTTPException as e:
+                if e.status_code != status.HTTP_404_NOT_FOUND:
+                    raise
+                # the events for other conversations are still handled
+                logger.warning(
+                    "skipped event for unknown conversation; assistant_id: %s, conversation_id: %s, event: %s",
+                    assistant_id,
+                    event.conversation_id,
+                    event.event,
+                )
+
     @app.get(
         "/{assistant_id}/conversations/{conversation_id}/states",
         description="Get the descriptions of the states available for a conversation",
@@ -0,0 +1,198 @@
+import asyncio
+import collections
+import contextlib
+import logging
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+
+class EventSchedulerSettings(BaseSettings):
+    model_config = SettingsConfigDict(extra="allow")
+
+    # the number of conversations that events are processed for at once, across all assistants
+    max_concurrency: int = 50
+    # the number of conversations that events are processed for at once, for each assistant
+    max_concurrency_per_assistant: int | None = None
+    metrics_log_interval_seconds: float = 60.0
+
+
+ItemT = TypeVar("ItemT")
+
+
+@dataclass
+class EventSchedulerMetrics:
+    queued_event_count: int
+    queued_conversation_count: int
+    active_conversation_count: int
+    processed_event_count: int
+    max_wait_seconds: float
+    mean_wait_seconds: float
+
+
+@dataclass
+class _ConversationQueue(Generic[ItemT]):
+    assistant_id: str
+    events: collections.deque[tuple[ItemT, float]] = field(default_factory=collections.deque)
+
+
+class ConversationEventScheduler(Generic[ItemT]):
+    """
+    Processes events with a fixed pool of workers. Events for a conversation are processed one at a time, in the
+    order they are submitted, while events for different conversations are processed concurrently, up to
+    max_concurrency, and up to max_concurrency_per_assistant for each assistant.
+
+    Conversations are queued for the workers while they have events to process, and are removed once their events
+    have been processed, so idle conversations do not hold queues or tasks.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[ItemT], Awaitable[None]],
+        max_concurrency: int,
+        max_concurrency_per_assistant: int | None = None,
+        metrics_log_interval_seconds: float = 60.0,
+    ) -> None:
+        self._process = process
+        self._max_concurrency = max_concurrency
+        self._max_concurrency_per_assistant = max_concurrency_per_assistant
+        self._metrics_log_interval_seconds = metrics_log_interval_seconds
+
+        # conversations with queued events; a conversation is in _ready, _deferred or being processed while present
+        self._conversations: dict[tuple[str, str], _ConversationQueue[ItemT]] = {}
+        self._ready: asyncio.Queue[tuple[str, str]] | None = None
+        # conversations waiting for the assistant to drop below its concurrency limit
+        self._deferred: dict[str, collections.deque[tuple[str, str]]] = collections.defaultdict(collections.deque)
+        self._active_per_assistant: collections.Counter[str] = collections.Counter()
+        self._tasks: set[asyncio.Task] = set()
+
+        self._queued_event_count = 0
+        self._active_conversation_count = 0
+        self._processed_event_count = 0
+        self._wait_seconds_total = 0.0
+        self._max_wait_seconds = 0.0
+
+    def submit(self, assistant_id: str, conversation_id: str, item: ItemT) -> None:
+        ready = self._start()
+
+        key = (assistant_id, conversation_id)
+        conversation = self._conversations.get(key)
+        is_new = conversation is None
+        if conversation is None:
+            conversation = _ConversationQueue[ItemT](assistant_id=assistant_id)
+            self._conversations[key] = conversation
+
+        conversation.events.append((item, perf_counter()))
+        self._queued_event_count += 1
+
+        if is_new:
+            ready.put_nowait(key)
+
+    def _start(self) -> asyncio.Queue[tuple[str, str]]:
+        if self._ready is not None:
+            return self._ready
+
+        self._ready = asyncio.Queue()
+        for _ in range(self._max_concurrency):
+            self._create_task(self._worker(self._ready))
+        if self._metrics_log_interval_seconds > 0:
+            self._create_task(self._log_metrics())
+        return self._ready
+
+    def _create_task(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)  # type: ignore
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        self._ready = None
+        self._conversations.clear()
+        self._deferred.clear()
+        self._queued_event_count = 0
+
+    async def _worker(self, ready: asyncio.Queue[tuple[str, str]]) -> None:
+        while True:
+            key = await ready.get()
+            conversation = self._conversations[key]
+
+            assistant_id = conversation.assistant_id
+            if (
+                self._max_concurrency_per_assistant is not None
+                and self._active_per_assistant[assistant_id] >= self._max_concurrency_per_assistant
+            ):
+                self._deferred[assistant_id].append(key)
+                continue
+
+            item, submitted = conversation.events.popleft()
+            self._queued_event_count -= 1
+            self._active_conversation_count += 1
+            self._active_per_assistant[assistant_id] += 1
+
+            wait_seconds = perf_counter() - submitted
+
+            try:
+                await self._process(item)
+            except Exception:
+                logger.exception("exception processing event; assistant_id: %s, conversation_id: %s", *key)
+            finally:
+                self._processed_event_count += 1
+                self._wait_seconds_total += wait_seconds
+                self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+                self._active_conversation_count -= 1
+                self._active_per_assistant[assistant_id] -= 1
+                if not self._active_per_assistant[assistant_id]:
+                    del self._active_per_assistant[assistant_id]
+
+                # the conversation goes to the back of the queue, after other conversations with events, so that a
+                # busy conversation does not hold a worker
+                if conversation.events:
+                    ready.put_nowait(key)
+                else:
+                    del self._conversations[key]
+
+                deferred = self._deferred.get(assistant_id)
+                if deferred:
+                    ready.put_nowait(deferred.popleft())
+                    if not deferred:
+                        del self._deferred[assistant_id]
+
+    async def _log_metrics(self) -> None:
+        last_processed_event_count = 0
+        while True:
+            await asyncio.sleep(self._metrics_log_interval_seconds)
+            metrics = self.metrics()
+            if metrics.processed_event_count == last_processed_event_count and not metrics.queued_event_count:
+                continue
+            last_processed_event_count = metrics.processed_event_count
+            logger.info(
+                "event scheduler metrics; queued events: %d, queued conversations: %d, active conversations: %d,"
+                " processed events: %d, wait mean: %.3fs, wait max: %.3fs",
+                metrics.queued_event_count,
+                metrics.queued_conversation_count,
+                metrics.active_conversation_count,
+                metrics.processed_event_count,
+                metrics.mean_wait_seconds,
+                metrics.max_wait_seconds,
+            )
+
+    def metrics(self) -> EventSchedulerMetrics:
+        return EventSchedulerMetrics(
+            queued_event_count=self._queued_event_count,
+            queued_conversation_count=len(self._conversations) - self._active_conversation_count,
+            active_conversation_count=self._active_conversation_count,
+            processed_event_count=self._processed_event_count,
+            max_wait_seconds=self._max_wait_seconds,
+            mean_wait_seconds=self._wait_seconds_total / self._processed_event_count
+            if self._processed_event_count
+            else 0.0,
+        )
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Iterable
+
+from pydantic import ValidationError
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from semantic_workbench_api_model import workbench_model
+
+logger = logging.getLogger(__name__)
+
+
+class MessageCacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(extra="allow")
+
+    # when enabled, ConversationContext.get_messages is served from messages cached from conversation events
+    enabled: bool = False
+    # the total number of messages cached across all conversations
+    max_messages: int = 50_000
+
+
+LoadMessages = Callable[[uuid.UUID | None], AsyncIterator[workbench_model.ConversationMessage]]
+"""Returns all of the messages in the conversation, of all types, after the given message id, oldest first."""
+
+
+@dataclass
+class MessageCacheMetrics:
+    conversation_count: int
+    message_count: int
+    hit_count: int
+    miss_count: int
+    backfill_count: int
+    eviction_count: int
+
+
+@dataclass
+class _CachedConversation:
+    messages: list[workbench_model.ConversationMessage] = field(default_factory=list)
+    message_ids: set[uuid.UUID] = field(default_factory=set)
+    # set when a gap is detected in the events, to be filled from the workbench on the next read
+    stale: bool = False
+
+
+@dataclass
+class _Load:
+    # loads of a conversation are serialized, even across evictions, so that it is loaded once by concurrent readers
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    waiting_count: int = 0
+    # set when a message event for the conversation is received during the load
+    message_event_received: bool = False
+
+
+class ConversationMessageCache:
+    """
+    Bounded, in-memory cache of the messages in conversations, kept in sync from the message created and deleted
+    events received from the workbench.
+
+    Conversations are loaded in full on first read. Each message created event carries the id of the message that
+    precedes it in the conversation, so missed or re-ordered events are detected and filled from the workbench on
+    the next read. Least recently used conversations are evicted when the cache holds more than max_messages.
+    """
+
+    def __init__(self, max_messages: int) -> None:
+        self._max_messages = max_messages
+        self._conversations: OrderedDict[tuple[str, str], _CachedConversation] = OrderedDict()
+        self._loads: dict[tuple[str, str], _Load] = {}
+        self._message_count = 0
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._backfill_count = 0
+        self._eviction_count = 0
+
+    def apply_event(self, assistant_id: str, event: workbench_model.ConversationEvent) -> None:
+        key = (assistant_id, str(event.conversation_id))
+
+        if event.event not in (
+            workbench_model.ConversationEventType.message_created,
+            workbench_model.ConversationEventType.message_deleted,
+        ):
+            return
+
+        conversation_load = self._loads.get(key)
+        if conversation_load is not None:
+            conversation_load.message_event_received = True
+
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            return
+
+        try:
+            message = workbench_model.ConversationMessage.model_validate(event.data.get("message", {}))
+        except ValidationError:
+            logger.warning("invalid message event data, evicting conversation from cache; key: %s", key)
+            self.invalidate(*key)
+            return
+
+        if event.event == workbench_model.ConversationEventType.message_deleted:
+            if message.id in conversation.message_ids:
+                conversation.message_ids.discard(message.id)
+                conversation.messages = [m for m in conversation.messages if m.id != message.id]
+                self._message_count -= 1
+            return
+
+        if message.id in conversation.message_ids:
+            # already received through a backfill
+            return
+
+        previous_message_id = event.data.get("previous_message_id")
+        last_message_id = str(conversation.messages[-1].id) if conversation.messages else None
+        if previous_message_id == last_message_id:
+            conversation.messages.append(message)
+            conversation.message_ids.add(message.id)
+            self._message_count += 1
+            self._evict()
+            return
+
+        if previous_message_id is not None and uuid.UUID(previous_message_id) in conversation.message_ids:
+            # the message belongs before messages that are already cached; rather than re-ordering, reload
+            logger.debug("out of order message event, evicting conversation from cache; key: %s", key)
+            self.invalidate(*key)
+            return
+
+        logger.debug("gap in message events, marking conversation for backfill; key: %s", key)
+        conversation.stale = True
+
+    def mark_stale(self, assistant_id: str, conversation_id: str) -> None:
+        conversation = self._conversations.get((assistant_id, conversation_id))
+        if conversation is not None:
+            conversation.stale = True
+
+    def invalidate(self, assistant_id: str, conversation_id: str) -> None:
+        conversation = self._conversations.pop((assistant_id, conversation_id), None)
+        if conversation is not None:
+            self._message_count -= len(conversation.messages)
+
+    def invalidate_assistant(self, assistant_id: str) -> None:
+        for key in [key for key in self._conversations if key[0] == assistant_id]:
+            self.invalidate(*key)
+
+    async def get_messages(
+        self,
+        assistant_id: str,
+        conversation_id: str,
+        load: LoadMessages,
+        before: uuid.UUID | None = None,
+        after: uuid.UUID | None = None,
+        message_types: Iterable[workbench_model.MessageType] | None = None,
+        participant_ids: Iterable[str] | None = None,
+        participant_role: workbench_model.ParticipantRole | None = None,
+        limit: int | None = None,
+    ) -> list[workbench_model.ConversationMessage]:
+        """
+        Returns the messages in the conversation, filtered and limited as by the workbench service. Loads the
+        conversation with load on a miss, and fills gaps with load on a stale hit.
+        """
+        messages = await self._get_conversation_messages(assistant_id, conversation_id, load)
+
+        message_types = set(message_types or [])
+        participant_ids = set(participant_ids or [])
+        before_index = next((i for i, m in enumerate(messages) if m.id == before), None) if before else None
+        after_index = next((i for i, m in enumerate(messages) if m.id == after), None) if after else None
+
+        filtered = [
+            message
+            for index, message in enumerate(messages)
+            if (before_index is None or index < before_index)
+            and (after_index is None or index > after_index)
+            and (not message_types or message.message_type in message_types)
+            and (not participant_ids or message.sender.participant_id in participant_ids)
+            and (participant_role is None or message.sender.participant_role == participant_role)
+        ]
+
+        if limit is None:
+            return filtered
+        return filtered[-limit:] if limit else []
+
+    async def _get_conversation_messages(
+        self, assistant_id: str, conversation_id: str, load: LoadMessages
+    ) -> list[workbench_model.ConversationMessage]:
+        key = (assistant_id, conversation_id)
+
+        conversation = self._conversations.get(key)
+        if conversation is not None and not conversation.stale:
+            self._hit_count += 1
+            self._conversations.move_to_end(key)
+            return conversation.messages
+
+        conversation_load = self._loads.get(key)
+        if conversation_load is None:
+            conversation_load = _Load()
+            self._loads[key] = conversation_load
+
+        conversation_load.waiting_count += 1
+        try:
+            async with conversation_load.lock:
+                return await self._load_conversation_messages(key, load, conversation_load)
+
+        finally:
+            conversation_load.waiting_count -= 1
+            if conversation_load.waiting_count == 0:
+                del self._loads[key]
+
+    async def _load_conversation_messages(
+        self, key: tuple[str, str], load: LoadMessages, conversation_load: _Load
+    ) -> list[workbench_model.ConversationMessage]:
+        conversation = self._conversations.get(key)
+        if conversation is not None and not conversation.stale:
+            # loaded by a concurrent reader
+            self._hit_count += 1
+            self._conversations.move_to_end(key)
+            return conversation.messages
+
+        is_backfill = conversation is not None
+        if conversation is None:
+            conversation = _CachedConversation()
+            self._miss_count += 1
+        else:
+            self._backfill_count += 1
+
+        after = conversation.messages[-1].id if conversation.messages else None
+        conversation_load.message_event_received = False
+        new_messages = [message async for message in load(after)]
+        # events received while loading may not be reflected in the loaded messages
+        event_during_load = conversation_load.message_event_received
+
+        if is_backfill and key not in self._conversations:
+            # evicted during the backfill
+            return conversation.messages + new_messages
+
+        for message in new_messages:
+            if message.id in conversation.message_ids:
+                continue
+            conversation.messages.append(message)
+            conversation.message_ids.add(message.id)
+            if is_backfill:
+                self._message_count += 1
+
+        if not is_backfill:
+            if len(conversation.messages) > self._max_messages:
+                return conversation.messages
+            self._conversations[key] = conversation
+            self._message_count += len(conversation.messages)
+
+        conversation.stale = event_during_load
+        self._conversations.move_to_end(key)
+        messages = conversation.messages
+        self._evict()
+        return messages
+
+    def _evict(self) -> None:
+        while self._message_count > self._max_messages and self._conversations:
+            _, conversation = self._conversations.popitem(last=False)
+            self._message_count -= len(conversation.messages)
+            self._eviction_count += 1
+
+    def metrics(self) -> MessageCacheMetrics:
+        return MessageCacheMetrics(
+            conversation_count=len(self._conversations),
+            message_count=self._message_count,
+            hit_count=self._hit_count,
+            miss_count=self._miss_count,
+            backfill_count=self._backfill_count,
+            eviction_count=self._eviction_count,
+        )
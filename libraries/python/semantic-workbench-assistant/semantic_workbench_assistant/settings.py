@@ -3,6 +3,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from semantic_workbench_assistant.logging_config import LoggingSettings
 
+from .event_scheduler import EventSchedulerSettings
+from .message_cache import MessageCacheSettings
 from .storage import FileStorageSettings
 
 
@@ -13,6 +15,13 @@ class Settings(BaseSettings):
 
     storage: FileStorageSettings = FileStorageSettings(root=".data/assistants")
     logging: LoggingSettings = LoggingSettings()
+    message_cache: MessageCacheSettings = MessageCacheSettings()
+    event_scheduler: EventSchedulerSettings = EventSchedulerSettings()
+    # changes to assistant and conversation registrations within this delay are persisted in a single write
+    assistant_states_persist_delay_seconds: float = 0.5
+    # assistant state events and status updates sent for a conversation within this window are merged, and sent after
+    # the window, with failures logged rather than raised to the caller; 0 disables merging
+    conversation_update_coalesce_window_seconds: float = 0.0
 
     workbench_service_url: HttpUrl = HttpUrl("http://127.0.0.1:3000")
     workbench_service_api_key: str = ""
@@ -1,6 +1,7 @@
 import logging
 import os
 import pathlib
+import tempfile
 from typing import Any, Iterator, TypeVar
 
 from pydantic import BaseModel
@@ -21,12 +22,25 @@ def write_model(
     serialization_context: dict[str, Any] | None = None,
 ) -> None:
     """Write a pydantic model to a file."""
+    data_json = value.model_dump_json(context=serialization_context, indent=2)
+    write_text(file_path, data_json)
+
+
+def write_text(file_path: os.PathLike, text: str) -> None:
+    """Write text to a file, replacing the file atomically so that readers never see a partial write."""
     path = pathlib.Path(file_path)
-    if not path.parent.exists():
-        path.parent.mkdir(parents=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
 
-    data_json = value.model_dump_json(context=serialization_context, indent=2)
-    path.write_text(data_json, encoding="utf-8")
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as temp_file:
+        temp_file.write(text)
+
+    try:
+        os.replace(temp_file.name, path)
+    except BaseException:
+        os.unlink(temp_file.name)
+        raise
 
 
 ModelT = TypeVar("ModelT", bound=BaseModel)
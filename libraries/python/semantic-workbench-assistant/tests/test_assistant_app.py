@@ -227,6 +227,45 @@ async def test_assistant_with_event_handlers(
         # this should have been called
         assert message_created_all_calls == 3
 
+        # send a batch of messages, after an event for a conversation the assistant does not know, which is skipped
+        await instance_client.post_conversation_events(
+            events=[
+                workbench_model.ConversationEvent(
+                    conversation_id=uuid.uuid4(),
+                    correlation_id="",
+                    event=workbench_model.ConversationEventType.conversation_updated,
+                    data={},
+                )
+            ]
+            + [
+                workbench_model.ConversationEvent(
+                    conversation_id=conversation_id,
+                    correlation_id="",
+                    event=workbench_model.ConversationEventType.message_created,
+                    data={
+                        "message": workbench_model.ConversationMessage(
+                            id=uuid.uuid4(),
+                            sender=workbench_model.MessageSender(
+                                participant_role=workbench_model.ParticipantRole.user, participant_id="user"
+                            ),
+                            message_type=workbench_model.MessageType.chat,
+                            timestamp=datetime.datetime.now(),
+                            content_type="text/plain",
+                            content=f"Hello, world {index}",
+                            filenames=[],
+                            metadata={},
+                            has_debug_data=False,
+                        ).model_dump(mode="json")
+                    },
+                )
+                for index in range(2)
+            ]
+        )
+
+        assert message_chat_created_calls == 3
+        assert message_created_calls == 4
+        assert message_created_all_calls == 5
+
 
 async def test_assistant_with_inspector(
     monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+import pathlib
+import time
+
+import pytest
+from semantic_workbench_assistant import settings, storage
+from semantic_workbench_assistant.assistant_app import AssistantApp
+from semantic_workbench_assistant.assistant_app import service as assistant_service
+from semantic_workbench_assistant.assistant_app.service import (
+    AssistantService,
+    _AssistantState,
+    _ConversationState,
+    _PersistedAssistantStates,
+)
+
+logger = logging.getLogger(__name__)
+
+# set WORKBENCH_PYTEST_BENCHMARK_CONVERSATION_COUNT=100000 for a larger benchmark
+CONVERSATION_COUNT = int(os.environ.get("WORKBENCH_PYTEST_BENCHMARK_CONVERSATION_COUNT") or 10_000)
+
+
+def _assistant_service() -> AssistantService:
+    app = AssistantApp(
+        assistant_service_id="assistant_service_id",
+        assistant_service_name="service name",
+        assistant_service_description="service description",
+    )
+    return AssistantService(assistant_app=app, register_lifespan_handler=lambda _: None)
+
+
+def _states(conversation_count: int) -> _PersistedAssistantStates:
+    return _PersistedAssistantStates(
+        assistants={
+            "assistant-id": _AssistantState(
+                assistant_id="assistant-id",
+                assistant_name="assistant",
+                conversations={
+                    f"conversation-{i}": _ConversationState(conversation_id=f"conversation-{i}", title=f"title {i}")
+                    for i in range(conversation_count)
+                },
+            )
+        }
+    )
+
+
+async def test_assistant_states_write_behind(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+    monkeypatch.setattr(settings, "assistant_states_persist_delay_seconds", 0.05)
+
+    write_count = 0
+    write_text = storage.write_text
+
+    def counting_write_text(file_path: os.PathLike, text: str) -> None:
+        nonlocal write_count
+        write_count += 1
+        write_text(file_path, text)
+
+    monkeypatch.setattr(assistant_service, "write_text", counting_write_text)
+
+    service = _assistant_service()
+    path = pathlib.Path(storage_settings.root) / "assistant_states.json"
+
+    for i in range(10):
+        states = service.read_assistant_states()
+        states.assistants[f"assistant-{i}"] = _AssistantState(assistant_id=f"assistant-{i}", assistant_name="name")
+        service.write_assistant_states(states)
+
+    # changes are visible immediately, and persisted after the delay, in a single write
+    assert service.get_assistant_context("assistant-9") is not None
+    assert not path.exists()
+
+    await asyncio.sleep(0.2)
+    assert write_count == 1
+    assert storage.read_model(path, _PersistedAssistantStates) == service.read_assistant_states()
+    assert not [p for p in path.parent.iterdir() if p != path]
+
+    # a new service reads the persisted states
+    assert _assistant_service().get_assistant_context("assistant-9") is not None
+
+
+async def test_delete_assistant_with_conversations(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+
+    service = _assistant_service()
+    service.write_assistant_states(_states(conversation_count=2))
+
+    await service.delete_assistant("assistant-id")
+
+    assert service.get_assistant_context("assistant-id") is None
+    assert service.read_assistant_states().assistants == {}
+
+
+async def test_read_assistant_states_returns_copy(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+
+    service = _assistant_service()
+    service.write_assistant_states(_states(conversation_count=2))
+
+    # changes that are not written, such as those of a caller that raises part way through, are not applied
+    states = service.read_assistant_states()
+    states.assistants["assistant-id"].conversations.pop("conversation-0")
+    states.assistants.pop("assistant-id")
+
+    assert service.get_conversation_context("assistant-id", "conversation-0") is not None
+
+
+@pytest.mark.benchmark
+async def test_conversation_context_lookup_benchmark(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+    path = pathlib.Path(storage_settings.root) / "assistant_states.json"
+    storage.write_model(path, _states(CONVERSATION_COUNT))
+
+    service = _assistant_service()
+
+    # for comparison, reading the file for each lookup
+    file_lookup_count = 20
+    start = time.perf_counter()
+    for i in range(file_lookup_count):
+        states = storage.read_model(path, _PersistedAssistantStates)
+        assert states is not None
+        assert states.assistants["assistant-id"].conversations.get(f"conversation-{i}") is not None
+    file_lookup_duration = (time.perf_counter() - start) / file_lookup_count
+
+    lookup_count = 10_000
+    start = time.perf_counter()
+    for i in range(lookup_count):
+        assert service.get_conversation_context("assistant-id", f"conversation-{i % CONVERSATION_COUNT}") is not None
+    lookup_duration = (time.perf_counter() - start) / lookup_count
+
+    logger.info(
+        "conversation context lookup benchmark; conversations: %d, file size: %dkB, lookup duration;"
+        " from file: %.3fms, from memory: %.3fms",
+        CONVERSATION_COUNT,
+        path.stat().st_size // 1024,
+        file_lookup_duration * 1_000,
+        lookup_duration * 1_000,
+    )
@@ -0,0 +1,74 @@
+import asyncio
+
+from semantic_workbench_api_model import workbench_model
+from semantic_workbench_assistant.assistant_app.coalescer import ConversationUpdateCoalescer
+
+
+async def test_coalescer_merges_bursts_of_updates() -> None:
+    coalescer = ConversationUpdateCoalescer(window_seconds=0.05)
+    sent_state_events: list[tuple[str, str]] = []
+    sent_statuses: list[str | None] = []
+
+    async def send_state_event(state_event: workbench_model.AssistantStateEvent) -> None:
+        sent_state_events.append((state_event.state_id, state_event.event))
+
+    async def send_status(status: str | None) -> None:
+        sent_statuses.append(status)
+
+    for _ in range(10):
+        for state_id in ("brief", "requests"):
+            coalescer.state_event(
+                "assistant-id",
+                "conversation-id",
+                workbench_model.AssistantStateEvent(state_id=state_id, event="updated", state=None),
+                send=send_state_event,
+            )
+    coalescer.state_event(
+        "assistant-id",
+        "conversation-id",
+        workbench_model.AssistantStateEvent(state_id="brief", event="focus", state=None),
+        send=send_state_event,
+    )
+    coalescer.status("assistant-id", "conversation-id", "thinking...", send=send_status)
+    coalescer.status("assistant-id", "conversation-id", None, send=send_status)
+
+    await asyncio.sleep(0.1)
+
+    assert sent_state_events == [("brief", "updated"), ("requests", "updated"), ("brief", "focus")]
+    assert sent_statuses == [None]
+
+    metrics = coalescer.metrics()
+    assert metrics.state_event_count == 21
+    assert metrics.collapsed_state_event_count == 18
+    assert metrics.status_update_count == 2
+    assert metrics.collapsed_status_update_count == 1
+
+    # updates after the window are sent separately
+    coalescer.status("assistant-id", "conversation-id", "done", send=send_status)
+    await coalescer.flush()
+    assert sent_statuses == [None, "done"]
+
+
+async def test_coalescer_sends_in_arrival_order_and_serializes_windows() -> None:
+    coalescer = ConversationUpdateCoalescer(window_seconds=0.01)
+    sent: list[str | None] = []
+
+    async def send_state_event(state_event: workbench_model.AssistantStateEvent) -> None:
+        sent.append(state_event.state_id)
+
+    async def send_status(status: str | None) -> None:
+        # the first status is slow to send, so that a later window flushes while it is still being sent
+        if status == "thinking...":
+            await asyncio.sleep(0.05)
+        sent.append(status)
+
+    state_event = workbench_model.AssistantStateEvent(state_id="brief", event="updated", state=None)
+    coalescer.status("assistant-id", "conversation-id", "thinking...", send=send_status)
+    coalescer.state_event("assistant-id", "conversation-id", state_event, send=send_state_event)
+
+    # the next window starts while the first is being sent
+    await asyncio.sleep(0.02)
+    coalescer.status("assistant-id", "conversation-id", None, send=send_status)
+
+    await asyncio.sleep(0.1)
+    assert sent == ["thinking...", "brief", None]
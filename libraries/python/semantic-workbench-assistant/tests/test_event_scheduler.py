@@ -0,0 +1,87 @@
+import asyncio
+import collections
+
+from semantic_workbench_assistant.event_scheduler import ConversationEventScheduler
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.001) -> None:
+        self.delay = delay
+        self.processed: dict[tuple[str, str], list[int]] = collections.defaultdict(list)
+        self.active: collections.Counter[str] = collections.Counter()
+        self.max_active = 0
+        self.max_active_per_assistant: collections.Counter[str] = collections.Counter()
+        self.active_conversations: set[tuple[str, str]] = set()
+
+    async def process(self, item: tuple[str, str, int]) -> None:
+        assistant_id, conversation_id, index = item
+        key = (assistant_id, conversation_id)
+        assert key not in self.active_conversations, "events for a conversation must be processed one at a time"
+
+        self.active_conversations.add(key)
+        self.active[assistant_id] += 1
+        self.max_active = max(self.max_active, len(self.active_conversations))
+        self.max_active_per_assistant[assistant_id] = max(
+            self.max_active_per_assistant[assistant_id], self.active[assistant_id]
+        )
+        try:
+            await asyncio.sleep(self.delay)
+            self.processed[key].append(index)
+        finally:
+            self.active[assistant_id] -= 1
+            self.active_conversations.discard(key)
+
+
+async def _wait_for_processing(scheduler: ConversationEventScheduler, event_count: int) -> None:
+    async with asyncio.timeout(10):
+        while scheduler.metrics().processed_event_count < event_count:
+            await asyncio.sleep(0.01)
+
+
+async def test_event_scheduler_burst_of_conversations() -> None:
+    recorder = Recorder()
+    scheduler = ConversationEventScheduler(process=recorder.process, max_concurrency=20)
+
+    conversation_count = 500
+    events_per_conversation = 5
+    try:
+        for index in range(events_per_conversation):
+            for conversation in range(conversation_count):
+                scheduler.submit(
+                    "assistant-id", f"conversation-{conversation}", ("assistant-id", f"{conversation}", index)
+                )
+
+        await _wait_for_processing(scheduler, conversation_count * events_per_conversation)
+    finally:
+        await scheduler.stop()
+
+    assert recorder.max_active == 20
+    assert len(recorder.processed) == conversation_count
+    for indexes in recorder.processed.values():
+        assert indexes == list(range(events_per_conversation))
+
+    metrics = scheduler.metrics()
+    assert metrics.queued_event_count == 0
+    assert metrics.queued_conversation_count == 0
+    assert metrics.active_conversation_count == 0
+    assert metrics.max_wait_seconds > 0
+
+
+async def test_event_scheduler_per_assistant_limit() -> None:
+    recorder = Recorder()
+    scheduler = ConversationEventScheduler(
+        process=recorder.process, max_concurrency=10, max_concurrency_per_assistant=2
+    )
+
+    try:
+        for conversation in range(20):
+            for assistant_id in ("busy-assistant", "other-assistant"):
+                scheduler.submit(assistant_id, f"conversation-{conversation}", (assistant_id, f"{conversation}", 0))
+        scheduler.submit("quiet-assistant", "conversation", ("quiet-assistant", "conversation", 0))
+
+        await _wait_for_processing(scheduler, 41)
+    finally:
+        await scheduler.stop()
+
+    assert recorder.max_active_per_assistant == {"busy-assistant": 2, "other-assistant": 2, "quiet-assistant": 1}
+    assert len(recorder.processed) == 41
@@ -0,0 +1,207 @@
+import asyncio
+import datetime
+import uuid
+from typing import AsyncIterator
+
+from semantic_workbench_api_model import workbench_model
+from semantic_workbench_assistant.message_cache import ConversationMessageCache
+
+
+def _message(
+    content: str, message_type: workbench_model.MessageType = workbench_model.MessageType.chat
+) -> workbench_model.ConversationMessage:
+    return workbench_model.ConversationMessage(
+        id=uuid.uuid4(),
+        sender=workbench_model.MessageSender(
+            participant_id="user-id", participant_role=workbench_model.ParticipantRole.user
+        ),
+        message_type=message_type,
+        timestamp=datetime.datetime.now(datetime.UTC),
+        content_type="text/plain",
+        content=content,
+        filenames=[],
+        metadata={},
+        has_debug_data=False,
+    )
+
+
+class FakeWorkbench:
+    def __init__(self, conversation_id: str) -> None:
+        self.conversation_id = conversation_id
+        self.messages: list[workbench_model.ConversationMessage] = []
+        self.load_calls: list[uuid.UUID | None] = []
+        # when set, loads wait for it
+        self.load_gate: asyncio.Event | None = None
+
+    def create(self, content: str, message_type: workbench_model.MessageType = workbench_model.MessageType.chat):
+        previous_message_id = str(self.messages[-1].id) if self.messages else None
+        message = _message(content, message_type)
+        self.messages.append(message)
+        return workbench_model.ConversationEvent(
+            conversation_id=uuid.UUID(self.conversation_id),
+            event=workbench_model.ConversationEventType.message_created,
+            data={"message": message.model_dump(mode="json"), "previous_message_id": previous_message_id},
+        )
+
+    def delete(self, message: workbench_model.ConversationMessage) -> workbench_model.ConversationEvent:
+        self.messages.remove(message)
+        return workbench_model.ConversationEvent(
+            conversation_id=uuid.UUID(self.conversation_id),
+            event=workbench_model.ConversationEventType.message_deleted,
+            data={"message": message.model_dump(mode="json")},
+        )
+
+    async def load(self, after: uuid.UUID | None) -> AsyncIterator[workbench_model.ConversationMessage]:
+        self.load_calls.append(after)
+        if self.load_gate is not None:
+            await self.load_gate.wait()
+        ids = [m.id for m in self.messages]
+        start = ids.index(after) + 1 if after in ids else 0
+        for message in self.messages[start:]:
+            yield message
+
+
+async def test_message_cache_serves_reads_from_events() -> None:
+    cache = ConversationMessageCache(max_messages=100)
+    workbench = FakeWorkbench(str(uuid.uuid4()))
+    cache.apply_event("assistant-id", workbench.create("one"))
+
+    messages = await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+    assert [m.content for m in messages] == ["one"]
+
+    cache.apply_event("assistant-id", workbench.create("two"))
+    cache.apply_event("assistant-id", workbench.create("log", workbench_model.MessageType.log))
+    cache.apply_event("assistant-id", workbench.create("three"))
+    cache.apply_event("assistant-id", workbench.delete(workbench.messages[0]))
+
+    messages = await cache.get_messages(
+        "assistant-id",
+        workbench.conversation_id,
+        load=workbench.load,
+        message_types=[workbench_model.MessageType.chat],
+    )
+    assert [m.content for m in messages] == ["two", "three"]
+
+    messages = await cache.get_messages(
+        "assistant-id", workbench.conversation_id, load=workbench.load, before=messages[-1].id, limit=1
+    )
+    assert [m.content for m in messages] == ["log"]
+
+    assert workbench.load_calls == [None]
+    metrics = cache.metrics()
+    assert metrics.message_count == 3
+    assert metrics.miss_count == 1
+    assert metrics.hit_count == 2
+
+
+async def test_message_cache_backfills_gaps() -> None:
+    cache = ConversationMessageCache(max_messages=100)
+    workbench = FakeWorkbench(str(uuid.uuid4()))
+    workbench.create("one")
+    await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+
+    # the event for "two" is missed
+    workbench.create("two")
+    cache.apply_event("assistant-id", workbench.create("three"))
+
+    messages = await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+    assert [m.content for m in messages] == ["one", "two", "three"]
+    assert workbench.load_calls == [None, workbench.messages[0].id]
+    assert cache.metrics().backfill_count == 1
+
+
+async def test_message_cache_ignores_events_for_backfilled_messages() -> None:
+    cache = ConversationMessageCache(max_messages=100)
+    workbench = FakeWorkbench(str(uuid.uuid4()))
+    workbench.create("one")
+    await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+
+    two = workbench.create("two")
+    three = workbench.create("three")
+    # "three" arrives first, and is read with "two" in a backfill, before "two" arrives
+    cache.apply_event("assistant-id", three)
+    await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+    cache.apply_event("assistant-id", two)
+
+    messages = await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+    assert [m.content for m in messages] == ["one", "two", "three"]
+    assert len(workbench.load_calls) == 2
+
+
+async def test_message_cache_evicts_least_recently_used_conversations() -> None:
+    cache = ConversationMessageCache(max_messages=5)
+    workbenches = [FakeWorkbench(str(uuid.uuid4())) for _ in range(3)]
+    for workbench in workbenches:
+        workbench.create("one")
+        workbench.create("two")
+
+    for workbench in workbenches[:2]:
+        await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+    # the first conversation is now the most recently used
+    await cache.get_messages("assistant-id", workbenches[0].conversation_id, load=workbenches[0].load)
+    await cache.get_messages("assistant-id", workbenches[2].conversation_id, load=workbenches[2].load)
+
+    metrics = cache.metrics()
+    assert metrics.conversation_count == 2
+    assert metrics.message_count == 4
+    assert metrics.eviction_count == 1
+
+    await cache.get_messages("assistant-id", workbenches[1].conversation_id, load=workbenches[1].load)
+    assert workbenches[1].load_calls == [None, None]
+    assert workbenches[0].load_calls == [None]
+
+
+async def test_message_cache_ignores_other_events_during_load() -> None:
+    cache = ConversationMessageCache(max_messages=100)
+    workbench = FakeWorkbench(str(uuid.uuid4()))
+    workbench.create("one")
+    workbench.load_gate = asyncio.Event()
+
+    read = asyncio.create_task(cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load))
+    await asyncio.sleep(0)
+    cache.apply_event(
+        "assistant-id",
+        workbench_model.ConversationEvent(
+            conversation_id=uuid.UUID(workbench.conversation_id),
+            event=workbench_model.ConversationEventType.participant_updated,
+            data={},
+        ),
+    )
+    workbench.load_gate.set()
+    await read
+
+    messages = await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+    assert [m.content for m in messages] == ["one"]
+    assert workbench.load_calls == [None]
+
+
+async def test_message_cache_loads_once_at_a_time_across_evictions() -> None:
+    cache = ConversationMessageCache(max_messages=100)
+    workbench = FakeWorkbench(str(uuid.uuid4()))
+    workbench.create("one")
+    await cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load)
+
+    # the event for "two" is missed, so the next read is a backfill
+    workbench.create("two")
+    cache.apply_event("assistant-id", workbench.create("three"))
+    workbench.load_gate = asyncio.Event()
+
+    backfill = asyncio.create_task(cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load))
+    await asyncio.sleep(0)
+    # evicted during the backfill, and read again
+    cache.invalidate("assistant-id", workbench.conversation_id)
+    reads = [
+        asyncio.create_task(cache.get_messages("assistant-id", workbench.conversation_id, load=workbench.load))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    assert len(workbench.load_calls) == 2
+
+    workbench.load_gate.set()
+    for messages in await asyncio.gather(backfill, *reads):
+        assert [m.content for m in messages] == ["one", "two", "three"]
+
+    assert workbench.load_calls == [None, workbench.messages[0].id, None]
+    metrics = cache.metrics()
+    assert metrics.message_count == 3
+    assert metrics.hit_count == 1
@@ -80,6 +80,8 @@ export const ConversationList: React.FC<ConversationListProps> = (props) => {
             await refetchConversations();
         };
 
+        // the events missed while reconnecting are no longer available for replay
+        workbenchUserEvents.addEventListener('history.unavailable', conversationHandler);
         workbenchUserEvents.addEventListener('message.created', conversationHandler);
         workbenchUserEvents.addEventListener('message.deleted', conversationHandler);
         workbenchUserEvents.addEventListener('conversation.updated', conversationHandler);
@@ -88,6 +90,7 @@ export const ConversationList: React.FC<ConversationListProps> = (props) => {
 
         return () => {
             // remove event listeners
+            workbenchUserEvents.removeEventListener('history.unavailable', conversationHandler);
             workbenchUserEvents.removeEventListener('message.created', conversationHandler);
             workbenchUserEvents.removeEventListener('message.deleted', conversationHandler);
             workbenchUserEvents.removeEventListener('conversation.updated', conversationHandler);
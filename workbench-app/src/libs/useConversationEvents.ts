@@ -5,6 +5,7 @@ import { conversationMessageFromJSON } from '../models/ConversationMessage';
 import { ConversationParticipant } from '../models/ConversationParticipant';
 import { useAppDispatch } from '../redux/app/hooks';
 import { workbenchConversationEvents } from '../routes/FrontDoor';
+import { workbenchApi } from '../services/workbench';
 import { useEnvironment } from './useEnvironment';
 
 export const useConversationEvents = (
@@ -64,17 +65,32 @@ export const useConversationEvents = (
         [onParticipantCreated, onParticipantUpdated],
     );
 
+    // handle the events missed while reconnecting no longer being available for replay, by refetching everything
+    // that is kept up to date from events
+    const handleHistoryUnavailableEvent = React.useCallback(() => {
+        dispatch(workbenchApi.util.invalidateTags(['Conversation', 'ConversationMessage', 'Assistant', 'State']));
+    }, [dispatch]);
+
     React.useEffect(() => {
+        workbenchConversationEvents.addEventListener('history.unavailable', handleHistoryUnavailableEvent);
         workbenchConversationEvents.addEventListener('message.created', handleMessageEvent);
         workbenchConversationEvents.addEventListener('message.deleted', handleMessageEvent);
         workbenchConversationEvents.addEventListener('participant.created', handleParticipantEvent);
         workbenchConversationEvents.addEventListener('participant.updated', handleParticipantEvent);
 
         return () => {
+            workbenchConversationEvents.removeEventListener('history.unavailable', handleHistoryUnavailableEvent);
             workbenchConversationEvents.removeEventListener('message.created', handleMessageEvent);
             workbenchConversationEvents.removeEventListener('message.deleted', handleMessageEvent);
             workbenchConversationEvents.removeEventListener('participant.created', handleParticipantEvent);
             workbenchConversationEvents.removeEventListener('participant.updated', handleParticipantEvent);
         };
-    }, [conversationId, dispatch, environment.url, handleMessageEvent, handleParticipantEvent]);
+    }, [
+        conversationId,
+        dispatch,
+        environment.url,
+        handleHistoryUnavailableEvent,
+        handleMessageEvent,
+        handleParticipantEvent,
+    ]);
 };
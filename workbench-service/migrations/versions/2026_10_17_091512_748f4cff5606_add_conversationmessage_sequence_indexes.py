@@ -0,0 +1,39 @@
+"""add conversationmessage sequence indexes
+
+Revision ID: 748f4cff5606
+Revises: 503c739152f3
+Create Date: 2026-10-17 09:15:12.381902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "748f4cff5606"
+down_revision: Union[str, None] = "503c739152f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # if_not_exists allows the indexes to be created ahead of the upgrade on large databases, for example with
+    # CREATE INDEX CONCURRENTLY on postgresql
+    op.create_index(
+        "ix_conversationmessage_conversation_id_sequence",
+        "conversationmessage",
+        ["conversation_id", "sequence"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_conversationmessage_conversation_id_message_type_sequence",
+        "conversationmessage",
+        ["conversation_id", "message_type", "sequence"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversationmessage_conversation_id_message_type_sequence", table_name="conversationmessage")
+    op.drop_index("ix_conversationmessage_conversation_id_sequence", table_name="conversationmessage")
@@ -0,0 +1,99 @@
+"""stores file version content in content-addressed blobs
+
+Revision ID: 93b79c75baf4
+Revises: 748f4cff5606
+Create Date: 2026-10-17 14:12:08.512217
+
+"""
+
+import asyncio
+import logging
+import shutil
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+from semantic_workbench_service import db, files, settings
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import col, select
+
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = "93b79c75baf4"
+down_revision: Union[str, None] = "748f4cff5606"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+async def backfill_content_hashes(conn: AsyncConnection) -> None:
+    """
+    Links the existing file version content into the blob store. The files are left in place, to be removed by
+    the file storage garbage collection, so that they remain available if the migration is rolled back.
+    """
+    storage = files.Storage(settings.storage)
+
+    file_version_details = [
+        (row[0], row[1], row[2], row[3])
+        for row in await conn.execute(
+            select(
+                db.File.conversation_id, db.FileVersion.file_id, db.FileVersion.version, db.FileVersion.storage_filename
+            )
+            .join(db.File)
+            .where(col(db.FileVersion.content_hash).is_(None))
+        )
+    ]
+
+    missing_count = 0
+    for conversation_id, file_id, version, storage_filename in file_version_details:
+        path = storage.path_for(namespace=str(conversation_id), filename=storage_filename)
+        if not path.exists():
+            missing_count += 1
+            continue
+
+        content_hash, _ = await asyncio.to_thread(storage.import_file_as_blob, path)
+        await conn.execute(
+            sa.update(db.FileVersion)
+            .where(col(db.FileVersion.file_id) == file_id)
+            .where(col(db.FileVersion.version) == version)
+            .values(content_hash=content_hash)
+        )
+
+    logger.info(
+        "backfilled file version content hashes; count: %d, missing: %d",
+        len(file_version_details) - missing_count,
+        missing_count,
+    )
+
+
+async def restore_files(conn: AsyncConnection) -> None:
+    """
+    Copies the blob content of file versions back to the per-conversation files, for those already removed.
+    """
+    storage = files.Storage(settings.storage)
+
+    for conversation_id, storage_filename, content_hash in await conn.execute(
+        select(db.File.conversation_id, db.FileVersion.storage_filename, db.FileVersion.content_hash)
+        .join(db.File)
+        .where(col(db.FileVersion.content_hash).is_not(None))
+    ):
+        path = storage.path_for(namespace=str(conversation_id), filename=storage_filename)
+        blob_path = storage.blob_path(content_hash)
+        if path.exists() or not blob_path.exists():
+            continue
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(shutil.copyfile, blob_path, path)
+
+
+def upgrade() -> None:
+    op.add_column("fileversion", sa.Column("content_hash", sqlmodel.AutoString(), nullable=True))
+    op.create_index(op.f("ix_fileversion_content_hash"), "fileversion", ["content_hash"], unique=False)
+    op.run_async(backfill_content_hashes)
+
+
+def downgrade() -> None:
+    op.run_async(restore_files)
+    op.drop_index(op.f("ix_fileversion_content_hash"), table_name="fileversion")
+    op.drop_column("fileversion", "content_hash")
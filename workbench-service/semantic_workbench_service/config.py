@@ -1,8 +1,10 @@
 from typing import Annotated
 
-from pydantic import Field, HttpUrl
+from pydantic import Field, HttpUrl, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from .event_bus import EventBusSettings
+from .event_subscribers import SlowSubscriberPolicy
 from .files import StorageSettings
 from .logging_config import LoggingSettings
 
@@ -27,6 +29,10 @@ class AuthSettings(BaseSettings):
     allowed_jwt_algorithms: set[str] = {"RS256"}
     allowed_app_id: str = "22cb77c3-ca98-4a26-b4db-ac4dcecba690"
 
+    # principals of validated tokens, cached by token until the token expires
+    principal_cache_size: int = 10_000
+    jwks_ttl_seconds: float = 60 * 10
+
 
 class AssistantIdentifiers(BaseSettings):
     assistant_service_id: str
@@ -45,6 +51,53 @@ class WebServiceSettings(BaseSettings):
 
     assistant_service_online_check_interval_seconds: float = 10.0
 
+    # service infos are cached, and refreshed in the background by the online check, so that listing them does not
+    # call every assistant service; services that do not respond within the timeout are listed from the cache
+    assistant_service_info_cache_ttl_seconds: float = 60.0
+    assistant_service_info_timeout_seconds: float = 2.0
+
+    # requests to an assistant service share a single connection pool per service url; http2 requires the h2 package
+    assistant_service_max_connections: int = 100
+    assistant_service_max_keepalive_connections: int = 20
+    assistant_service_keepalive_expiry_seconds: float = 30.0
+    assistant_service_http2: bool = False
+
+    # assistants, with their service registrations, cached by id for forwarding events
+    assistant_cache_size: int = 10_000
+    assistant_cache_ttl_seconds: float = 30.0
+
+    # events queued for an assistant are posted in batches of up to this size; assistant services must support the
+    # batch events endpoint for sizes above 1
+    assistant_event_batch_size: int = 1
+
+    # recent events retained for replay to SSE clients that reconnect with a Last-Event-ID header
+    sse_event_history_size: int = 200
+    sse_event_history_max_conversations: int = 1_000
+    sse_event_history_max_users: int = 1_000
+
+    # events buffered for each SSE client; clients that fall further behind are handled per the slow subscriber policy
+    # disconnected clients replay the events they missed from the event history when they reconnect, so the history
+    # must be at least as large as the queue, with room for the events sent while they reconnect
+    sse_subscriber_queue_size: int = 100
+    sse_slow_subscriber_policy: SlowSubscriberPolicy = "disconnect"
+
+    # participants cached by conversation, for routing events; invalidated by participant events
+    participant_cache_size: int = 10_000
+    participant_cache_ttl_seconds: float = 30.0
+
+    # the user details last written for each user, so that users are only written when their details change
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: float = 5 * 60.0
+
+    # rows fetched per round trip when streaming conversation messages
+    message_stream_batch_size: int = 500
+
+    metrics_log_interval_seconds: float = 60.0
+
+    # retitles of a conversation are delayed, and the requests made meanwhile are coalesced into a single retitle
+    conversation_retitle_delay_seconds: float = 2.0
+    conversation_retitle_max_concurrency: int = 4
+
     azure_openai_endpoint: Annotated[str, Field(validation_alias="azure_openai_endpoint")] = ""
     azure_openai_deployment: Annotated[str, Field(validation_alias="azure_openai_deployment")] = "gpt-4o-mini"
     azure_openai_model: Annotated[str, Field(validation_alias="azure_openai_model")] = "gpt-4o-mini"
@@ -52,6 +105,18 @@ class WebServiceSettings(BaseSettings):
 
     default_assistants: list[AssistantIdentifiers] = []
 
+    @model_validator(mode="after")
+    def _validate_sse_event_history_size(self) -> "WebServiceSettings":
+        if (
+            self.sse_slow_subscriber_policy == "disconnect"
+            and self.sse_event_history_size < self.sse_subscriber_queue_size
+        ):
+            raise ValueError(
+                "sse_event_history_size must be at least sse_subscriber_queue_size when sse_slow_subscriber_policy is"
+                " disconnect, so that disconnected clients can replay the events they missed"
+            )
+        return self
+
 
 class AzureSpeechSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -69,6 +134,7 @@ class Settings(BaseSettings):
 
     db: DBSettings = DBSettings()
     storage: StorageSettings = StorageSettings()
+    event_bus: EventBusSettings = EventBusSettings()
     logging: LoggingSettings = LoggingSettings()
     service: WebServiceSettings = WebServiceSettings()
     azure_speech: AzureSpeechSettings = AzureSpeechSettings()
@@ -10,8 +10,9 @@ from .exceptions import (
     ForbiddenError,
     InvalidArgumentError,
     NotFoundError,
+    RangeNotSatisfiableError,
 )
-from .file import FileController
+from .file import FileController, parse_byte_range
 from .user import UserController
 
 __all__ = [
@@ -26,6 +27,8 @@ __all__ = [
     "ConflictError",
     "Error",
     "NotFoundError",
+    "parse_byte_range",
+    "RangeNotSatisfiableError",
     "user",
     "participant",
     "UserController",
@@ -8,9 +8,11 @@ import shutil
 import tempfile
 import uuid
 import zipfile
-from typing import IO, AsyncContextManager, Awaitable, BinaryIO, Callable, NamedTuple
+from typing import IO, AsyncContextManager, AsyncIterator, Awaitable, BinaryIO, Callable, NamedTuple
 
+import cachetools
 import httpx
+import sqlalchemy
 from pydantic import BaseModel, ConfigDict, ValidationError
 from semantic_workbench_api_model.assistant_model import (
     AssistantPutRequestModel,
@@ -22,6 +24,7 @@ from semantic_workbench_api_model.assistant_model import (
     StateResponseModel,
 )
 from semantic_workbench_api_model.assistant_service_client import (
+    AssistantConnectionError,
     AssistantError,
 )
 from semantic_workbench_api_model.workbench_model import (
@@ -39,7 +42,7 @@ from sqlalchemy.orm import joinedload
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .. import auth, db, files, query, settings
+from .. import auth, db, files, query, settings, zip_stream
 from ..event import ConversationEventQueueItem
 from . import convert, exceptions, export_import
 from . import participant as participant_
@@ -51,10 +54,16 @@ logger = logging.getLogger(__name__)
 
 ExportResult = NamedTuple(
     "ExportResult",
-    [("file_path", str), ("content_type", str), ("filename", str), ("cleanup", Callable[[], None])],
+    [("stream", AsyncIterator[bytes]), ("content_type", str), ("filename", str)],
 )
 
 
+async def _read_response(response: AsyncContextManager[AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+    async with response as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
 class AssistantController:
     def __init__(
         self,
@@ -67,6 +76,10 @@ class AssistantController:
         self._notify_event = notify_event
         self._client_pool = client_pool
         self._file_storage = file_storage
+        # assistants, with their service registrations, for forwarding events without a query per event
+        self._forwarding_assistants: cachetools.TTLCache[uuid.UUID, db.Assistant] = cachetools.TTLCache(
+            maxsize=settings.service.assistant_cache_size, ttl=settings.service.assistant_cache_ttl_seconds
+        )
 
     async def _ensure_assistant(
         self,
@@ -129,7 +142,11 @@ class AssistantController:
             from_export=from_export,
         )
 
-    async def forward_event_to_assistant(self, assistant_id: uuid.UUID, event: ConversationEvent) -> None:
+    async def _forwarding_assistant(self, assistant_id: uuid.UUID) -> db.Assistant:
+        assistant = self._forwarding_assistants.get(assistant_id)
+        if assistant is not None:
+            return assistant
+
         async with self._get_session() as session:
             assistant = (
                 await session.exec(
@@ -139,15 +156,47 @@ class AssistantController:
                 )
             ).one()
 
+        self._forwarding_assistants[assistant_id] = assistant
+        return assistant
+
+    def invalidate_forwarding_assistants(self, assistant_service_id: str) -> None:
+        """
+        Drops the cached assistants of the assistant service, so that events are forwarded with its updated
+        registration.
+        """
+        for assistant_id, assistant in list(self._forwarding_assistants.items()):
+            if assistant.assistant_service_id == assistant_service_id:
+                self._forwarding_assistants.pop(assistant_id, None)
+
+    async def forward_event_to_assistant(self, assistant_id: uuid.UUID, event: ConversationEvent) -> None:
+        await self.forward_events_to_assistant(assistant_id=assistant_id, events=[event])
+
+    async def forward_events_to_assistant(self, assistant_id: uuid.UUID, events: list[ConversationEvent]) -> None:
+        """
+        Forwards the events to the assistant, in order. More than one event is posted in a single request, to the
+        batch events endpoint of the assistant service.
+        """
+        if not events:
+            return
+
+        assistant = await self._forwarding_assistant(assistant_id)
+
         try:
-            await (await self._client_pool.assistant_client(assistant)).post_conversation_event(event=event)
+            assistant_client = await self._client_pool.assistant_client(assistant)
+            if len(events) == 1:
+                await assistant_client.post_conversation_event(event=events[0])
+            else:
+                await assistant_client.post_conversation_events(events=events)
         except AssistantError as e:
+            if isinstance(e, AssistantConnectionError):
+                # the service registration may have changed, so it is reloaded for the next events
+                self._forwarding_assistants.pop(assistant_id, None)
             if e.status_code != httpx.codes.NOT_FOUND:
                 logger.exception(
-                    "error forwarding event to assistant; assistant_id: %s, conversation_id: %s, event: %s",
+                    "error forwarding events to assistant; assistant_id: %s, conversation_ids: %s, events: %s",
                     assistant.assistant_id,
-                    event.conversation_id,
-                    event,
+                    sorted({str(event.conversation_id) for event in events}),
+                    [event.event for event in events],
                 )
 
     async def _remove_assistant_from_conversation(
@@ -301,6 +350,8 @@ class AssistantController:
             if assistant is None:
                 raise exceptions.NotFoundError()
 
+            self._forwarding_assistants.pop(assistant_id, None)
+
             assistant_service = (
                 await session.exec(
                     select(db.AssistantServiceRegistration).where(
@@ -381,6 +432,8 @@ class AssistantController:
             await session.delete(assistant)
             await session.commit()
 
+        self._forwarding_assistants.pop(assistant_id, None)
+
     async def get_assistants(
         self,
         user_principal: auth.UserPrincipal,
@@ -658,101 +711,116 @@ class AssistantController:
             )
 
             return await self._export(
-                session=session,
                 export_filename_prefix=export_file_name,
                 conversation_ids=conversation_ids,
                 assistant_ids=set((assistant_id,)),
             )
 
+    def _file_version_path(
+        self, conversation_id: uuid.UUID, storage_filename: str, content_hash: str | None
+    ) -> pathlib.Path:
+        if content_hash is not None:
+            return self._file_storage.blob_path(content_hash)
+        return self._file_storage.path_for(namespace=str(conversation_id), filename=storage_filename)
+
+    def _copy_legacy_file(
+        self, from_conversation_id: uuid.UUID, to_conversation_id: uuid.UUID, storage_filename: str
+    ) -> None:
+        source_path = self._file_storage.path_for(namespace=str(from_conversation_id), filename=storage_filename)
+        if not source_path.exists():
+            return
+        target_path = self._file_storage.path_for(namespace=str(to_conversation_id), filename=storage_filename)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source_path, target_path)
+
     async def _export(
         self,
         conversation_ids: set[uuid.UUID],
         assistant_ids: set[uuid.UUID],
-        session: AsyncSession,
         export_filename_prefix: str,
     ) -> ExportResult:
-        temp_dir_path = pathlib.Path(tempfile.mkdtemp())
-
-        # write all files to a temporary directory
-        export_dir_path = temp_dir_path / "export"
-        export_dir_path.mkdir()
+        return ExportResult(
+            stream=zip_stream.stream_zip(
+                self._export_entries(conversation_ids=conversation_ids, assistant_ids=assistant_ids)
+            ),
+            content_type="application/zip",
+            filename=export_filename_prefix + ".zip",
+        )
 
+    async def _export_entries(
+        self,
+        conversation_ids: set[uuid.UUID],
+        assistant_ids: set[uuid.UUID],
+    ) -> AsyncIterator[tuple[str, AsyncIterator[bytes]]]:
         # export records from database
-        with (export_dir_path / AssistantController.EXPORT_WORKBENCH_FILENAME).open("+wb") as workbench_file:
-            async for file_bytes in export_import.export_file(
-                conversation_ids=conversation_ids,
-                assistant_ids=assistant_ids,
-                session=session,
-            ):
-                workbench_file.write(file_bytes)
+        async with self._get_session() as session:
+            yield (
+                AssistantController.EXPORT_WORKBENCH_FILENAME,
+                export_import.export_file(
+                    conversation_ids=conversation_ids,
+                    assistant_ids=assistant_ids,
+                    session=session,
+                ),
+            )
 
-        # export files from storage
-        for conversation_id in conversation_ids:
-            source_dir = self._file_storage.path_for(namespace=str(conversation_id), filename="")
-            if not source_dir.is_dir():
-                continue
+        # the remaining entries are enumerated up front, so that a session is not held while they are streamed
+        async with self._get_session() as session:
+            file_versions = (
+                await session.exec(
+                    select(db.File.conversation_id, db.FileVersion.storage_filename, db.FileVersion.content_hash)
+                    .join(db.File)
+                    .where(col(db.File.conversation_id).in_(conversation_ids))
+                )
+            ).all()
 
-            conversation_dir = export_dir_path / "files" / str(conversation_id)
-            conversation_dir.mkdir(parents=True)
+            assistants = (
+                await session.exec(
+                    select(db.Assistant)
+                    .where(col(db.Assistant.assistant_id).in_(assistant_ids))
+                    .options(joinedload(db.Assistant.related_assistant_service_registration, innerjoin=True))
+                )
+            ).all()
+            assistant_clients = [
+                (assistant.assistant_id, await self._client_pool.assistant_client(assistant))
+                for assistant in assistants
+            ]
 
-            await asyncio.to_thread(shutil.copytree, src=source_dir, dst=conversation_dir, dirs_exist_ok=True)
+            assistant_participants = (
+                await session.exec(
+                    select(db.AssistantParticipant.assistant_id, db.AssistantParticipant.conversation_id).where(
+                        col(db.AssistantParticipant.assistant_id).in_(assistant_ids),
+                        col(db.AssistantParticipant.conversation_id).in_(conversation_ids),
+                    )
+                )
+            ).all()
 
-        # enumerate assistants
-        assistants = await session.exec(select(db.Assistant).where(col(db.Assistant.assistant_id).in_(assistant_ids)))
+        # export files from storage, in the per-conversation layout, by the hash of the storage filename
+        for conversation_id, storage_filename, content_hash in file_versions:
+            source_path = self._file_version_path(conversation_id, storage_filename, content_hash)
+            if not source_path.exists():
+                continue
 
-        for assistant in assistants:
-            assistant_client = await self._client_pool.assistant_client(assistant)
+            filename_hash = self._file_storage.path_for(namespace="", filename=storage_filename).name
+            yield f"files/{conversation_id}/{filename_hash}", files.read_chunks(source_path)
 
+        for assistant_id, assistant_client in assistant_clients:
             # export assistant data
-            assistant_dir = export_dir_path / "assistants" / str(assistant.assistant_id)
-            assistant_dir.mkdir(parents=True)
-
-            with (assistant_dir / AssistantController.EXPORT_ASSISTANT_DATA_FILENAME).open("wb") as assistant_file:
-                async with assistant_client.get_exported_data() as response:
-                    async for chunk in response:
-                        assistant_file.write(chunk)
-
-            # enumerate assistant conversations
-            assistant_participants = await session.exec(
-                select(db.AssistantParticipant)
-                .where(db.AssistantParticipant.assistant_id == assistant.assistant_id)
-                .where(col(db.AssistantParticipant.conversation_id).in_(conversation_ids))
+            assistant_dir = f"assistants/{assistant_id}"
+            yield (
+                f"{assistant_dir}/{AssistantController.EXPORT_ASSISTANT_DATA_FILENAME}",
+                _read_response(assistant_client.get_exported_data()),
             )
 
-            for assistant_participant in assistant_participants:
-                conversation_dir = assistant_dir / "conversations" / str(assistant_participant.conversation_id)
-                conversation_dir.mkdir(parents=True)
-
-                # export assistant conversation data
-                with (conversation_dir / AssistantController.EXPORT_ASSISTANT_CONVERSATION_DATA_FILENAME).open(
-                    "wb"
-                ) as conversation_file:
-                    async with assistant_client.get_exported_conversation_data(
-                        conversation_id=assistant_participant.conversation_id
-                    ) as response:
-                        async for chunk in response:
-                            conversation_file.write(chunk)
-
-        # zip the export directory
-        zip_file_path = await asyncio.to_thread(
-            shutil.make_archive,
-            base_name=str(temp_dir_path / "zip"),
-            format="zip",
-            root_dir=export_dir_path,
-            base_dir="",
-            logger=logger,
-            verbose=True,
-        )
-
-        def _cleanup() -> None:
-            shutil.rmtree(temp_dir_path, ignore_errors=True)
+            # export assistant conversation data
+            for participant_assistant_id, conversation_id in assistant_participants:
+                if participant_assistant_id != assistant_id:
+                    continue
 
-        return ExportResult(
-            file_path=zip_file_path,
-            content_type="application/zip",
-            filename=export_filename_prefix + ".zip",
-            cleanup=_cleanup,
-        )
+                yield (
+                    f"{assistant_dir}/conversations/{conversation_id}/"
+                    f"{AssistantController.EXPORT_ASSISTANT_CONVERSATION_DATA_FILENAME}",
+                    _read_response(assistant_client.get_exported_conversation_data(conversation_id=conversation_id)),
+                )
 
     async def export_conversations(
         self,
@@ -784,7 +852,6 @@ class AssistantController:
             )
 
             return await self._export(
-                session=session,
                 export_filename_prefix=(
                     f"semantic_workbench_conversation_export_{datetime.datetime.now(datetime.UTC).strftime('%Y%m%d%H%M%S')}"
                 ),
@@ -798,31 +865,28 @@ class AssistantController:
         user_principal: auth.UserPrincipal,
     ) -> ConversationImportResult:
         async with self._get_session() as session:
-            with tempfile.TemporaryDirectory() as extraction_dir:
+            with (
+                tempfile.TemporaryDirectory() as extraction_dir,
+                zipfile.ZipFile(file=from_export, mode="r") as zip_file,
+            ):
                 extraction_path = pathlib.Path(extraction_dir)
 
-                # extract the zip file to a temporary directory
-                with zipfile.ZipFile(file=from_export, mode="r") as zip_file:
-                    await asyncio.to_thread(zip_file.extractall, path=extraction_path)
+                # extract the assistant data to a temporary directory. the records are read from the zip file as they
+                # are imported, and the files are written from it directly to the blob store
+                assistant_members = [name for name in zip_file.namelist() if name.startswith("assistants/")]
+                await asyncio.to_thread(zip_file.extractall, path=extraction_path, members=assistant_members)
 
                 # import records into database
-                with (extraction_path / AssistantController.EXPORT_WORKBENCH_FILENAME).open("rb") as workbench_file:
+                with zip_file.open(AssistantController.EXPORT_WORKBENCH_FILENAME) as workbench_file:
                     import_result = await export_import.import_files(
                         session=session,
                         owner_id=user_principal.user_id,
                         files=[workbench_file],
                     )
 
-                await session.commit()
+                file_count = await self._import_files_to_blob_store(session, zip_file, import_result)
 
-                # import files into storage
-                for old_conversation_id, new_conversation_id in import_result.conversation_id_old_to_new.items():
-                    files_path = extraction_path / "files" / str(old_conversation_id)
-                    if not files_path.is_dir():
-                        continue
-
-                    storage_path = self._file_storage.path_for(namespace=str(new_conversation_id), filename="")
-                    await asyncio.to_thread(shutil.copytree, src=files_path, dst=storage_path)
+                await session.commit()
 
                 try:
                     # enumerate assistants
@@ -920,8 +984,57 @@ class AssistantController:
         return ConversationImportResult(
             assistant_ids=[assistant_id for assistant_id, _ in import_result.assistant_id_old_to_new.values()],
             conversation_ids=list(import_result.conversation_id_old_to_new.values()),
+            record_counts=import_result.record_counts,
+            file_count=file_count,
         )
 
+    async def _import_files_to_blob_store(
+        self, session: AsyncSession, zip_file: zipfile.ZipFile, import_result: export_import.ImportResult
+    ) -> int:
+        """
+        Writes the exported files to the blob store, hashing them as they are read from the zip file, and sets the
+        content hash of the imported file versions. Returns the number of files imported.
+        """
+        # files are exported as files/<conversation_id>/<hash of storage filename>
+        content_hashes: dict[tuple[str, str], str] = {}
+        for name in zip_file.namelist():
+            parts = name.split("/")
+            if len(parts) != 3 or parts[0] != "files" or not parts[2]:
+                continue
+
+            with zip_file.open(name) as content:
+                content_hashes[(parts[1], parts[2])], _ = await asyncio.to_thread(
+                    self._file_storage.write_blob, content
+                )
+
+        conversation_id_new_to_old = {new: old for old, new in import_result.conversation_id_old_to_new.items()}
+        file_versions = await session.exec(
+            select(
+                db.File.conversation_id, db.FileVersion.file_id, db.FileVersion.version, db.FileVersion.storage_filename
+            )
+            .join(db.File)
+            .where(col(db.File.conversation_id).in_(conversation_id_new_to_old.keys()))
+        )
+        # the content hashes in the export are not trusted, as they could refer to content that is not in the export
+        updates = []
+        for conversation_id, file_id, version, storage_filename in file_versions:
+            filename_hash = self._file_storage.path_for(namespace="", filename=storage_filename).name
+            content_hash = content_hashes.get((str(conversation_id_new_to_old[conversation_id]), filename_hash))
+            updates.append({"b_file_id": file_id, "b_version": version, "b_content_hash": content_hash})
+
+        if updates:
+            file_version_table: sqlalchemy.Table = db.FileVersion.__table__  # type: ignore
+            connection = await session.connection()
+            await connection.execute(
+                sqlalchemy.update(file_version_table)
+                .where(file_version_table.c.file_id == sqlalchemy.bindparam("b_file_id"))
+                .where(file_version_table.c.version == sqlalchemy.bindparam("b_version"))
+                .values(content_hash=sqlalchemy.bindparam("b_content_hash")),
+                updates,
+            )
+
+        return len(content_hashes)
+
     # TODO: decide if we should move this to the conversation controller?
     #   it's a bit of a mix between the two and reaches into the assistant controller
     #   to access storage and assistant data, so it's not a clean fit in either
@@ -959,75 +1072,11 @@ class AssistantController:
             session.add(conversation)
             await session.flush()  # To generate new_conversation.conversation_id
 
-            # Copy messages from the original conversation
-            messages = await session.exec(
-                select(db.ConversationMessage)
-                .where(db.ConversationMessage.conversation_id == conversation_id)
-                .order_by(col(db.ConversationMessage.sequence))
-            )
-            message_id_old_to_new = {}
-            for message in messages:
-                new_message_id = uuid.uuid4()
-                message_id_old_to_new[message.message_id] = new_message_id
-                new_message = db.ConversationMessage(
-                    # Do not set 'sequence'; let the database assign it
-                    **message.model_dump(exclude={"message_id", "conversation_id", "sequence"}),
-                    message_id=new_message_id,
-                    conversation_id=conversation.conversation_id,
-                )
-                session.add(new_message)
-
-            # Copy message debug data from the original conversation
-            for old_message_id, new_message_id in message_id_old_to_new.items():
-                message_debugs = await session.exec(
-                    select(db.ConversationMessageDebug).where(db.ConversationMessageDebug.message_id == old_message_id)
-                )
-                for debug in message_debugs:
-                    new_debug = db.ConversationMessageDebug(
-                        **debug.model_dump(exclude={"message_id"}),
-                        message_id=new_message_id,
-                    )
-                    session.add(new_debug)
-
-            # Copy File entries associated with the conversation
-            files = await session.exec(
-                select(db.File)
-                .where(db.File.conversation_id == original_conversation.conversation_id)
-                .order_by(col(db.File.created_datetime).asc())
-            )
-
-            file_id_old_to_new = {}
-            for file in files:
-                new_file_id = uuid.uuid4()
-                file_id_old_to_new[file.file_id] = new_file_id
-                new_file = db.File(
-                    **file.model_dump(exclude={"file_id", "conversation_id"}),
-                    file_id=new_file_id,
-                    conversation_id=conversation.conversation_id,
-                )
-                session.add(new_file)
-
-            # Copy FileVersion entries associated with the files
-            for old_file_id, new_file_id in file_id_old_to_new.items():
-                file_versions = await session.exec(
-                    select(db.FileVersion)
-                    .where(db.FileVersion.file_id == old_file_id)
-                    .order_by(col(db.FileVersion.version).asc())
-                )
-                for version in file_versions:
-                    new_version = db.FileVersion(
-                        **version.model_dump(exclude={"file_id"}),
-                        file_id=new_file_id,
-                    )
-                    session.add(new_version)
-
-            # Copy files associated with the conversation
-            original_files_path = self._file_storage.path_for(
-                namespace=str(original_conversation.conversation_id), filename=""
+            await self._copy_conversation_content(
+                session=session,
+                from_conversation_id=original_conversation.conversation_id,
+                to_conversation_id=conversation.conversation_id,
             )
-            new_files_path = self._file_storage.path_for(namespace=str(conversation.conversation_id), filename="")
-            if original_files_path.exists():
-                await asyncio.to_thread(shutil.copytree, original_files_path, new_files_path)
 
             # Associate existing assistant participants
             # Fetch assistant participants and collect into a list
@@ -1113,6 +1162,84 @@ class AssistantController:
                 conversation_ids=[conversation.conversation_id],
             )
 
+    async def _copy_conversation_content(
+        self, session: AsyncSession, from_conversation_id: uuid.UUID, to_conversation_id: uuid.UUID
+    ) -> None:
+        """
+        Copies the messages, message debug data, files and file versions of a conversation with INSERT ... SELECT
+        statements, so that the rows are copied within the database, through a temporary table mapping the ids of
+        the copied messages and files to new ids.
+        """
+        connection = await session.connection()
+        await connection.run_sync(db.id_mapping_table.create)
+
+        async def map_ids(
+            id_column: sqlalchemy.ColumnElement[uuid.UUID], where: sqlalchemy.ColumnElement[bool]
+        ) -> None:
+            old_ids = (await connection.execute(sqlalchemy.select(id_column).where(where))).scalars().all()
+            if not old_ids:
+                return
+            await connection.execute(
+                sqlalchemy.insert(db.id_mapping_table),
+                [{"old_id": old_id, "new_id": uuid.uuid4()} for old_id in old_ids],
+            )
+
+        def copy_rows(
+            table: sqlalchemy.Table,
+            id_column: str,
+            replace: dict[str, sqlalchemy.ColumnElement],
+            order_by: sqlalchemy.ColumnElement | None = None,
+            exclude: set[str] = set(),
+        ) -> sqlalchemy.Insert:
+            copied_columns = [column for column in table.c if column.name not in {id_column, *replace.keys(), *exclude}]
+            query = (
+                sqlalchemy.select(db.id_mapping_table.c.new_id, *replace.values(), *copied_columns)
+                .select_from(table)
+                .join(db.id_mapping_table, db.id_mapping_table.c.old_id == table.c[id_column])
+            )
+            if order_by is not None:
+                query = query.order_by(order_by)
+            return sqlalchemy.insert(table).from_select(
+                [id_column, *replace.keys(), *(column.name for column in copied_columns)], query
+            )
+
+        message_table: sqlalchemy.Table = db.ConversationMessage.__table__  # type: ignore
+        message_debug_table: sqlalchemy.Table = db.ConversationMessageDebug.__table__  # type: ignore
+        file_table: sqlalchemy.Table = db.File.__table__  # type: ignore
+        file_version_table: sqlalchemy.Table = db.FileVersion.__table__  # type: ignore
+        new_conversation_id = sqlalchemy.literal(to_conversation_id, type_=sqlalchemy.Uuid)
+
+        await map_ids(message_table.c.message_id, message_table.c.conversation_id == from_conversation_id)
+        await map_ids(file_table.c.file_id, file_table.c.conversation_id == from_conversation_id)
+
+        # messages are inserted in sequence order, so that the database assigns the new sequences in the same order
+        await connection.execute(
+            copy_rows(
+                message_table,
+                "message_id",
+                replace={"conversation_id": new_conversation_id},
+                exclude={"sequence"},
+                order_by=message_table.c.sequence,
+            )
+        )
+        await connection.execute(copy_rows(message_debug_table, "message_id", replace={}))
+        await connection.execute(copy_rows(file_table, "file_id", replace={"conversation_id": new_conversation_id}))
+        await connection.execute(copy_rows(file_version_table, "file_id", replace={}))
+
+        await connection.run_sync(db.id_mapping_table.drop)
+
+        # the content of versions in the blob store is shared, only files from before it are copied
+        legacy_storage_filenames = (
+            await session.exec(
+                select(db.FileVersion.storage_filename)
+                .join(db.File)
+                .where(db.File.conversation_id == from_conversation_id)
+                .where(col(db.FileVersion.content_hash).is_(None))
+            )
+        ).all()
+        for storage_filename in legacy_storage_filenames:
+            await asyncio.to_thread(self._copy_legacy_file, from_conversation_id, to_conversation_id, storage_filename)
+
     async def _ensure_conversation_access(
         self,
         session: AsyncSession,
@@ -1,13 +1,30 @@
 import asyncio
 from typing import Self
 
+import httpx
+from semantic_workbench_api_model import assistant_service_client
 from semantic_workbench_api_model.assistant_service_client import (
     AssistantClient,
     AssistantServiceClient,
     AssistantServiceClientBuilder,
 )
 
-from .. import assistant_api_key, db
+from .. import assistant_api_key, db, settings
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    A transport that is shared by the clients of an assistant service, and closed by the pool rather than by them.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
 
 
 class AssistantServiceClientPool:
@@ -15,9 +32,10 @@ class AssistantServiceClientPool:
         self._api_key_store = api_key_store
         self._service_clients: dict[str, AssistantServiceClient] = {}
         self._assistant_clients: dict[str, AssistantClient] = {}
+        self._transports: dict[str, httpx.AsyncBaseTransport] = {}
         self._client_lock = asyncio.Lock()
 
-    def __aenter__(self) -> Self:
+    async def __aenter__(self) -> Self:
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback) -> None:
@@ -25,6 +43,11 @@ class AssistantServiceClientPool:
             await client.aclose()
         for client in self._assistant_clients.values():
             await client.aclose()
+        for transport in self._transports.values():
+            await transport.aclose()
+        self._service_clients.clear()
+        self._assistant_clients.clear()
+        self._transports.clear()
 
     async def service_client(self, registration: db.AssistantServiceRegistration) -> AssistantServiceClient:
         service_id = registration.assistant_service_id
@@ -63,4 +86,19 @@ class AssistantServiceClientPool:
         return AssistantServiceClientBuilder(
             base_url=str(registration.assistant_service_url),
             api_key=api_key,
+            transport=_SharedTransport(self._transport(str(registration.assistant_service_url))),
         )
+
+    def _transport(self, url: str) -> httpx.AsyncBaseTransport:
+        transport = self._transports.get(url)
+        if transport is None:
+            transport = assistant_service_client.httpx_transport_factory(
+                limits=httpx.Limits(
+                    max_connections=settings.service.assistant_service_max_connections,
+                    max_keepalive_connections=settings.service.assistant_service_max_keepalive_connections,
+                    keepalive_expiry=settings.service.assistant_service_keepalive_expiry_seconds,
+                ),
+                http2=settings.service.assistant_service_http2,
+            )
+            self._transports[url] = transport
+        return transport
@@ -18,9 +18,9 @@ from sqlalchemy import update
 from sqlmodel import col, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .. import assistant_api_key, auth, db, settings
+from .. import assistant_api_key, auth, db, service_info_cache, settings
 from ..event import ConversationEventQueueItem
-from . import convert, exceptions
+from . import assistant, convert, exceptions
 from . import participant as participant_
 from . import user as user_
 from .assistant_service_client_pool import AssistantServiceClientPool
@@ -35,11 +35,17 @@ class AssistantServiceRegistrationController:
         notify_event: Callable[[ConversationEventQueueItem], Awaitable],
         api_key_store: assistant_api_key.ApiKeyStore,
         client_pool: AssistantServiceClientPool,
+        assistant_controller: assistant.AssistantController,
     ) -> None:
         self._get_session = get_session
         self._notify_event = notify_event
         self._api_key_store = api_key_store
         self._client_pool = client_pool
+        self._assistant_controller = assistant_controller
+        self._service_info_cache = service_info_cache.ServiceInfoCache(
+            ttl_seconds=settings.service.assistant_service_info_cache_ttl_seconds,
+            timeout_seconds=settings.service.assistant_service_info_timeout_seconds,
+        )
 
     @property
     def _registration_is_secured(self) -> bool:
@@ -241,6 +247,8 @@ class AssistantServiceRegistrationController:
 
             if registration.assistant_service_url != str(update_assistant_service_url.url):
                 registration.assistant_service_url = str(update_assistant_service_url.url)
+                self._service_info_cache.invalidate(assistant_service_id)
+                self._assistant_controller.invalidate_forwarding_assistants(assistant_service_id)
                 logger.info(
                     "updated assistant service url; assistant_service_id: %s, url: %s",
                     assistant_service_id,
@@ -253,6 +261,8 @@ class AssistantServiceRegistrationController:
 
             if not registration.assistant_service_online:
                 registration.assistant_service_online = True
+                # a service that comes back online may have been redeployed with different templates
+                self._service_info_cache.invalidate(assistant_service_id)
                 background_task_args = (self._update_participants, assistant_service_id)
 
             session.add(registration)
@@ -365,6 +375,9 @@ class AssistantServiceRegistrationController:
 
             await self._api_key_store.delete(registration.api_key_name)
 
+        self._service_info_cache.invalidate(assistant_service_id)
+        self._assistant_controller.invalidate_forwarding_assistants(assistant_service_id)
+
     async def get_service_info(self, assistant_service_id: str) -> ServiceInfoModel:
         async with self._get_session() as session:
             registration = (
@@ -381,7 +394,10 @@ class AssistantServiceRegistrationController:
             if not registration.assistant_service_online:
                 raise exceptions.NotFoundError()
 
-        return await (await self._client_pool.service_client(registration=registration)).get_service_info()
+        info = await self._cached_service_info(registration, wait=True)
+        if info is None:
+            raise exceptions.NotFoundError()
+        return info
 
     async def get_service_infos(self, user_ids: set[str] = set()) -> AssistantServiceInfoList:
         async with self._get_session() as session:
@@ -403,10 +419,7 @@ class AssistantServiceRegistrationController:
             assistant_services = await session.exec(query_registrations)
 
         infos_or_exceptions = await asyncio.gather(
-            *[
-                (await self._client_pool.service_client(registration=registration)).get_service_info()
-                for registration in assistant_services
-            ],
+            *[self._cached_service_info(registration) for registration in assistant_services],
             return_exceptions=True,
         )
 
@@ -423,3 +436,48 @@ class AssistantServiceRegistrationController:
                     infos.append(info_or_exception)
 
         return AssistantServiceInfoList(assistant_service_infos=infos)
+
+    async def refresh_service_infos(self, within_seconds: float) -> None:
+        """
+        Starts refreshes of the cached service infos of online assistant services that expire within the given
+        time, and removes those of services that are no longer online.
+        """
+        async with self._get_session() as session:
+            registrations = (
+                await session.exec(
+                    select(db.AssistantServiceRegistration).where(
+                        col(db.AssistantServiceRegistration.assistant_service_online).is_(True)
+                    )
+                )
+            ).all()
+
+        self._service_info_cache.retain(self._service_info_key(registration) for registration in registrations)
+        for registration in registrations:
+            key = self._service_info_key(registration)
+            if self._service_info_cache.expires_within(key, within_seconds):
+                self._service_info_cache.refresh(key, await self._service_info_fetcher(registration))
+
+    def service_info_cache_metrics(self) -> service_info_cache.ServiceInfoCacheMetrics:
+        return self._service_info_cache.metrics()
+
+    async def _cached_service_info(
+        self, registration: db.AssistantServiceRegistration, wait: bool = False
+    ) -> ServiceInfoModel | None:
+        info = await self._service_info_cache.get(
+            self._service_info_key(registration), await self._service_info_fetcher(registration), wait=wait
+        )
+        if info is None:
+            logger.warning(
+                "timed out getting assistant service info; assistant_service_id: %s",
+                registration.assistant_service_id,
+            )
+        return info
+
+    async def _service_info_fetcher(
+        self, registration: db.AssistantServiceRegistration
+    ) -> Callable[[], Awaitable[ServiceInfoModel]]:
+        return (await self._client_pool.service_client(registration=registration)).get_service_info
+
+    @staticmethod
+    def _service_info_key(registration: db.AssistantServiceRegistration) -> service_info_cache.ServiceInfoKey:
+        return registration.assistant_service_id, registration.assistant_service_url
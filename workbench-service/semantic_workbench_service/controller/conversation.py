@@ -1,9 +1,12 @@
+import base64
 import datetime
+import functools
 import logging
 import uuid
 from typing import (
     Annotated,
     AsyncContextManager,
+    AsyncIterator,
     Awaitable,
     Callable,
     Iterable,
@@ -13,6 +16,7 @@ from typing import (
 
 import deepmerge
 import openai_client
+from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 from pydantic import BaseModel, Field, HttpUrl
 from semantic_workbench_api_model.assistant_service_client import AssistantError
@@ -36,8 +40,9 @@ from semantic_workbench_api_model.workbench_model import (
 from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import and_, col, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
 
-from .. import auth, db, query, settings
+from .. import auth, db, debounce, query, settings
 from ..event import ConversationEventQueueItem
 from . import assistant, convert, exceptions
 from . import participant as participant_
@@ -75,6 +80,16 @@ class ConversationController:
         self._get_session = get_session
         self._notify_event = notify_event
         self._assistant_controller = assistant_controller
+        self._retitle_debouncer = debounce.KeyedDebouncer[uuid.UUID](
+            max_concurrency=settings.service.conversation_retitle_max_concurrency
+        )
+        self._openai_client: AsyncOpenAI | None = None
+
+    async def aclose(self) -> None:
+        await self._retitle_debouncer.aclose()
+        if self._openai_client is not None:
+            await self._openai_client.close()
+            self._openai_client = None
 
     async def create_conversation(
         self,
@@ -838,12 +853,23 @@ class ConversationController:
             await session.commit()
             await session.refresh(message)
 
+            # allows event consumers that track the messages in the conversation to detect missed events
+            previous_message_id = (
+                await session.exec(
+                    select(db.ConversationMessage.message_id)
+                    .where(db.ConversationMessage.conversation_id == conversation_id)
+                    .where(db.ConversationMessage.sequence < message.sequence)
+                    .order_by(col(db.ConversationMessage.sequence).desc())
+                    .limit(1)
+                )
+            ).first()
+
             background_task: Iterable = ()
             if self._conversation_candidate_for_retitling(
                 conversation=conversation
             ) and self._message_candidate_for_retitling(message=message):
                 background_task = (
-                    self._retitle_conversation,
+                    self._schedule_retitle_conversation,
                     principal,
                     conversation_id,
                     message.sequence,
@@ -858,6 +884,7 @@ class ConversationController:
                     event=ConversationEventType.message_created,
                     data={
                         "message": message_response.model_dump(),
+                        "previous_message_id": str(previous_message_id) if previous_message_id else None,
                     },
                 ),
             )
@@ -885,6 +912,34 @@ class ConversationController:
 
         return True
 
+    async def _schedule_retitle_conversation(
+        self,
+        principal: auth.ActorPrincipal,
+        conversation_id: uuid.UUID,
+        latest_message_sequence: int,
+    ) -> None:
+        """
+        Schedules a retitle of the conversation, coalescing it with any that are already scheduled, so that a
+        conversation is retitled once for a burst of messages.
+        """
+        self._retitle_debouncer.schedule(
+            conversation_id,
+            functools.partial(self._retitle_conversation, principal, conversation_id, latest_message_sequence),
+            delay_seconds=settings.service.conversation_retitle_delay_seconds,
+        )
+
+    def _retitle_client(self) -> AsyncOpenAI:
+        # the client, and its connection pool, are shared by all retitles
+        if self._openai_client is None:
+            self._openai_client = openai_client.create_client(
+                openai_client.AzureOpenAIServiceConfig(
+                    auth_config=openai_client.AzureOpenAIAzureIdentityAuthConfig(),
+                    azure_openai_deployment=settings.service.azure_openai_deployment,
+                    azure_openai_endpoint=HttpUrl(settings.service.azure_openai_endpoint),
+                ),
+            )
+        return self._openai_client
+
     async def _retitle_conversation(
         self,
         principal: auth.ActorPrincipal,
@@ -945,32 +1000,25 @@ class ConversationController:
 
         # Call the LLM to get a new title
         try:
-            async with openai_client.create_client(
-                openai_client.AzureOpenAIServiceConfig(
-                    auth_config=openai_client.AzureOpenAIAzureIdentityAuthConfig(),
-                    azure_openai_deployment=settings.service.azure_openai_deployment,
-                    azure_openai_endpoint=HttpUrl(settings.service.azure_openai_endpoint),
-                ),
-            ) as client:
-                response = await client.beta.chat.completions.parse(
-                    messages=[
-                        *completion_messages,
-                        {
-                            "role": "developer",
-                            "content": ("The current conversation title is: {conversation.title}"),
-                        },
-                    ],
-                    model=settings.service.azure_openai_model,
-                    # the model's description also contains instructions
-                    response_format=ConversationTitleResponse,
-                )
+            response = await self._retitle_client().beta.chat.completions.parse(
+                messages=[
+                    *completion_messages,
+                    {
+                        "role": "developer",
+                        "content": ("The current conversation title is: {conversation.title}"),
+                    },
+                ],
+                model=settings.service.azure_openai_model,
+                # the model's description also contains instructions
+                response_format=ConversationTitleResponse,
+            )
 
-                if not response.choices:
-                    raise RuntimeError("No choices in azure openai response")
+            if not response.choices:
+                raise RuntimeError("No choices in azure openai response")
 
-                result = response.choices[0].message.parsed
-                if result is None:
-                    raise RuntimeError("No parsed result in azure openai response")
+            result = response.choices[0].message.parsed
+            if result is None:
+                raise RuntimeError("No parsed result in azure openai response")
 
         except Exception:
             logger.exception("Failed to retitle conversation %s", conversation_id)
@@ -1069,8 +1117,13 @@ class ConversationController:
         message_types: list[MessageType] | None = None,
         before: uuid.UUID | None = None,
         after: uuid.UUID | None = None,
+        before_cursor: str | None = None,
+        after_cursor: str | None = None,
         limit: int = 100,
     ) -> ConversationMessageList:
+        before_sequence = _sequence_from_message_cursor(before_cursor) if before_cursor is not None else None
+        after_sequence = _sequence_from_message_cursor(after_cursor) if after_cursor is not None else None
+
         async with self._get_session() as session:
             conversation = (
                 await session.exec(
@@ -1082,25 +1135,15 @@ class ConversationController:
             if conversation is None:
                 raise exceptions.NotFoundError()
 
-            select_query = query.select_conversation_message_projections_for(principal=principal).where(
-                db.ConversationMessage.conversation_id == conversation_id
+            select_query = _filter_messages(
+                query.select_conversation_message_projections_for(principal=principal).where(
+                    db.ConversationMessage.conversation_id == conversation_id
+                ),
+                participant_roles=participant_roles,
+                participant_ids=participant_ids,
+                message_types=message_types,
             )
 
-            if participant_roles is not None:
-                select_query = select_query.where(
-                    col(db.ConversationMessage.sender_participant_role).in_([r.value for r in participant_roles])
-                )
-
-            if participant_ids is not None:
-                select_query = select_query.where(
-                    col(db.ConversationMessage.sender_participant_id).in_(participant_ids)
-                )
-
-            if message_types is not None:
-                select_query = select_query.where(
-                    col(db.ConversationMessage.message_type).in_([t.value for t in message_types])
-                )
-
             if before is not None:
                 boundary = (
                     await session.exec(
@@ -1123,6 +1166,13 @@ class ConversationController:
                 if boundary is not None:
                     select_query = select_query.where(db.ConversationMessage.sequence > boundary.sequence)
 
+            # cursors carry the boundary sequence, so do not require a lookup
+            if before_sequence is not None:
+                select_query = select_query.where(db.ConversationMessage.sequence < before_sequence)
+
+            if after_sequence is not None:
+                select_query = select_query.where(db.ConversationMessage.sequence > after_sequence)
+
             messages = list(
                 (
                     await session.exec(select_query.order_by(col(db.ConversationMessage.sequence).desc()).limit(limit))
@@ -1132,6 +1182,69 @@ class ConversationController:
 
             return convert.conversation_message_list_from_db(messages)
 
+    async def get_message_stream(
+        self,
+        principal: auth.ActorPrincipal,
+        conversation_id: uuid.UUID,
+        participant_roles: list[ParticipantRole] | None = None,
+        participant_ids: list[str] | None = None,
+        message_types: list[MessageType] | None = None,
+        after: uuid.UUID | None = None,
+        after_cursor: str | None = None,
+    ) -> AsyncIterator[ConversationMessage]:
+        """
+        Returns an iterator of all the messages after the given message id or cursor, oldest first. Access to the
+        conversation is checked before returning; messages are read through a server-side cursor as the iterator is
+        consumed.
+        """
+        after_sequence = _sequence_from_message_cursor(after_cursor) if after_cursor is not None else None
+
+        async with self._get_session() as session:
+            conversation = (
+                await session.exec(
+                    query.select_conversations_for(principal=principal, include_observer=True).where(
+                        db.Conversation.conversation_id == conversation_id
+                    )
+                )
+            ).one_or_none()
+            if conversation is None:
+                raise exceptions.NotFoundError()
+
+            if after is not None:
+                boundary = (
+                    await session.exec(
+                        select(db.ConversationMessage.sequence).where(
+                            db.ConversationMessage.conversation_id == conversation_id,
+                            db.ConversationMessage.message_id == after,
+                        )
+                    )
+                ).one_or_none()
+                if boundary is not None and (after_sequence is None or boundary > after_sequence):
+                    after_sequence = boundary
+
+        select_query = _filter_messages(
+            query.select_conversation_message_projections_for(principal=principal).where(
+                db.ConversationMessage.conversation_id == conversation_id
+            ),
+            participant_roles=participant_roles,
+            participant_ids=participant_ids,
+            message_types=message_types,
+        )
+        if after_sequence is not None:
+            select_query = select_query.where(db.ConversationMessage.sequence > after_sequence)
+
+        select_query = select_query.order_by(col(db.ConversationMessage.sequence)).execution_options(
+            yield_per=settings.service.message_stream_batch_size
+        )
+
+        async def message_stream() -> AsyncIterator[ConversationMessage]:
+            async with self._get_session() as session:
+                result = await session.stream(select_query)
+                async for message, has_debug in result:
+                    yield convert.conversation_message_from_db(message, has_debug=has_debug)
+
+        return message_stream()
+
     async def delete_message(
         self,
         conversation_id: uuid.UUID,
@@ -1174,3 +1287,37 @@ class ConversationController:
                     ),
                 )
             )
+
+
+def _filter_messages(
+    select_query: Select[tuple[db.ConversationMessage, bool]],
+    participant_roles: list[ParticipantRole] | None,
+    participant_ids: list[str] | None,
+    message_types: list[MessageType] | None,
+) -> Select[tuple[db.ConversationMessage, bool]]:
+    if participant_roles is not None:
+        select_query = select_query.where(
+            col(db.ConversationMessage.sender_participant_role).in_([r.value for r in participant_roles])
+        )
+
+    if participant_ids is not None:
+        select_query = select_query.where(col(db.ConversationMessage.sender_participant_id).in_(participant_ids))
+
+    if message_types is not None:
+        select_query = select_query.where(
+            col(db.ConversationMessage.message_type).in_([t.value for t in message_types])
+        )
+
+    return select_query
+
+
+def _sequence_from_message_cursor(cursor: str) -> int:
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, sequence = decoded.split(":", 1)
+        if prefix != "sequence":
+            raise ValueError(f"unexpected cursor prefix: {prefix}")
+        return int(sequence)
+
+    except ValueError as e:
+        raise exceptions.InvalidArgumentError("invalid message cursor") from e
@@ -3,6 +3,7 @@ import uuid
 from typing import AsyncContextManager, Awaitable, Callable
 
 from semantic_workbench_api_model.workbench_model import (
+    ConversationEventType,
     ConversationShare,
     ConversationShareList,
     ConversationShareRedemption,
@@ -15,6 +16,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from .. import auth, db, query
 from ..event import ConversationEventQueueItem
 from . import convert, exceptions
+from . import participant as participant_
 from . import user as user_
 
 logger = logging.getLogger(__name__)
@@ -189,6 +191,11 @@ class ConversationShareController:
                 )
             ).one_or_none()
             new_participant = participant is None or not participant.active_participant
+            event_type = (
+                ConversationEventType.participant_created
+                if participant is None
+                else ConversationEventType.participant_updated
+            )
 
             if participant is None:
                 participant = db.UserParticipant(
@@ -223,6 +230,22 @@ class ConversationShareController:
 
             await session.refresh(redemption)
 
+            if new_participant:
+                await session.refresh(participant)
+                participants = await participant_.get_conversation_participants(
+                    session=session, conversation_id=conversation_share.conversation_id, include_inactive=True
+                )
+                await self._notify_event(
+                    ConversationEventQueueItem(
+                        event=participant_.participant_event(
+                            event_type=event_type,
+                            conversation_id=conversation_share.conversation_id,
+                            participant=convert.conversation_participant_from_db_user(participant),
+                            participants=participants,
+                        ),
+                    )
+                )
+
             return convert.conversation_share_redemption_from_db(redemption)
 
     async def get_redemptions_for_share(
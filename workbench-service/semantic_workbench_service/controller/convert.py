@@ -1,3 +1,4 @@
+import base64
 import uuid
 from typing import Iterable, Mapping
 
@@ -258,10 +259,19 @@ def conversation_message_from_db(model: db.ConversationMessage, has_debug: bool)
     )
 
 
+def conversation_message_cursor(sequence: int) -> str:
+    return base64.urlsafe_b64encode(f"sequence:{sequence}".encode()).decode().rstrip("=")
+
+
 def conversation_message_list_from_db(
     models: Iterable[tuple[db.ConversationMessage, bool]],
 ) -> ConversationMessageList:
-    return ConversationMessageList(messages=[conversation_message_from_db(m, debug) for m, debug in models])
+    models = list(models)
+    return ConversationMessageList(
+        messages=[conversation_message_from_db(m, debug) for m, debug in models],
+        first_cursor=conversation_message_cursor(models[0][0].sequence) if models else None,
+        last_cursor=conversation_message_cursor(models[-1][0].sequence) if models else None,
+    )
 
 
 def conversation_message_debug_from_db(model: db.ConversationMessageDebug) -> ConversationMessageDebug:
@@ -76,3 +76,16 @@ class ForbiddenError(Error):
         ] = None,
     ) -> None:
         super().__init__(status_code=403, detail=detail)
+
+
+class RangeNotSatisfiableError(Error):
+    def __init__(
+        self,
+        file_size: Annotated[
+            int,
+            Doc("""
+                The size of the content, sent to the client in the `Content-Range` header.
+                """),
+        ],
+    ) -> None:
+        super().__init__(status_code=416, headers={"Content-Range": f"bytes */{file_size}"})
@@ -1,19 +1,20 @@
 import collections
 import datetime
+import logging
 import re
-import tempfile
 import uuid
-from operator import or_
 from typing import IO, Any, AsyncGenerator, Generator, Iterable, Iterator
 
 from attr import dataclass
 from pydantic import BaseModel
-from sqlalchemy import ScalarResult, func
+import sqlalchemy
 from sqlmodel import SQLModel, col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import db
 
+logger = logging.getLogger(__name__)
+
 
 class _Record(BaseModel):
     type: str
@@ -25,6 +26,9 @@ def _model_record(model: SQLModel) -> _Record:
     return _Record(type=model.__class__.__name__, data=data)
 
 
+_EXPORT_BATCH_SIZE = 500
+
+
 def _lines_from(records: Iterator[_Record]) -> Generator[bytes, None, None]:
     for record in records:
         yield (record.model_dump_json() + "\n").encode("utf-8")
@@ -35,86 +39,50 @@ async def export_file(
     assistant_ids: set[uuid.UUID],
     session: AsyncSession,
 ) -> AsyncGenerator[bytes, None]:
-    assistants = await session.exec(
+    """
+    Yields the records of the conversations and assistants as NDJSON lines. The records are streamed from the
+    database, so that the memory used does not grow with the size of the conversations.
+    """
+    queries = [
         select(db.Assistant)
         .where(col(db.Assistant.assistant_id).in_(assistant_ids))
-        .order_by(col(db.Assistant.assistant_id).asc())
-    )
-
-    conversations = await session.exec(
+        .order_by(col(db.Assistant.assistant_id).asc()),
         select(db.Conversation)
         .where(col(db.Conversation.conversation_id).in_(conversation_ids))
-        .order_by(col(db.Conversation.conversation_id).asc())
-    )
-
-    files = await session.exec(
-        select(db.File)
-        .where(col(db.File.conversation_id).in_(conversation_ids))
-        .order_by(col(db.File.conversation_id).asc())
-        .order_by(col(db.File.created_datetime).asc())
-    )
-
-    file_versions = await session.exec(
-        select(db.FileVersion)
-        .join(db.File)
-        .where(col(db.File.conversation_id).in_(conversation_ids))
-        .order_by(col(db.File.conversation_id).asc())
-        .order_by(col(db.File.created_datetime).asc())
-        .order_by(col(db.FileVersion.version).asc())
-    )
-
-    messages = await session.exec(
+        .order_by(col(db.Conversation.conversation_id).asc()),
         select(db.ConversationMessage)
         .where(col(db.ConversationMessage.conversation_id).in_(conversation_ids))
         .order_by(col(db.ConversationMessage.conversation_id).asc())
-        .order_by(col(db.ConversationMessage.sequence).asc())
-    )
-
-    message_debugs = await session.exec(
+        .order_by(col(db.ConversationMessage.sequence).asc()),
         select(db.ConversationMessageDebug)
         .join(db.ConversationMessage)
         .where(col(db.ConversationMessage.conversation_id).in_(conversation_ids))
         .order_by(col(db.ConversationMessage.conversation_id).asc())
-        .order_by(col(db.ConversationMessage.sequence).asc())
-    )
-
-    user_participants = await session.exec(
+        .order_by(col(db.ConversationMessage.sequence).asc()),
         select(db.UserParticipant)
         .where(col(db.UserParticipant.conversation_id).in_(conversation_ids))
         .order_by(col(db.UserParticipant.conversation_id).asc())
-        .order_by(col(db.UserParticipant.joined_datetime).asc())
-    )
-
-    assistant_participants = await session.exec(
+        .order_by(col(db.UserParticipant.joined_datetime).asc()),
         select(db.AssistantParticipant)
         .where(col(db.AssistantParticipant.conversation_id).in_(conversation_ids))
         .order_by(col(db.AssistantParticipant.conversation_id).asc())
-        .order_by(col(db.AssistantParticipant.joined_datetime).asc())
-    )
+        .order_by(col(db.AssistantParticipant.joined_datetime).asc()),
+        select(db.File)
+        .where(col(db.File.conversation_id).in_(conversation_ids))
+        .order_by(col(db.File.conversation_id).asc())
+        .order_by(col(db.File.created_datetime).asc()),
+        select(db.FileVersion)
+        .join(db.File)
+        .where(col(db.File.conversation_id).in_(conversation_ids))
+        .order_by(col(db.File.conversation_id).asc())
+        .order_by(col(db.File.created_datetime).asc())
+        .order_by(col(db.FileVersion.version).asc()),
+    ]
 
-    def _records(*sources: ScalarResult) -> Generator[_Record, None, None]:
-        for source in sources:
-            for record in source:
-                yield _model_record(record)
-
-    with tempfile.TemporaryFile() as f:
-        f.writelines(
-            _lines_from(
-                _records(
-                    assistants,
-                    conversations,
-                    messages,
-                    message_debugs,
-                    user_participants,
-                    assistant_participants,
-                    files,
-                    file_versions,
-                )
-            )
-        )
-        f.seek(0)
-        for line in iter(lambda: f.readline(), b""):
-            yield line
+    for query in queries:
+        records = await session.stream_scalars(query.execution_options(yield_per=_EXPORT_BATCH_SIZE))
+        async for partition in records.partitions():
+            yield b"".join(_lines_from(_model_record(record) for record in partition))
 
 
 @dataclass
@@ -124,23 +92,108 @@ class ImportResult:
     message_id_old_to_new: dict[uuid.UUID, uuid.UUID]
     assistant_conversation_old_ids: dict[uuid.UUID, set[uuid.UUID]]
     file_id_old_to_new: dict[uuid.UUID, uuid.UUID]
+    # the number of records imported, by record type
+    record_counts: dict[str, int]
+
+
+_IMPORT_BATCH_SIZE = 1_000
+_IMPORT_PROGRESS_INTERVAL = 10_000
+
+
+def _row(model: SQLModel, exclude: set[str] = set()) -> dict[str, Any]:
+    """
+    Returns the column values of the model, keyed by column name, for a Core INSERT.
+    """
+    mapper = sqlalchemy.inspect(model.__class__)
+    return {
+        attribute.columns[0].name: getattr(model, attribute.key)
+        for attribute in mapper.column_attrs
+        if attribute.key not in exclude
+    }
+
+
+class _BatchInserter:
+    """
+    Collects rows for a table and inserts them in batches. Records are exported in dependency order, so the pending
+    rows are inserted whenever the table changes.
+    """
+
+    def __init__(self, session: AsyncSession, record_counts: dict[str, int]) -> None:
+        self._session = session
+        self._record_counts = record_counts
+        self._model: type[SQLModel] | None = None
+        self._rows: list[dict[str, Any]] = []
+
+    async def add(self, model: SQLModel, exclude: set[str] = set()) -> None:
+        if model.__class__ is not self._model or len(self._rows) >= _IMPORT_BATCH_SIZE:
+            await self.flush()
+            self._model = model.__class__
+        self._rows.append(_row(model, exclude=exclude))
+
+    async def flush(self) -> None:
+        if self._model is None or not self._rows:
+            return
+        connection = await self._session.connection()
+        await connection.execute(sqlalchemy.insert(self._model), self._rows)
+        self._record_counts[self._model.__name__] = self._record_counts.get(self._model.__name__, 0) + len(self._rows)
+        self._rows = []
+
+
+class _NameCounts:
+    """
+    Counts the existing names that a name collides with, case-insensitively, where "name (n)" collides with "name".
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self._counts: collections.Counter[str] = collections.Counter()
+        for name in names:
+            self._add(name)
+
+    def _add(self, name: str) -> None:
+        name = name.lower()
+        self._counts[name] += 1
+        if match := re.match(r"^(.*) \(\d+\)$", name):
+            self._counts[match.group(1)] += 1
+
+    def unique(self, name: str) -> str:
+        """
+        Returns the name, with a "(n)" suffix if it collides with existing names, and counts it as existing.
+        """
+        existing_count = self._counts[name.lower()]
+        if existing_count > 0:
+            name = f"{name} ({existing_count})"
+        self._add(name)
+        return name
 
 
 async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[bytes]]) -> ImportResult:
+    """
+    Imports the records from exported NDJSON files. The records are parsed as they are read, and inserted in batches
+    per table.
+    """
     result = ImportResult(
         assistant_id_old_to_new={},
         conversation_id_old_to_new={},
         message_id_old_to_new={},
         assistant_conversation_old_ids=collections.defaultdict(set),
         file_id_old_to_new={},
+        record_counts={},
     )
+    inserter = _BatchInserter(session, result.record_counts)
+    imported_user_ids: set[str] = set()
+    assistant_names: _NameCounts | None = None
+    conversation_titles: _NameCounts | None = None
 
     async def _process_record(record: _Record) -> None:
+        nonlocal assistant_names, conversation_titles
+
         match record.type:
             case db.Assistant.__name__:
                 assistant = db.Assistant.model_validate(record.data)
 
-                # re-use existing assistants with matching service_id, template_id, and name
+                # re-use existing assistants with matching service_id, template_id, and name, including those
+                # imported earlier in this import
+                await inserter.flush()
                 existing_assistant = (
                     await session.exec(
                         select(db.Assistant)
@@ -164,30 +217,13 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 assistant.assistant_id, _ = result.assistant_id_old_to_new[assistant.assistant_id]
                 assistant.owner_id = owner_id
 
-                like_expression = re.sub(r"([?%_])", r"\\\1", assistant.name.lower())
-                like_expression = f"{like_expression} (%)"
-                existing_count = 0
-                for possible_match in await session.exec(
-                    select(db.Assistant)
-                    .where(db.Assistant.owner_id == owner_id)
-                    .where(
-                        or_(
-                            func.lower(col(db.Assistant.name)).like(like_expression),
-                            func.lower(col(db.Assistant.name)) == assistant.name.lower(),
-                        )
+                if assistant_names is None:
+                    assistant_names = _NameCounts(
+                        (await session.exec(select(db.Assistant.name).where(db.Assistant.owner_id == owner_id))).all()
                     )
-                ):
-                    if possible_match.name.lower() == assistant.name.lower():
-                        existing_count += 1
-                        continue
-                    name = possible_match.name.lower().replace(assistant.name.lower(), "", 1)
-                    if re.match(r"^ \(\d+\)$", name):
-                        existing_count += 1
+                assistant.name = assistant_names.unique(assistant.name)
 
-                if existing_count > 0:
-                    assistant.name = f"{assistant.name} ({existing_count})"
-
-                session.add(assistant)
+                await inserter.add(assistant)
 
             case db.AssistantParticipant.__name__:
                 participant = db.AssistantParticipant.model_validate(record.data)
@@ -200,7 +236,7 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 assistant_id, _ = result.assistant_id_old_to_new.get(participant.assistant_id, (None, None))
                 if assistant_id is not None:
                     participant.assistant_id = assistant_id
-                session.add(participant)
+                await inserter.add(participant)
 
             case db.UserParticipant.__name__:
                 participant = db.UserParticipant.model_validate(record.data)
@@ -212,11 +248,13 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 participant.active_participant = False
                 participant.status = None
 
-                await db.insert_if_not_exists(
-                    session, db.User(user_id=participant.user_id, name="unknown imported user", service_user=False)
-                )
+                if participant.user_id not in imported_user_ids:
+                    imported_user_ids.add(participant.user_id)
+                    await db.insert_if_not_exists(
+                        session, db.User(user_id=participant.user_id, name="unknown imported user", service_user=False)
+                    )
 
-                session.add(participant)
+                await inserter.add(participant)
 
             case db.Conversation.__name__:
                 conversation = db.Conversation.model_validate(record.data)
@@ -226,31 +264,17 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 conversation.created_datetime = datetime.datetime.now(datetime.UTC)
                 conversation.owner_id = owner_id
 
-                like_expression = re.sub(r"([?%_])", r"\\\1", conversation.title.lower())
-                like_expression = f"{like_expression} (%)"
-                existing_count = 0
-                for possible_match in await session.exec(
-                    select(db.Conversation)
-                    .where(db.Conversation.owner_id == owner_id)
-                    .where(
-                        or_(
-                            func.lower(col(db.Conversation.title)).like(like_expression),
-                            func.lower(col(db.Conversation.title)) == conversation.title.lower(),
-                        )
+                if conversation_titles is None:
+                    conversation_titles = _NameCounts(
+                        (
+                            await session.exec(
+                                select(db.Conversation.title).where(db.Conversation.owner_id == owner_id)
+                            )
+                        ).all()
                     )
-                ):
-                    if possible_match.title.lower() == conversation.title.lower():
-                        existing_count += 1
-                        continue
+                conversation.title = conversation_titles.unique(conversation.title)
 
-                    name = possible_match.title.lower().replace(conversation.title.lower(), "", 1)
-                    if re.match(r"^ \(\d+\)$", name):
-                        existing_count += 1
-
-                if existing_count > 0:
-                    conversation.title = f"{conversation.title} ({existing_count})"
-
-                session.add(conversation)
+                await inserter.add(conversation)
 
             case db.ConversationMessage.__name__:
                 record.data.pop("sequence", None)
@@ -268,7 +292,8 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                     )
                     if assistant_id is not None:
                         message.sender_participant_id = str(assistant_id)
-                session.add(message)
+                # the database assigns the sequence, in the order the messages are inserted
+                await inserter.add(message, exclude={"sequence"})
 
             case db.ConversationMessageDebug.__name__:
                 message_debug = db.ConversationMessageDebug.model_validate(record.data)
@@ -276,7 +301,7 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 if message_id is None:
                     raise RuntimeError(f"message_id {message_debug.message_id} is not found")
                 message_debug.message_id = message_id
-                session.add(message_debug)
+                await inserter.add(message_debug)
 
             case db.File.__name__:
                 file = db.File.model_validate(record.data)
@@ -287,7 +312,7 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 if conversation_id is None:
                     raise RuntimeError(f"conversation_id {file.conversation_id} is not found")
                 file.conversation_id = conversation_id
-                session.add(file)
+                await inserter.add(file)
 
             case db.FileVersion.__name__:
                 file_version = db.FileVersion.model_validate(record.data)
@@ -302,13 +327,18 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                     )
                     if assistant_id is not None:
                         file_version.participant_id = str(assistant_id)
-                session.add(file_version)
+                await inserter.add(file_version)
 
+    record_count = 0
     for file in files:
         for line in iter(lambda: file.readline(), b""):
-            record = _Record.model_validate_json(line.decode("utf-8"))
-            await _process_record(record)
-            await session.flush()
+            await _process_record(_Record.model_validate_json(line))
+
+            record_count += 1
+            if record_count % _IMPORT_PROGRESS_INTERVAL == 0:
+                logger.info("importing records; count: %d", record_count)
+
+    await inserter.flush()
 
     # ensure the owner is a participant in all conversations
     for _, conversation_id in result.conversation_id_old_to_new.items():
@@ -336,4 +366,6 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
 
     await session.flush()
 
+    logger.info("imported records; counts: %s", result.record_counts)
+
     return result
@@ -1,11 +1,14 @@
+import asyncio
+import contextlib
+import pathlib
+import re
 import uuid
 from typing import (
     Any,
     AsyncContextManager,
+    AsyncIterator,
     Awaitable,
     Callable,
-    Generator,
-    Iterable,
     NamedTuple,
 )
 
@@ -23,10 +26,52 @@ from .. import auth, db, files, query
 from ..event import ConversationEventQueueItem
 from . import convert, exceptions
 
+FileGarbageCollectionResult = NamedTuple(
+    "FileGarbageCollectionResult", [("deleted_blob_count", int), ("deleted_file_count", int)]
+)
+
 DownloadFileResult = NamedTuple(
-    "DownloadFileResult", [("filename", str), ("content_type", str), ("stream", Iterable[bytes])]
+    "DownloadFileResult",
+    [
+        ("filename", str),
+        ("content_type", str),
+        ("etag", str),
+        ("file_size", int),
+        # streams the content from start up to, but not including, stop
+        ("stream", Callable[[int, int], AsyncIterator[bytes]]),
+    ],
 )
 
+_BYTE_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_byte_range(range_header: str, file_size: int) -> tuple[int, int] | None:
+    """
+    Parses a single-range Range header into the start and stop offsets of the content. Returns None for headers
+    that are malformed, or that request multiple ranges, so that the whole content is returned instead.
+    """
+    match = _BYTE_RANGE_PATTERN.match(range_header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        stop = file_size if not last else min(int(last) + 1, file_size)
+        if last and int(last) < start:
+            return None
+    elif last:
+        # a suffix range requests the last bytes of the content
+        start = max(file_size - int(last), 0)
+        stop = file_size if int(last) else 0
+    else:
+        return None
+
+    if start >= stop:
+        raise exceptions.RangeNotSatisfiableError(file_size=file_size)
+
+    return start, stop
+
 
 class FileController:
     def __init__(
@@ -34,10 +79,12 @@ class FileController:
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
         notify_event: Callable[[ConversationEventQueueItem], Awaitable],
         file_storage: files.Storage,
+        file_storage_settings: files.StorageSettings,
     ) -> None:
         self._get_session = get_session
         self._notify_event = notify_event
         self._file_storage = file_storage
+        self._file_storage_settings = file_storage_settings
 
     async def upload_files(
         self,
@@ -101,6 +148,9 @@ class FileController:
             file_record_and_versions: list[tuple[db.File, db.FileVersion]] = []
 
             for file_record, upload_file in file_record_and_uploads:
+                # the upload is hashed as it is written, off the event loop
+                content_hash, file_size = await asyncio.to_thread(self._file_storage.write_blob, upload_file.file)
+
                 file_record.current_version += 1
                 new_version = db.FileVersion(
                     file_id=file_record.file_id,
@@ -108,17 +158,13 @@ class FileController:
                     participant_id=participant_id,
                     version=file_record.current_version,
                     content_type=upload_file.content_type or "",
-                    file_size=upload_file.size or 0,
+                    file_size=file_size,
                     meta_data=file_metadata.get(file_record.filename, {}),
                     storage_filename=f"{file_record.file_id.hex}_{file_record.current_version}",
+                    content_hash=content_hash,
                 )
                 file_record_and_versions.append((file_record, new_version))
 
-                self._file_storage.write_file(
-                    namespace=str(conversation_id),
-                    filename=new_version.storage_filename,
-                    content=upload_file.file,
-                )
                 session.add(file_record)
                 session.add(new_version)
 
@@ -302,20 +348,22 @@ class FileController:
 
             file_record, version_record = file_records
 
-        def generator_wrapper() -> Generator[bytes, Any, None]:
-            with self._file_storage.read_file(
-                namespace=str(conversation_id),
-                filename=version_record.storage_filename,
-            ) as file:
-                for chunk in iter(lambda: file.read(100 * 1_024), b""):
-                    yield chunk
+        content_path = self._version_content_path(conversation_id, version_record)
+        try:
+            file_size = (await asyncio.to_thread(content_path.stat)).st_size
+        except FileNotFoundError:
+            raise exceptions.NotFoundError()
 
         filename = file_record.filename.split("/")[-1]
 
         return DownloadFileResult(
             filename=filename,
             content_type=version_record.content_type,
-            stream=generator_wrapper(),
+            # the content of a file version never changes, so it is identified by its hash, or for files from before
+            # the blob store, by its storage filename
+            etag=f'"{version_record.content_hash or version_record.storage_filename}"',
+            file_size=file_size,
+            stream=lambda start, stop: files.read_chunks(content_path, start=start, stop=stop),
         )
 
     async def delete_file(
@@ -356,10 +404,13 @@ class FileController:
             ).all()
 
             for version_record in version_records:
-                self._file_storage.delete_file(
-                    namespace=str(conversation_id),
-                    filename=version_record.storage_filename,
-                )
+                # blobs may be shared with other file versions, and are deleted by garbage collection once unreferenced
+                if version_record.content_hash is None:
+                    await asyncio.to_thread(
+                        self._file_storage.delete_file,
+                        namespace=str(conversation_id),
+                        filename=version_record.storage_filename,
+                    )
                 await session.delete(version_record)
             await session.commit()
 
@@ -377,3 +428,92 @@ class FileController:
                 ),
             )
         )
+
+    def _version_content_path(self, conversation_id: uuid.UUID, version_record: db.FileVersion) -> pathlib.Path:
+        if version_record.content_hash is not None:
+            return self._file_storage.blob_path(version_record.content_hash)
+
+        return self._file_storage.path_for(namespace=str(conversation_id), filename=version_record.storage_filename)
+
+    async def _referenced_hashes(self, content_hashes: list[str]) -> set[str]:
+        async with self._get_session() as session:
+            return set(
+                (
+                    await session.exec(
+                        select(db.FileVersion.content_hash)
+                        .where(col(db.FileVersion.content_hash).in_(content_hashes))
+                        .distinct()
+                    )
+                ).all()
+            )
+
+    async def collect_garbage(self) -> FileGarbageCollectionResult:
+        """
+        Deletes the blobs that are no longer referenced by any file version, and the files, from before the blob
+        store, that are no longer referenced by a file version, including those of deleted conversations.
+        """
+        grace_period_seconds = self._file_storage_settings.blob_gc_grace_period_seconds
+
+        candidate_hashes = await asyncio.to_thread(
+            lambda: list(self._file_storage.list_blobs(older_than_seconds=grace_period_seconds))
+        )
+        unreferenced_hashes = set(candidate_hashes) - await self._referenced_hashes(candidate_hashes)
+
+        # an upload of the same content may reference a blob after the references are read; blobs are moved out of the
+        # blob store, so that later uploads store the content again, and those that uploads refreshed or referenced
+        # before the move are restored
+        tombstoned_hashes = await asyncio.to_thread(lambda: list(self._file_storage.list_tombstones()))
+        for content_hash in unreferenced_hashes:
+            if await asyncio.to_thread(
+                self._file_storage.tombstone_blob, content_hash, older_than_seconds=grace_period_seconds
+            ):
+                tombstoned_hashes.append(content_hash)
+
+        referenced_hashes = await self._referenced_hashes(tombstoned_hashes)
+
+        deleted_blob_count = 0
+        for content_hash in tombstoned_hashes:
+            if content_hash in referenced_hashes:
+                await asyncio.to_thread(self._file_storage.restore_blob, content_hash)
+                continue
+            await asyncio.to_thread(self._file_storage.delete_tombstone, content_hash)
+            deleted_blob_count += 1
+
+        deleted_file_count = 0
+        for namespace in await asyncio.to_thread(lambda: list(self._file_storage.list_namespaces())):
+            try:
+                conversation_id = uuid.UUID(namespace)
+            except ValueError:
+                continue
+
+            candidate_paths = await asyncio.to_thread(
+                lambda: list(self._file_storage.list_files(namespace, older_than_seconds=grace_period_seconds))
+            )
+            if not candidate_paths:
+                continue
+
+            async with self._get_session() as session:
+                storage_filenames = (
+                    await session.exec(
+                        select(db.FileVersion.storage_filename)
+                        .join(db.File)
+                        .where(db.File.conversation_id == conversation_id)
+                        .where(col(db.FileVersion.content_hash).is_(None))
+                    )
+                ).all()
+
+            referenced_paths = {
+                self._file_storage.path_for(namespace=namespace, filename=storage_filename)
+                for storage_filename in storage_filenames
+            }
+            for path in candidate_paths:
+                if path in referenced_paths:
+                    continue
+                await asyncio.to_thread(path.unlink, missing_ok=True)
+                deleted_file_count += 1
+
+            # removes the namespace once it is empty
+            with contextlib.suppress(OSError):
+                await asyncio.to_thread(self._file_storage.path_for(namespace=namespace, filename="").rmdir)
+
+        return FileGarbageCollectionResult(deleted_blob_count=deleted_blob_count, deleted_file_count=deleted_file_count)
@@ -1,31 +1,46 @@
 from typing import AsyncContextManager, Callable
 
+import cachetools
 from semantic_workbench_api_model import workbench_model
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .. import auth, db
+from .. import auth, db, settings
 from . import convert
 
+# the name and service_user last written for each user, by database and user id. the TTL bounds how long a change
+# made by another process, or by update_user, goes unnoticed.
+_written_users: cachetools.TTLCache[tuple[str, str], tuple[str, bool]] = cachetools.TTLCache(
+    maxsize=settings.service.user_cache_size, ttl=settings.service.user_cache_ttl_seconds
+)
+
+
+def _written_user_key(session: AsyncSession, user_id: str) -> tuple[str, str]:
+    return str(session.bind.url) if session.bind is not None else "", user_id
+
 
 async def add_or_update_user_from(
     session: AsyncSession,
     user_principal: auth.UserPrincipal,
 ) -> None:
     is_service_user = isinstance(user_principal, auth.ServiceUserPrincipal)
+    written_user_key = _written_user_key(session, user_principal.user_id)
+    if _written_users.get(written_user_key) == (user_principal.name, is_service_user):
+        return
+
     inserted = await db.insert_if_not_exists(
         session, db.User(user_id=user_principal.user_id, name=user_principal.name, service_user=is_service_user)
     )
-    if inserted:
-        return await session.commit()
-
-    user = (
-        await session.exec(select(db.User).where(db.User.user_id == user_principal.user_id).with_for_update())
-    ).one()
-    user.name = user_principal.name
-    user.service_user = isinstance(user_principal, auth.ServiceUserPrincipal)
-    session.add(user)
+    if not inserted:
+        user = (
+            await session.exec(select(db.User).where(db.User.user_id == user_principal.user_id).with_for_update())
+        ).one()
+        user.name = user_principal.name
+        user.service_user = is_service_user
+        session.add(user)
+
     await session.commit()
+    _written_users[written_user_key] = (user_principal.name, is_service_user)
 
 
 class UserController:
@@ -56,6 +71,8 @@ class UserController:
 
             await session.commit()
 
+        _written_users.pop(_written_user_key(session, user_id), None)
+
         return convert.user_from_db(model=user)
 
     async def get_users(self, user_ids: list[str]) -> workbench_model.UserList:
@@ -300,6 +300,16 @@ class ConversationMessage(SQLModel, table=True):
     # this relationship is needed to enforce correct INSERT order by SQLModel
     related_conversation: Conversation = Relationship()
 
+    __table_args__ = (
+        sqlalchemy.Index("ix_conversationmessage_conversation_id_sequence", "conversation_id", "sequence"),
+        sqlalchemy.Index(
+            "ix_conversationmessage_conversation_id_message_type_sequence",
+            "conversation_id",
+            "message_type",
+            "sequence",
+        ),
+    )
+
 
 class ConversationMessageDebug(SQLModel, table=True):
     message_id: uuid.UUID = Field(
@@ -364,11 +374,24 @@ class FileVersion(SQLModel, table=True):
     content_type: str
     file_size: int
     storage_filename: str
+    # the SHA-256 of the content, which is held in the blob store; None for content written before the blob store
+    content_hash: str | None = Field(default=None, index=True)
 
     # this relationship is needed to enforce correct INSERT order by SQLModel
     related_file: File = Relationship()
 
 
+# maps the ids of copied rows to the ids of their copies, while copying a conversation with INSERT ... SELECT. it is
+# created as a temporary table within the copying transaction, so is not part of the schema.
+id_mapping_table = sqlalchemy.Table(
+    "id_mapping",
+    sqlalchemy.MetaData(),
+    sqlalchemy.Column("old_id", sqlalchemy.Uuid, primary_key=True),
+    sqlalchemy.Column("new_id", sqlalchemy.Uuid, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
 NAMING_CONVENTION = {
     "ix": "ix_%(column_0_label)s",
     "uq": "uq_%(table_name)s_%(column_0_N_name)s",
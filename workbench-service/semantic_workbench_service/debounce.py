@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+
+class KeyedDebouncer(Generic[KeyT]):
+    """
+    Runs the calls scheduled for a key one at a time, each after a delay. Calls that are scheduled while another for
+    the same key is waiting or running are coalesced, so that only the latest of them runs, once the current one
+    completes. Calls for different keys run concurrently, up to max_concurrency at a time.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[KeyT, Callable[[], Awaitable[None]]] = {}
+        self._tasks: dict[KeyT, asyncio.Task[None]] = {}
+
+    def schedule(self, key: KeyT, call: Callable[[], Awaitable[None]], delay_seconds: float = 0.0) -> None:
+        self._pending[key] = call
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key, delay_seconds), name=f"debounced_{key}")
+
+    async def _run(self, key: KeyT, delay_seconds: float) -> None:
+        try:
+            while key in self._pending:
+                await asyncio.sleep(delay_seconds)
+                call = self._pending.pop(key)
+                async with self._semaphore:
+                    try:
+                        await call()
+                    except Exception:
+                        logger.exception("error in debounced call; key: %s", key)
+        finally:
+            del self._tasks[key]
+
+    async def aclose(self) -> None:
+        """
+        Cancels the pending and running calls.
+        """
+        self._pending.clear()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # the semaphore is bound to the event loop it was first used on
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
@@ -0,0 +1,244 @@
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Iterable, Literal, Protocol
+
+import cachetools
+import sqlalchemy
+from pydantic_settings import BaseSettings
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .event import ConversationEventQueueItem
+
+logger = logging.getLogger(__name__)
+
+
+class EventBusSettings(BaseSettings):
+    type: Literal["in_memory", "postgresql"] = "in_memory"
+    postgresql_channel: str = "workbench_conversation_events"
+    postgresql_reconnect_delay_seconds: float = 1.0
+
+
+EventHandler = Callable[[ConversationEventQueueItem], Awaitable[None]]
+
+
+class EventBus(Protocol):
+    def subscribe(self, handler: EventHandler) -> None: ...
+
+    async def publish(self, queue_item: ConversationEventQueueItem) -> None: ...
+
+    def start(self, engine: AsyncEngine) -> AsyncContextManager[None]: ...
+
+
+class InMemoryEventBus(EventBus):
+    """
+    Delivers events to the subscribers within this process only. Suitable when running a single replica.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: list[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler) -> None:
+        self._handlers.append(handler)
+
+    async def publish(self, queue_item: ConversationEventQueueItem) -> None:
+        await _deliver(self._handlers, queue_item)
+
+    @asynccontextmanager
+    async def start(self, engine: AsyncEngine) -> AsyncIterator[None]:
+        yield
+
+
+# postgresql rejects NOTIFY payloads of 8000 bytes or more; leave room for the envelope header
+NOTIFY_PAYLOAD_CHUNK_SIZE = 7_000
+
+
+class PostgreSQLEventBus(EventBus):
+    """
+    Delivers events to the subscribers in all replicas that share the same PostgreSQL database, using
+    LISTEN/NOTIFY. Events are delivered to subscribers in the publishing replica directly, and to the other
+    replicas through the notification channel.
+    """
+
+    def __init__(self, settings: EventBusSettings) -> None:
+        self._channel = settings.postgresql_channel
+        self._reconnect_delay_seconds = settings.postgresql_reconnect_delay_seconds
+        self._replica_id = uuid.uuid4().hex
+        self._handlers: list[EventHandler] = []
+        self._engine: AsyncEngine | None = None
+        self._assembler = NotificationAssembler()
+        self._received: asyncio.Queue[ConversationEventQueueItem] = asyncio.Queue()
+
+    def subscribe(self, handler: EventHandler) -> None:
+        self._handlers.append(handler)
+
+    async def publish(self, queue_item: ConversationEventQueueItem) -> None:
+        await _deliver(self._handlers, queue_item)
+
+        if self._engine is None:
+            logger.warning(
+                "event bus not started, event not published to other replicas; conversation_id: %s, event_id: %s",
+                queue_item.event.conversation_id,
+                queue_item.event.id,
+            )
+            return
+
+        try:
+            # notifications sent in the same transaction are delivered together, and in order
+            async with self._engine.begin() as connection:
+                for payload in encode_notifications(origin=self._replica_id, queue_item=queue_item):
+                    await connection.execute(
+                        sqlalchemy.select(sqlalchemy.func.pg_notify(self._channel, payload)),
+                    )
+        except Exception:
+            logger.exception(
+                "error publishing event to other replicas; conversation_id: %s, event_id: %s",
+                queue_item.event.conversation_id,
+                queue_item.event.id,
+            )
+
+    @asynccontextmanager
+    async def start(self, engine: AsyncEngine) -> AsyncIterator[None]:
+        if engine.dialect.name != "postgresql":
+            raise RuntimeError(f"postgresql event bus requires a postgresql database; dialect: {engine.dialect.name}")
+
+        listening = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self._listen(engine, listening), name="event_bus_listen"),
+            asyncio.create_task(self._dispatch_received(), name="event_bus_dispatch"),
+        ]
+        try:
+            await listening.wait()
+            self._engine = engine
+            logger.info("postgresql event bus started; channel: %s, replica_id: %s", self._channel, self._replica_id)
+
+            yield
+
+        finally:
+            self._engine = None
+            for task in tasks:
+                task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _listen(self, engine: AsyncEngine, listening: asyncio.Event) -> None:
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    # the asyncpg connection, which supports LISTEN callbacks
+                    driver_connection = raw_connection.driver_connection
+                    if driver_connection is None:
+                        raise RuntimeError("database connection does not have a driver connection")
+
+                    terminated = asyncio.Event()
+
+                    def on_terminated(_: object) -> None:
+                        terminated.set()
+
+                    driver_connection.add_termination_listener(on_terminated)
+                    await driver_connection.add_listener(self._channel, self._on_notification)
+                    listening.set()
+                    try:
+                        await terminated.wait()
+                        logger.warning("event bus listener connection terminated; channel: %s", self._channel)
+                    finally:
+                        driver_connection.remove_termination_listener(on_terminated)
+                        if not driver_connection.is_closed():
+                            with contextlib.suppress(Exception):
+                                await driver_connection.remove_listener(self._channel, self._on_notification)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("error in event bus listener; channel: %s", self._channel)
+
+            await asyncio.sleep(self._reconnect_delay_seconds)
+
+    def _on_notification(self, _connection: object, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            origin, queue_item = self._assembler.add(payload)
+        except Exception:
+            logger.exception("error decoding event bus notification; channel: %s", self._channel)
+            return
+
+        if queue_item is None or origin == self._replica_id:
+            return
+
+        self._received.put_nowait(queue_item)
+
+    async def _dispatch_received(self) -> None:
+        while True:
+            queue_item = await self._received.get()
+            await _deliver(self._handlers, queue_item)
+
+
+async def _deliver(handlers: Iterable[EventHandler], queue_item: ConversationEventQueueItem) -> None:
+    for handler in handlers:
+        try:
+            await handler(queue_item)
+        except Exception:
+            logger.exception(
+                "error delivering event to subscriber; conversation_id: %s, event_id: %s",
+                queue_item.event.conversation_id,
+                queue_item.event.id,
+            )
+
+
+def encode_notifications(
+    origin: str, queue_item: ConversationEventQueueItem, chunk_size: int = NOTIFY_PAYLOAD_CHUNK_SIZE
+) -> list[str]:
+    """
+    Encodes the queue item into one or more notification payloads of the form
+    "<origin>:<envelope id>:<part>:<parts>:<data>", where data is a chunk of the ASCII-only JSON encoded item.
+    """
+    data = json.dumps(queue_item.model_dump(mode="json"), ensure_ascii=True)
+    chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)] or [""]
+    envelope_id = uuid.uuid4().hex
+    return [f"{origin}:{envelope_id}:{part}:{len(chunks)}:{chunk}" for part, chunk in enumerate(chunks)]
+
+
+class NotificationAssembler:
+    """
+    Reassembles queue items from notification payloads created by encode_notifications. Incomplete envelopes are
+    discarded after a timeout.
+    """
+
+    def __init__(self, max_pending: int = 1_000, pending_ttl_seconds: float = 60) -> None:
+        self._pending: cachetools.TTLCache[str, list[str | None]] = cachetools.TTLCache(
+            maxsize=max_pending, ttl=pending_ttl_seconds
+        )
+
+    def add(self, payload: str) -> tuple[str, ConversationEventQueueItem | None]:
+        origin, envelope_id, part_str, parts_str, chunk = payload.split(":", 4)
+        part, parts = int(part_str), int(parts_str)
+
+        if parts == 1:
+            return origin, ConversationEventQueueItem.model_validate_json(chunk)
+
+        chunks = self._pending.get(envelope_id)
+        if chunks is None:
+            chunks = [None] * parts
+            self._pending[envelope_id] = chunks
+        chunks[part] = chunk
+
+        if any(c is None for c in chunks):
+            return origin, None
+
+        self._pending.pop(envelope_id, None)
+        return origin, ConversationEventQueueItem.model_validate_json("".join(c or "" for c in chunks))
+
+
+def get_event_bus(settings: EventBusSettings) -> EventBus:
+    match settings.type:
+        case "postgresql":
+            logger.info("creating PostgreSQLEventBus; channel: %s", settings.postgresql_channel)
+            return PostgreSQLEventBus(settings=settings)
+
+        case _:
+            logger.info("creating InMemoryEventBus")
+            return InMemoryEventBus()
@@ -0,0 +1,82 @@
+import collections
+import itertools
+from typing import Generic, Hashable, TypeVar
+
+import cachetools
+from semantic_workbench_api_model.workbench_model import ConversationEvent
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+HISTORY_UNAVAILABLE_EVENT = "history.unavailable"
+"""
+SSE event sent to a reconnecting client when the events it missed are no longer in the history. Clients should
+refetch any state they derive from events.
+"""
+
+
+class _History:
+    def __init__(self, max_events: int) -> None:
+        self.events: collections.deque[ConversationEvent] = collections.deque()
+        self.sequences: dict[str, int] = {}
+        self.next_sequence = 0
+        self.max_events = max_events
+
+    @property
+    def first_sequence(self) -> int:
+        return self.next_sequence - len(self.events)
+
+    def append(self, event: ConversationEvent) -> int:
+        if len(self.events) >= self.max_events:
+            evicted = self.events.popleft()
+            self.sequences.pop(evicted.id, None)
+
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        self.events.append(event)
+        self.sequences[event.id] = sequence
+        return sequence
+
+    def events_after(self, event_id: str) -> list[ConversationEvent] | None:
+        sequence = self.sequences.get(event_id)
+        if sequence is None:
+            return None
+
+        start = sequence - self.first_sequence + 1
+        return list(itertools.islice(self.events, start, None))
+
+
+class EventHistory(Generic[KeyT]):
+    """
+    Bounded, sequence-numbered history of the most recent events for each key, such as a conversation id, used to
+    replay the events that a reconnecting SSE client missed. Histories for the least recently used keys are
+    evicted once max_keys is reached.
+    """
+
+    def __init__(self, max_events: int, max_keys: int) -> None:
+        self._max_events = max_events
+        self._histories: cachetools.LRUCache[KeyT, _History] = cachetools.LRUCache(maxsize=max_keys)
+
+    def append(self, key: KeyT, event: ConversationEvent) -> int:
+        """
+        Appends the event to the history for the key, returning its sequence number.
+        """
+        history = self._histories.get(key)
+        if history is None:
+            history = _History(max_events=self._max_events)
+            self._histories[key] = history
+
+        return history.append(event)
+
+    def keys(self) -> list[KeyT]:
+        return list(self._histories.keys())
+
+    def events_after(self, key: KeyT, event_id: str) -> list[ConversationEvent] | None:
+        """
+        Returns the events appended after the event with the given id, or None if that event is no longer in the
+        history for the key.
+        """
+        history = self._histories.get(key)
+        if history is None:
+            return None
+
+        return history.events_after(event_id)
@@ -0,0 +1,141 @@
+import asyncio
+import dataclasses
+import logging
+from typing import Generic, Hashable, Iterable, Literal, TypeVar
+
+from semantic_workbench_api_model.workbench_model import ConversationEvent
+
+logger = logging.getLogger(__name__)
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+SlowSubscriberPolicy = Literal["drop", "disconnect"]
+"""
+What to do when a subscriber's queue is full:
+- drop: discard the event for that subscriber only
+- disconnect: remove the subscriber, so that its client reconnects and replays the missed events from the history
+"""
+
+
+class Subscription:
+    """
+    A single subscriber, such as an SSE client, with a bounded queue of events.
+    """
+
+    def __init__(self, max_queue_size: int, initial_events: list[ConversationEvent]) -> None:
+        # initial events, replayed from the history, are always accepted
+        self.queue: asyncio.Queue[ConversationEvent] = asyncio.Queue(maxsize=max(max_queue_size, len(initial_events)))
+        for event in initial_events:
+            self.queue.put_nowait(event)
+
+        self.dropped_count = 0
+        self.disconnected = False
+
+
+@dataclasses.dataclass
+class SubscriberRegistryMetrics:
+    subscriber_count: int
+    max_queue_depth: int
+    total_queue_depth: int
+    delivered_count: int
+    dropped_count: int
+    disconnected_count: int
+
+
+class SubscriberRegistry(Generic[KeyT]):
+    """
+    Registry of subscribers by key, such as a conversation id. Publishing never waits: events are put on each
+    subscriber's bounded queue without blocking, and subscribers that fall behind are handled according to the
+    slow subscriber policy.
+
+    The subscribers for a key are held in a tuple that is replaced, rather than mutated, on subscribe and
+    unsubscribe, so publishing iterates a stable snapshot and no lock is needed.
+    """
+
+    def __init__(self, name: str, max_queue_size: int, slow_subscriber_policy: SlowSubscriberPolicy) -> None:
+        self._name = name
+        self._max_queue_size = max_queue_size
+        self._slow_subscriber_policy = slow_subscriber_policy
+        self._subscriptions: dict[KeyT, tuple[Subscription, ...]] = {}
+
+        self._delivered_count = 0
+        self._dropped_count = 0
+        self._disconnected_count = 0
+
+    def subscribe(self, key: KeyT, initial_events: Iterable[ConversationEvent] = ()) -> Subscription:
+        subscription = Subscription(max_queue_size=self._max_queue_size, initial_events=list(initial_events))
+        self._subscriptions[key] = (*self._subscriptions.get(key, ()), subscription)
+        return subscription
+
+    def unsubscribe(self, key: KeyT, subscription: Subscription) -> None:
+        remaining = tuple(s for s in self._subscriptions.get(key, ()) if s is not subscription)
+        if remaining:
+            self._subscriptions[key] = remaining
+            return
+
+        self._subscriptions.pop(key, None)
+
+    def keys(self) -> list[KeyT]:
+        return list(self._subscriptions.keys())
+
+    def publish(self, key: KeyT, event: ConversationEvent) -> int:
+        """
+        Enqueues the event for each subscriber of the key, returning the number of subscribers it was enqueued for.
+        """
+        enqueued_count = 0
+        for subscription in self._subscriptions.get(key, ()):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._on_queue_full(key, subscription, event)
+                continue
+
+            enqueued_count += 1
+
+        self._delivered_count += enqueued_count
+        return enqueued_count
+
+    def _on_queue_full(self, key: KeyT, subscription: Subscription, event: ConversationEvent) -> None:
+        self._dropped_count += 1
+        subscription.dropped_count += 1
+
+        match self._slow_subscriber_policy:
+            case "disconnect":
+                self._disconnected_count += 1
+                subscription.disconnected = True
+                self.unsubscribe(key, subscription)
+                logger.warning(
+                    "disconnecting slow subscriber; registry: %s, key: %s, queue_depth: %d, event_id: %s",
+                    self._name,
+                    key,
+                    subscription.queue.qsize(),
+                    event.id,
+                )
+
+            case "drop":
+                # warn once per subscriber, to avoid flooding the log while it catches up
+                log = logger.warning if subscription.dropped_count == 1 else logger.debug
+                log(
+                    "dropped event for slow subscriber; registry: %s, key: %s, queue_depth: %d, event_id: %s,"
+                    " dropped_count: %d",
+                    self._name,
+                    key,
+                    subscription.queue.qsize(),
+                    event.id,
+                    subscription.dropped_count,
+                )
+
+    def metrics(self) -> SubscriberRegistryMetrics:
+        queue_depths = [
+            subscription.queue.qsize()
+            for subscriptions in self._subscriptions.values()
+            for subscription in subscriptions
+        ]
+        return SubscriberRegistryMetrics(
+            subscriber_count=len(queue_depths),
+            max_queue_depth=max(queue_depths, default=0),
+            total_queue_depth=sum(queue_depths),
+            delivered_count=self._delivered_count,
+            dropped_count=self._dropped_count,
+            disconnected_count=self._disconnected_count,
+        )
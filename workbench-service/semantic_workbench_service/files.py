@@ -1,8 +1,13 @@
+import asyncio
 import hashlib
 import logging
+import os
 import pathlib
+import shutil
+import tempfile
+import time
 from contextlib import contextmanager
-from typing import BinaryIO, Iterator
+from typing import AsyncIterator, BinaryIO, Iterator
 
 from pydantic_settings import BaseSettings
 
@@ -11,9 +16,24 @@ logger = logging.getLogger(__name__)
 
 class StorageSettings(BaseSettings):
     root: str = ".data/files"
+    blob_gc_interval_seconds: float = 60 * 60
+    # blobs and files are only garbage collected once they are older than this, so that content written for a
+    # request that has not committed its file version yet is not collected
+    blob_gc_grace_period_seconds: float = 60 * 60
 
 
 class Storage:
+    """
+    File storage, with the content of file versions held in a content-addressed blob store, keyed by the SHA-256
+    of the content, so that identical content is stored once. Blobs are shared by any number of file versions and
+    are deleted by garbage collection once no file version references them.
+
+    Files written before the blob store are stored per conversation namespace, by the hash of their storage
+    filename.
+    """
+
+    BLOBS_DIRECTORY = "blobs"
+
     def __init__(self, settings: StorageSettings):
         self.root = pathlib.Path(settings.root)
         self._initialized = False
@@ -60,3 +80,182 @@ class Storage:
         file_path = self._file_path(namespace, filename)
         with open(file_path, "rb") as f:
             yield f
+
+    def blob_path(self, content_hash: str) -> pathlib.Path:
+        return self.root / self.BLOBS_DIRECTORY / content_hash[:2] / content_hash
+
+    def blob_exists(self, content_hash: str) -> bool:
+        return self.blob_path(content_hash).exists()
+
+    def write_blob(self, content: BinaryIO) -> tuple[str, int]:
+        """
+        Writes the content to the blob store, returning its hash and size. Content that is already stored is not
+        stored again.
+        """
+        self._ensure_initialized()
+        temp_directory = self.root / self.BLOBS_DIRECTORY / "tmp"
+        temp_directory.mkdir(parents=True, exist_ok=True)
+
+        content_hash = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=temp_directory, delete=False) as f:
+            try:
+                for chunk in iter(lambda: content.read(100 * 1_024), b""):
+                    content_hash.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+
+        self._store_blob(content_hash.hexdigest(), pathlib.Path(f.name), move=True)
+        return content_hash.hexdigest(), size
+
+    def import_file_as_blob(self, path: pathlib.Path) -> tuple[str, int]:
+        """
+        Stores the content of an existing file in the blob store, returning its hash and size. The file is linked,
+        rather than copied, when it is on the same file system as the blob store.
+        """
+        self._ensure_initialized()
+        content_hash = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1_024 * 1_024), b""):
+                content_hash.update(chunk)
+                size += len(chunk)
+
+        self._store_blob(content_hash.hexdigest(), path, move=False)
+        return content_hash.hexdigest(), size
+
+    def _store_blob(self, content_hash: str, source_path: pathlib.Path, move: bool) -> None:
+        blob_path = self.blob_path(content_hash)
+        try:
+            # refreshes the modified time, so that a blob that is about to be referenced again is not collected
+            os.utime(blob_path)
+        except FileNotFoundError:
+            # not stored, or tombstoned by garbage collection; the content is stored again
+            pass
+        else:
+            if move:
+                source_path.unlink()
+            return
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            os.replace(source_path, blob_path)
+            return
+
+        try:
+            os.link(source_path, blob_path)
+        except FileExistsError:
+            os.utime(blob_path)
+        except OSError:
+            with tempfile.NamedTemporaryFile(dir=blob_path.parent, delete=False) as f:
+                pass
+            shutil.copyfile(source_path, f.name)
+            os.replace(f.name, blob_path)
+
+    @contextmanager
+    def read_blob(self, content_hash: str) -> Iterator[BinaryIO]:
+        with open(self.blob_path(content_hash), "rb") as f:
+            yield f
+
+    def delete_blob(self, content_hash: str) -> None:
+        self.blob_path(content_hash).unlink(missing_ok=True)
+
+    def _tombstone_path(self, content_hash: str) -> pathlib.Path:
+        return self.root / self.BLOBS_DIRECTORY / "tombstones" / content_hash
+
+    def tombstone_blob(self, content_hash: str, older_than_seconds: float) -> bool:
+        """
+        Moves a blob that was last written more than older_than_seconds ago out of the blob store, so that it is no
+        longer found by writes of the same content, returning whether it was moved. The blob is then either restored
+        with restore_blob or deleted with delete_tombstone.
+        """
+        tombstone_path = self._tombstone_path(content_hash)
+        tombstone_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(self.blob_path(content_hash), tombstone_path)
+        except FileNotFoundError:
+            return False
+
+        # checked after the move, as a write of the same content may have refreshed the blob before it was moved
+        if tombstone_path.stat().st_mtime >= time.time() - older_than_seconds:
+            self.restore_blob(content_hash)
+            return False
+
+        return True
+
+    def restore_blob(self, content_hash: str) -> None:
+        blob_path = self.blob_path(content_hash)
+        tombstone_path = self._tombstone_path(content_hash)
+        if blob_path.exists():
+            # the content was stored again while the blob was tombstoned
+            tombstone_path.unlink(missing_ok=True)
+            return
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tombstone_path, blob_path)
+
+    def delete_tombstone(self, content_hash: str) -> None:
+        self._tombstone_path(content_hash).unlink(missing_ok=True)
+
+    def list_tombstones(self) -> Iterator[str]:
+        """
+        Returns the hashes of the tombstoned blobs, which are left behind if garbage collection is interrupted.
+        """
+        tombstones_path = self.root / self.BLOBS_DIRECTORY / "tombstones"
+        if not tombstones_path.is_dir():
+            return
+        for path in tombstones_path.iterdir():
+            yield path.name
+
+    def list_blobs(self, older_than_seconds: float) -> Iterator[str]:
+        """
+        Returns the hashes of the blobs that were last written more than older_than_seconds ago.
+        """
+        cutoff = time.time() - older_than_seconds
+        for blob_path in (self.root / self.BLOBS_DIRECTORY).glob("??/*"):
+            try:
+                if blob_path.stat().st_mtime < cutoff:
+                    yield blob_path.name
+            except FileNotFoundError:
+                continue
+
+    def list_namespaces(self) -> Iterator[str]:
+        """
+        Returns the namespaces that hold files written before the blob store.
+        """
+        if not self.root.is_dir():
+            return
+        for path in self.root.iterdir():
+            if path.is_dir() and path.name != self.BLOBS_DIRECTORY:
+                yield path.name
+
+    def list_files(self, namespace: str, older_than_seconds: float) -> Iterator[pathlib.Path]:
+        cutoff = time.time() - older_than_seconds
+        for path in (self.root / namespace).iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    yield path
+            except FileNotFoundError:
+                continue
+
+
+async def read_chunks(
+    path: pathlib.Path, start: int = 0, stop: int | None = None, chunk_size: int = 1_024 * 1_024
+) -> AsyncIterator[bytes]:
+    """
+    Yields the content of the file from start up to, but not including, stop, reading it off the event loop.
+    """
+    with await asyncio.to_thread(path.open, "rb") as f:
+        if start:
+            await asyncio.to_thread(f.seek, start)
+        remaining = None if stop is None else stop - start
+        while remaining is None or remaining > 0:
+            chunk = await asyncio.to_thread(f.read, chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
@@ -1,9 +1,11 @@
+import asyncio
+import hashlib
 import logging
 import secrets
 import time
-from functools import lru_cache
 from typing import Any, Awaitable, Callable
 
+import cachetools
 import httpx
 from fastapi import HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
@@ -63,6 +65,58 @@ async def _assistant_service_principal_from_request(
     return auth.AssistantServicePrincipal(assistant_service_id=assistant_service_id)
 
 
+class _JsonWebKeySet:
+    """
+    The JSON web key set, fetched without blocking the event loop and refreshed once it expires, with a single
+    fetch however many requests are waiting on it.
+    """
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+        self._keys: dict[str, Any] | None = None
+        self._expires_at = 0.0
+        self._refresh: asyncio.Task[dict[str, Any]] | None = None
+
+    async def get(self, ttl_seconds: float) -> dict[str, Any]:
+        if self._keys is not None and time.monotonic() < self._expires_at:
+            return self._keys
+
+        refresh = self._refresh
+        if refresh is None or refresh.done() or refresh.get_loop() is not asyncio.get_running_loop():
+            refresh = self._refresh = asyncio.create_task(self._fetch(ttl_seconds))
+
+        try:
+            return await asyncio.shield(refresh)
+        except Exception:
+            if self._keys is None:
+                raise
+            # the expired keys are used until the keys can be fetched again
+            logger.exception("error fetching json web keys; url: %s", self._url)
+            return self._keys
+
+    async def _fetch(self, ttl_seconds: float) -> dict[str, Any]:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(self._url)
+            response.raise_for_status()
+
+        self._keys = response.json()
+        self._expires_at = time.monotonic() + ttl_seconds
+        return self._keys
+
+
+_rs256_jwks = _JsonWebKeySet("https://login.microsoftonline.com/common/discovery/v2.0/keys")
+
+
+_user_principal_cache: cachetools.TLRUCache[tuple[bytes, str, frozenset[str]], tuple[auth.UserPrincipal, float]] = (
+    cachetools.TLRUCache(
+        maxsize=settings.auth.principal_cache_size,
+        # entries expire with their token
+        ttu=lambda _key, value, _now: value[1],
+        timer=time.time,
+    )
+)
+
+
 async def _user_principal_from_request(request: Request) -> auth.UserPrincipal | None:
     token = await OAuth2PasswordBearer(tokenUrl="token", auto_error=False)(request)
     if token is None:
@@ -70,12 +124,22 @@ async def _user_principal_from_request(request: Request) -> auth.UserPrincipal |
 
     allowed_jwt_algorithms = settings.auth.allowed_jwt_algorithms
 
+    # the settings are part of the key, so that a cached principal is only used for the settings it was validated by
+    cache_key = (
+        hashlib.sha256(token.encode("utf-8")).digest(),
+        settings.auth.allowed_app_id,
+        frozenset(allowed_jwt_algorithms),
+    )
+    cached = _user_principal_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
+
     try:
         algorithm: str = jwt.get_unverified_header(token).get("alg") or ""
 
         match algorithm:
             case "RS256":
-                keys = _get_rs256_jwks()
+                keys = await _rs256_jwks.get(ttl_seconds=settings.auth.jwks_ttl_seconds)
             case _:
                 keys = ""
 
@@ -89,6 +153,7 @@ async def _user_principal_from_request(request: Request) -> auth.UserPrincipal |
         tid: str = decoded.get("tid", "")
         oid: str = decoded.get("oid", "")
         name: str = decoded.get("name", "")
+        expiration = decoded.get("exp")
         user_id = f"{tid}.{oid}"
 
     except ExpiredSignatureError:
@@ -104,7 +169,12 @@ async def _user_principal_from_request(request: Request) -> auth.UserPrincipal |
     if app_id != settings.auth.allowed_app_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid app")
 
-    return auth.UserPrincipal(user_id=user_id, name=name)
+    principal = auth.UserPrincipal(user_id=user_id, name=name)
+    # tokens without an expiration are not cached, as there is no bound on how long they would be
+    if isinstance(expiration, (int, float)):
+        _user_principal_cache[cache_key] = (principal, float(expiration))
+
+    return principal
 
 
 async def principal_from_request(
@@ -158,26 +228,3 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
         auth.authenticated_principal.set(principal)
         return await call_next(request)
-
-
-def ttl_lru_cache(seconds_to_live: int, maxsize: int = 128):
-    """
-    Time aware lru caching
-    """
-
-    def wrapper(func):
-        @lru_cache(maxsize)
-        def inner(__ttl, *args, **kwargs):
-            # Note that __ttl is not passed down to func,
-            # as it's only used to trigger cache miss after some time
-            return func(*args, **kwargs)
-
-        return lambda *args, **kwargs: inner(time.time() // seconds_to_live, *args, **kwargs)
-
-    return wrapper
-
-
-@ttl_lru_cache(seconds_to_live=60 * 10)
-def _get_rs256_jwks() -> dict[str, Any]:
-    response = httpx.Client().get("https://login.microsoftonline.com/common/discovery/v2.0/keys")
-    return response.json()
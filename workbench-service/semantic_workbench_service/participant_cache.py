@@ -0,0 +1,75 @@
+import dataclasses
+import uuid
+from typing import Awaitable, Callable, Generic, TypeVar
+
+import cachetools
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+
+ValueT = TypeVar("ValueT")
+
+PARTICIPANT_EVENT_TYPES = frozenset([
+    ConversationEventType.participant_created,
+    ConversationEventType.participant_updated,
+])
+"""
+Events emitted whenever the participants of a conversation, or their online status, change. This includes adding
+and removing participants, assistant services going online or offline, and assistants being deleted.
+"""
+
+
+@dataclasses.dataclass
+class ParticipantCacheMetrics:
+    size: int
+    hit_count: int
+    miss_count: int
+    invalidation_count: int
+
+
+class ConversationParticipantCache(Generic[ValueT]):
+    """
+    Caches a value derived from the participants of a conversation, such as the ids of the assistants to forward
+    events to, by conversation id. Entries are invalidated by participant events, and expire after a TTL as a
+    safeguard against changes that are not accompanied by an event.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self._cache: cachetools.TTLCache[uuid.UUID, ValueT] = cachetools.TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        # incremented on every invalidation, so that values loaded concurrently with a change are not cached
+        self._version = 0
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._invalidation_count = 0
+
+    async def get(self, conversation_id: uuid.UUID, load: Callable[[], Awaitable[ValueT]]) -> ValueT:
+        try:
+            value = self._cache[conversation_id]
+        except KeyError:
+            pass
+        else:
+            self._hit_count += 1
+            return value
+
+        self._miss_count += 1
+        version = self._version
+        value = await load()
+        if self._version == version:
+            self._cache[conversation_id] = value
+        return value
+
+    def invalidate(self, conversation_id: uuid.UUID) -> None:
+        self._invalidation_count += 1
+        self._cache.pop(conversation_id, None)
+        self._version += 1
+
+    def invalidate_for_event(self, event: ConversationEvent) -> None:
+        if event.event in PARTICIPANT_EVENT_TYPES:
+            self.invalidate(event.conversation_id)
+
+    def metrics(self) -> ParticipantCacheMetrics:
+        return ParticipantCacheMetrics(
+            size=len(self._cache),
+            hit_count=self._hit_count,
+            miss_count=self._miss_count,
+            invalidation_count=self._invalidation_count,
+        )
@@ -5,7 +5,6 @@ import json
 import logging
 import urllib.parse
 import uuid
-from collections import defaultdict
 from contextlib import asynccontextmanager
 from typing import (
     Annotated,
@@ -17,7 +16,6 @@ from typing import (
 )
 
 import asgi_correlation_id
-import starlette.background
 from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import (
     BackgroundTasks,
@@ -32,7 +30,7 @@ from fastapi import (
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import StreamingResponse
 from semantic_workbench_api_model.assistant_model import (
     ConfigPutRequestModel,
     ConfigResponseModel,
@@ -88,7 +86,19 @@ from sse_starlette import EventSourceResponse, ServerSentEvent
 from semantic_workbench_service import azure_speech
 from semantic_workbench_service.logging_config import log_request_middleware
 
-from . import assistant_api_key, auth, controller, db, files, middleware, settings
+from . import (
+    assistant_api_key,
+    auth,
+    controller,
+    db,
+    event_bus,
+    event_history,
+    event_subscribers,
+    files,
+    middleware,
+    participant_cache,
+    settings,
+)
 from .event import ConversationEventQueueItem
 
 logger = logging.getLogger(__name__)
@@ -99,13 +109,37 @@ def init(
     register_lifespan_handler: Callable[[Callable[[], AsyncContextManager[None]]], None],
 ) -> None:
     api_key_store = assistant_api_key.get_store()
+    conversation_event_bus = event_bus.get_event_bus(settings.event_bus)
     stop_signal: asyncio.Event = asyncio.Event()
 
-    conversation_sse_queues_lock = asyncio.Lock()
-    conversation_sse_queues: dict[uuid.UUID, set[asyncio.Queue[ConversationEvent]]] = defaultdict(set)
+    conversation_sse_subscribers = event_subscribers.SubscriberRegistry[uuid.UUID](
+        name="conversation",
+        max_queue_size=settings.service.sse_subscriber_queue_size,
+        slow_subscriber_policy=settings.service.sse_slow_subscriber_policy,
+    )
+    user_sse_subscribers = event_subscribers.SubscriberRegistry[str](
+        name="user",
+        max_queue_size=settings.service.sse_subscriber_queue_size,
+        slow_subscriber_policy=settings.service.sse_slow_subscriber_policy,
+    )
+
+    conversation_event_history = event_history.EventHistory[uuid.UUID](
+        max_events=settings.service.sse_event_history_size,
+        max_keys=settings.service.sse_event_history_max_conversations,
+    )
+    user_event_history = event_history.EventHistory[str](
+        max_events=settings.service.sse_event_history_size,
+        max_keys=settings.service.sse_event_history_max_users,
+    )
 
-    user_sse_queues_lock = asyncio.Lock()
-    user_sse_queues: dict[str, set[asyncio.Queue[ConversationEvent]]] = defaultdict(set)
+    assistant_participant_cache = participant_cache.ConversationParticipantCache[list[uuid.UUID]](
+        max_size=settings.service.participant_cache_size,
+        ttl_seconds=settings.service.participant_cache_ttl_seconds,
+    )
+    user_participant_cache = participant_cache.ConversationParticipantCache[frozenset[str]](
+        max_size=settings.service.participant_cache_size,
+        ttl_seconds=settings.service.participant_cache_ttl_seconds,
+    )
 
     assistant_event_queues: dict[uuid.UUID, asyncio.Queue[ConversationEvent]] = {}
 
@@ -119,22 +153,29 @@ def init(
     ) -> NoReturn:
         while True:
             try:
-                event = await event_queue.get()
+                events = [await event_queue.get()]
                 event_queue.task_done()
 
+                # events that queued up while the previous events were forwarded are posted together
+                while len(events) < settings.service.assistant_event_batch_size and not event_queue.empty():
+                    events.append(event_queue.get_nowait())
+                    event_queue.task_done()
+
+                event = events[0]
                 asgi_correlation_id.correlation_id.set(event.correlation_id)
 
                 start_time = datetime.datetime.now(datetime.UTC)
 
-                await assistant_controller.forward_event_to_assistant(assistant_id=assistant_id, event=event)
+                await assistant_controller.forward_events_to_assistant(assistant_id=assistant_id, events=events)
 
                 end_time = datetime.datetime.now(datetime.UTC)
                 logger.debug(
-                    "forwarded event to assistant; assistant_id: %s, conversation_id: %s, event_id: %s,"
-                    " duration: %s, time since event: %s",
+                    "forwarded events to assistant; assistant_id: %s, conversation_id: %s, event_id: %s,"
+                    " event_count: %d, duration: %s, time since event: %s",
                     assistant_id,
                     event.conversation_id,
                     event.id,
+                    len(events),
                     end_time - start_time,
                     end_time - event.timestamp,
                 )
@@ -161,46 +202,34 @@ def init(
         )
 
         if "user" in queue_item.event_audience:
-            enqueued_count = 0
-            async with conversation_sse_queues_lock:
-                for queue in conversation_sse_queues.get(queue_item.event.conversation_id, {}):
-                    enqueued_count += 1
-                    await queue.put(queue_item.event)
-
-            logger.debug(
-                "enqueued event for SSE; count: %d, conversation_id: %s, event: %s, event_id: %s",
-                enqueued_count,
-                queue_item.event.conversation_id,
-                queue_item.event.event,
-                queue_item.event.id,
-            )
-
-            if queue_item.event.event in [
-                ConversationEventType.message_created,
-                ConversationEventType.message_deleted,
-                ConversationEventType.conversation_updated,
-                ConversationEventType.participant_created,
-                ConversationEventType.participant_updated,
-            ]:
-                task = asyncio.create_task(_notify_user_event(queue_item.event), name="notify_user_event")
-                background_tasks.add(task)
-                task.add_done_callback(background_tasks.discard)
+            # delivered to the SSE clients connected to this, and any other, service replica, where participant
+            # events also invalidate the participant caches
+            await conversation_event_bus.publish(queue_item)
+        else:
+            _invalidate_participant_caches_for_event(queue_item)
 
         if "assistant" in queue_item.event_audience:
-            async with _controller_get_session() as session:
-                assistant_ids = (
-                    await session.exec(
-                        select(db.Assistant.assistant_id)
-                        .join(
-                            db.AssistantParticipant,
-                            col(db.Assistant.assistant_id) == col(db.AssistantParticipant.assistant_id),
-                        )
-                        .join(db.AssistantServiceRegistration)
-                        .where(col(db.AssistantServiceRegistration.assistant_service_online).is_(True))
-                        .where(col(db.AssistantParticipant.active_participant).is_(True))
-                        .where(db.AssistantParticipant.conversation_id == queue_item.event.conversation_id)
+            conversation_id = queue_item.event.conversation_id
+
+            async def _load_assistant_ids() -> list[uuid.UUID]:
+                async with _controller_get_session() as session:
+                    return list(
+                        (
+                            await session.exec(
+                                select(db.Assistant.assistant_id)
+                                .join(
+                                    db.AssistantParticipant,
+                                    col(db.Assistant.assistant_id) == col(db.AssistantParticipant.assistant_id),
+                                )
+                                .join(db.AssistantServiceRegistration)
+                                .where(col(db.AssistantServiceRegistration.assistant_service_online).is_(True))
+                                .where(col(db.AssistantParticipant.active_participant).is_(True))
+                                .where(db.AssistantParticipant.conversation_id == conversation_id)
+                            )
+                        ).all()
                     )
-                ).all()
+
+            assistant_ids = await assistant_participant_cache.get(conversation_id, _load_assistant_ids)
 
             for assistant_id in assistant_ids:
                 if assistant_id not in assistant_event_queues:
@@ -221,37 +250,90 @@ def init(
                     assistant_id,
                 )
 
+    def _invalidate_participant_caches_for_event(queue_item: ConversationEventQueueItem) -> None:
+        assistant_participant_cache.invalidate_for_event(queue_item.event)
+        user_participant_cache.invalidate_for_event(queue_item.event)
+
+    async def _invalidate_participant_caches(queue_item: ConversationEventQueueItem) -> None:
+        _invalidate_participant_caches_for_event(queue_item)
+
+    async def _deliver_event_to_sse(queue_item: ConversationEventQueueItem) -> None:
+        # appending to the history and publishing do not await, so subscribers registering concurrently see each
+        # event exactly once, either in their replay or in their queue
+        conversation_event_history.append(queue_item.event.conversation_id, queue_item.event)
+        enqueued_count = conversation_sse_subscribers.publish(queue_item.event.conversation_id, queue_item.event)
+
+        logger.debug(
+            "enqueued event for SSE; count: %d, conversation_id: %s, event: %s, event_id: %s",
+            enqueued_count,
+            queue_item.event.conversation_id,
+            queue_item.event.event,
+            queue_item.event.id,
+        )
+
+        if queue_item.event.event in [
+            ConversationEventType.message_created,
+            ConversationEventType.message_deleted,
+            ConversationEventType.conversation_updated,
+            ConversationEventType.participant_created,
+            ConversationEventType.participant_updated,
+        ]:
+            task = asyncio.create_task(_notify_user_event(queue_item.event), name="notify_user_event")
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
     async def _notify_user_event(event: ConversationEvent) -> None:
-        listening_user_ids = set(user_sse_queues.keys())
-        async with _controller_get_session() as session:
-            active_user_participants = (
-                await session.exec(
-                    select(db.UserParticipant.user_id).where(
-                        col(db.UserParticipant.active_participant).is_(True),
-                        db.UserParticipant.conversation_id == event.conversation_id,
-                        col(db.UserParticipant.user_id).in_(listening_user_ids),
-                    )
+        # include users with event history, so that events are retained for users who are reconnecting
+        listening_user_ids = set(user_sse_subscribers.keys()) | set(user_event_history.keys())
+        if not listening_user_ids:
+            return
+
+        async def _load_user_ids() -> frozenset[str]:
+            async with _controller_get_session() as session:
+                return frozenset(
+                    (
+                        await session.exec(
+                            select(db.UserParticipant.user_id).where(
+                                col(db.UserParticipant.active_participant).is_(True),
+                                db.UserParticipant.conversation_id == event.conversation_id,
+                            )
+                        )
+                    ).all()
                 )
-            ).all()
 
-        if not active_user_participants:
+        active_user_ids = await user_participant_cache.get(event.conversation_id, _load_user_ids)
+        listening_active_user_ids = active_user_ids & listening_user_ids
+        if not listening_active_user_ids:
             return
 
-        async with user_sse_queues_lock:
-            for user_id in active_user_participants:
-                for queue in user_sse_queues.get(user_id, {}):
-                    await queue.put(event)
-                    logger.debug(
-                        "enqueued event for user SSE; user_id: %s, conversation_id: %s", user_id, event.conversation_id
-                    )
+        for user_id in listening_active_user_ids:
+            user_event_history.append(user_id, event)
+            enqueued_count = user_sse_subscribers.publish(user_id, event)
+            logger.debug(
+                "enqueued event for user SSE; count: %d, user_id: %s, conversation_id: %s",
+                enqueued_count,
+                user_id,
+                event.conversation_id,
+            )
+
+    # participant caches are invalidated before the event is delivered, and users are notified, from the caches
+    conversation_event_bus.subscribe(_invalidate_participant_caches)
+    conversation_event_bus.subscribe(_deliver_event_to_sse)
 
     assistant_client_pool = controller.AssistantServiceClientPool(api_key_store=api_key_store)
 
+    assistant_controller = controller.AssistantController(
+        get_session=_controller_get_session,
+        notify_event=_notify_event,
+        client_pool=assistant_client_pool,
+        file_storage=files.Storage(settings.storage),
+    )
     assistant_service_registration_controller = controller.AssistantServiceRegistrationController(
         get_session=_controller_get_session,
         notify_event=_notify_event,
         api_key_store=api_key_store,
         client_pool=assistant_client_pool,
+        assistant_controller=assistant_controller,
     )
 
     app.add_middleware(
@@ -273,12 +355,6 @@ def init(
     app.middleware("http")(log_request_middleware())
 
     user_controller = controller.UserController(get_session=_controller_get_session)
-    assistant_controller = controller.AssistantController(
-        get_session=_controller_get_session,
-        notify_event=_notify_event,
-        client_pool=assistant_client_pool,
-        file_storage=files.Storage(settings.storage),
-    )
     conversation_controller = controller.ConversationController(
         get_session=_controller_get_session,
         notify_event=_notify_event,
@@ -293,6 +369,7 @@ def init(
         get_session=_controller_get_session,
         notify_event=_notify_event,
         file_storage=files.Storage(settings.storage),
+        file_storage_settings=settings.storage,
     )
 
     @asynccontextmanager
@@ -307,18 +384,27 @@ def init(
                     _update_assistant_service_online_status(), name="update_assistant_service_online_status"
                 ),
             )
+            background_tasks.add(
+                asyncio.create_task(_log_metrics(), name="log_metrics"),
+            )
+            background_tasks.add(
+                asyncio.create_task(_collect_file_garbage(), name="collect_file_garbage"),
+            )
 
-            try:
-                yield
+            async with conversation_event_bus.start(engine), assistant_client_pool:
+                try:
+                    yield
 
-            finally:
-                stop_signal.set()
+                finally:
+                    stop_signal.set()
 
-                for task in background_tasks:
-                    task.cancel()
+                    for task in background_tasks:
+                        task.cancel()
 
-                with contextlib.suppress(asyncio.CancelledError):
-                    await asyncio.gather(*background_tasks, return_exceptions=True)
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await asyncio.gather(*background_tasks, return_exceptions=True)
+
+                    await conversation_controller.aclose()
 
     register_lifespan_handler(_lifespan)
 
@@ -327,10 +413,73 @@ def init(
             try:
                 await asyncio.sleep(settings.service.assistant_service_online_check_interval_seconds)
                 await assistant_service_registration_controller.check_assistant_service_online_expired()
+                # refreshes the service infos that would otherwise expire before the next check
+                await assistant_service_registration_controller.refresh_service_infos(
+                    within_seconds=settings.service.assistant_service_online_check_interval_seconds
+                )
 
             except Exception:
                 logger.exception("exception in _update_assistant_service_online_status")
 
+    async def _collect_file_garbage() -> NoReturn:
+        while True:
+            try:
+                await asyncio.sleep(settings.storage.blob_gc_interval_seconds)
+                result = await file_controller.collect_garbage()
+                logger.info(
+                    "collected file garbage; deleted_blobs: %d, deleted_files: %d",
+                    result.deleted_blob_count,
+                    result.deleted_file_count,
+                )
+
+            except Exception:
+                logger.exception("exception in _collect_file_garbage")
+
+    async def _log_metrics() -> NoReturn:
+        while True:
+            await asyncio.sleep(settings.service.metrics_log_interval_seconds)
+            for registry_name, registry in (
+                ("conversation", conversation_sse_subscribers),
+                ("user", user_sse_subscribers),
+            ):
+                metrics = registry.metrics()
+                logger.info(
+                    "sse subscriber metrics; registry: %s, subscribers: %d, max_queue_depth: %d, total_queue_depth: %d,"
+                    " delivered: %d, dropped: %d, disconnected: %d",
+                    registry_name,
+                    metrics.subscriber_count,
+                    metrics.max_queue_depth,
+                    metrics.total_queue_depth,
+                    metrics.delivered_count,
+                    metrics.dropped_count,
+                    metrics.disconnected_count,
+                )
+
+            service_info_metrics = assistant_service_registration_controller.service_info_cache_metrics()
+            logger.info(
+                "service info cache metrics; size: %d, hits: %d, misses: %d, stale: %d, timeouts: %d, refreshes: %d",
+                service_info_metrics.size,
+                service_info_metrics.hit_count,
+                service_info_metrics.miss_count,
+                service_info_metrics.stale_count,
+                service_info_metrics.timeout_count,
+                service_info_metrics.refresh_count,
+            )
+
+            for cache_name, cache in (
+                ("assistant", assistant_participant_cache),
+                ("user", user_participant_cache),
+            ):
+                metrics = cache.metrics()
+                logger.info(
+                    "participant cache metrics; cache: %s, size: %d, hits: %d, misses: %d, invalidations: %d",
+                    cache_name,
+                    metrics.size,
+                    metrics.hit_count,
+                    metrics.miss_count,
+                    metrics.invalidation_count,
+                )
+
     @app.get("/")
     async def root() -> Response:
         return Response(status_code=status.HTTP_200_OK, content="")
@@ -489,14 +638,13 @@ def init(
     async def export_assistant(
         user_principal: auth.DependsUserPrincipal,
         assistant_id: uuid.UUID,
-    ) -> FileResponse:
+    ) -> StreamingResponse:
         result = await assistant_controller.export_assistant(user_principal=user_principal, assistant_id=assistant_id)
 
-        return FileResponse(
-            path=result.file_path,
+        return StreamingResponse(
+            content=result.stream,
             media_type=result.content_type,
-            filename=result.filename,
-            background=starlette.background.BackgroundTask(result.cleanup),
+            headers={"Content-Disposition": f'attachment; filename="{urllib.parse.quote(result.filename)}"'},
         )
 
     @app.get(
@@ -506,16 +654,15 @@ def init(
     async def export_conversations(
         user_principal: auth.DependsUserPrincipal,
         conversation_ids: list[uuid.UUID] = Query(alias="id"),
-    ) -> FileResponse:
+    ) -> StreamingResponse:
         result = await assistant_controller.export_conversations(
             user_principal=user_principal, conversation_ids=set(conversation_ids)
         )
 
-        return FileResponse(
-            path=result.file_path,
+        return StreamingResponse(
+            content=result.stream,
             media_type=result.content_type,
-            filename=result.filename,
-            background=starlette.background.BackgroundTask(result.cleanup),
+            headers={"Content-Disposition": f'attachment; filename="{urllib.parse.quote(result.filename)}"'},
         )
 
     @app.post("/conversations/import")
@@ -627,6 +774,13 @@ def init(
             latest_message_types=set(latest_message_types),
         )
 
+    def _history_unavailable_server_sent_event(last_event_id: str | None) -> ServerSentEvent:
+        return ServerSentEvent(
+            event=event_history.HISTORY_UNAVAILABLE_EVENT,
+            data=json.dumps({"last_event_id": last_event_id}),
+            retry=1000,
+        )
+
     @app.get("/conversations/{conversation_id}/events")
     async def conversation_server_sent_events(
         conversation_id: uuid.UUID, request: Request, principal: auth.DependsActorPrincipal
@@ -647,19 +801,34 @@ def init(
             principal_id,
             conversation_id,
         )
-        event_queue = asyncio.Queue[ConversationEvent]()
+        last_event_id = request.headers.get("last-event-id")
 
-        async with conversation_sse_queues_lock:
-            queues = conversation_sse_queues[conversation_id]
-            queues.add(event_queue)
+        # replay the missed events, if any, ahead of new events
+        missed_events = conversation_event_history.events_after(conversation_id, last_event_id) if last_event_id else []
+        subscription = conversation_sse_subscribers.subscribe(conversation_id, initial_events=missed_events or [])
+
+        logger.debug(
+            "sse events replayed; conversation_id: %s, last_event_id: %s, count: %s",
+            conversation_id,
+            last_event_id,
+            len(missed_events) if missed_events is not None else "unavailable",
+        )
 
         async def event_generator() -> AsyncIterator[ServerSentEvent]:
             try:
+                if missed_events is None:
+                    yield _history_unavailable_server_sent_event(last_event_id)
+
                 while True:
                     if stop_signal.is_set():
                         logger.debug("sse stopping due to signal; conversation_id: %s", conversation_id)
                         break
 
+                    if subscription.disconnected:
+                        # the client will reconnect, and replay the events it missed
+                        logger.debug("sse stopping for slow subscriber; conversation_id: %s", conversation_id)
+                        break
+
                     try:
                         if await request.is_disconnected():
                             logger.debug("client disconnected from sse; conversation_id: %s", conversation_id)
@@ -673,7 +842,7 @@ def init(
                     try:
                         try:
                             async with asyncio.timeout(1):
-                                conversation_event = await event_queue.get()
+                                conversation_event = await subscription.queue.get()
                         except asyncio.TimeoutError:
                             continue
 
@@ -699,11 +868,7 @@ def init(
                         logger.exception("error sending event to sse client; conversation_id: %s", conversation_id)
 
             finally:
-                queues.discard(event_queue)
-                if len(queues) == 0:
-                    async with conversation_sse_queues_lock:
-                        if len(queues) == 0:
-                            conversation_sse_queues.pop(conversation_id, None)
+                conversation_sse_subscribers.unsubscribe(conversation_id, subscription)
 
         return EventSourceResponse(event_generator(), sep="\n")
 
@@ -713,19 +878,27 @@ def init(
     ) -> EventSourceResponse:
         logger.debug("client connected to user events sse; user_id: %s", user_principal.user_id)
 
-        event_queue = asyncio.Queue[ConversationEvent]()
+        last_event_id = request.headers.get("last-event-id")
 
-        async with user_sse_queues_lock:
-            queues = user_sse_queues[user_principal.user_id]
-            queues.add(event_queue)
+        # replay the missed events, if any, ahead of new events
+        missed_events = user_event_history.events_after(user_principal.user_id, last_event_id) if last_event_id else []
+        subscription = user_sse_subscribers.subscribe(user_principal.user_id, initial_events=missed_events or [])
 
         async def event_generator() -> AsyncIterator[ServerSentEvent]:
             try:
+                if missed_events is None:
+                    yield _history_unavailable_server_sent_event(last_event_id)
+
                 while True:
                     if stop_signal.is_set():
                         logger.debug("sse stopping due to signal; user_id: %s", user_principal.user_id)
                         break
 
+                    if subscription.disconnected:
+                        # the client will reconnect, and replay the events it missed
+                        logger.debug("sse stopping for slow subscriber; user_id: %s", user_principal.user_id)
+                        break
+
                     try:
                         if await request.is_disconnected():
                             logger.debug("client disconnected from sse; user_id: %s", user_principal.user_id)
@@ -739,7 +912,7 @@ def init(
                     try:
                         try:
                             async with asyncio.timeout(1):
-                                conversation_event = await event_queue.get()
+                                conversation_event = await subscription.queue.get()
                         except asyncio.TimeoutError:
                             continue
 
@@ -763,11 +936,7 @@ def init(
                         logger.exception("error sending event to sse client; user_id: %s", user_principal.user_id)
 
             finally:
-                queues.discard(event_queue)
-                if len(queues) == 0:
-                    async with conversation_sse_queues_lock:
-                        if len(queues) == 0:
-                            user_sse_queues.pop(user_principal.user_id, None)
+                user_sse_subscribers.unsubscribe(user_principal.user_id, subscription)
 
         return EventSourceResponse(event_generator(), sep="\n")
 
@@ -901,6 +1070,8 @@ def init(
         message_types: Annotated[list[MessageType] | None, Query(alias="message_type")] = None,
         before: Annotated[uuid.UUID | None, Query()] = None,
         after: Annotated[uuid.UUID | None, Query()] = None,
+        before_cursor: Annotated[str | None, Query()] = None,
+        after_cursor: Annotated[str | None, Query()] = None,
         limit: Annotated[int, Query(lte=500)] = 100,
     ) -> ConversationMessageList:
         return await conversation_controller.get_messages(
@@ -911,9 +1082,44 @@ def init(
             message_types=message_types,
             before=before,
             after=after,
+            before_cursor=before_cursor,
+            after_cursor=after_cursor,
             limit=limit,
         )
 
+    @app.get("/conversations/{conversation_id}/messages-stream")
+    async def stream_conversation_messages(
+        conversation_id: uuid.UUID,
+        principal: auth.DependsActorPrincipal,
+        participant_roles: Annotated[list[ParticipantRole] | None, Query(alias="participant_role")] = None,
+        participant_ids: Annotated[list[str] | None, Query(alias="participant_id")] = None,
+        message_types: Annotated[list[MessageType] | None, Query(alias="message_type")] = None,
+        after: Annotated[uuid.UUID | None, Query()] = None,
+        after_cursor: Annotated[str | None, Query()] = None,
+    ) -> StreamingResponse:
+        messages = await conversation_controller.get_message_stream(
+            conversation_id=conversation_id,
+            principal=principal,
+            participant_ids=participant_ids,
+            participant_roles=participant_roles,
+            message_types=message_types,
+            after=after,
+            after_cursor=after_cursor,
+        )
+
+        async def ndjson_generator() -> AsyncIterator[str]:
+            lines: list[str] = []
+            async for message in messages:
+                lines.append(message.model_dump_json() + "\n")
+                if len(lines) >= 100:
+                    yield "".join(lines)
+                    lines.clear()
+
+            if lines:
+                yield "".join(lines)
+
+        return StreamingResponse(content=ndjson_generator(), media_type="application/x-ndjson")
+
     @app.post("/conversations/{conversation_id}/messages")
     async def create_conversation_message(
         conversation_id: uuid.UUID,
@@ -1020,9 +1226,10 @@ def init(
     async def download_file(
         conversation_id: uuid.UUID,
         filename: str,
+        request: Request,
         principal: auth.DependsActorPrincipal,
         version: int | None = None,
-    ) -> StreamingResponse:
+    ) -> Response:
         result = await file_controller.download_file(
             conversation_id=conversation_id,
             filename=filename,
@@ -1030,10 +1237,40 @@ def init(
             version=version,
         )
 
+        headers = {"ETag": result.etag, "Accept-Ranges": "bytes"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or result.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        ):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        headers["Content-Disposition"] = f'attachment; filename="{urllib.parse.quote(result.filename)}"'
+
+        byte_range = None
+        range_header = request.headers.get("range")
+        # a range is only returned when the content still matches the If-Range validator
+        if range_header is not None and request.headers.get("if-range", result.etag) == result.etag:
+            byte_range = controller.parse_byte_range(range_header, file_size=result.file_size)
+
+        if byte_range is None:
+            return StreamingResponse(
+                result.stream(0, result.file_size),
+                media_type=result.content_type,
+                headers={**headers, "Content-Length": str(result.file_size)},
+            )
+
+        start, stop = byte_range
         return StreamingResponse(
-            result.stream,
+            result.stream(start, stop),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
             media_type=result.content_type,
-            headers={"Content-Disposition": f'attachment; filename="{urllib.parse.quote(result.filename)}"'},
+            headers={
+                **headers,
+                "Content-Length": str(stop - start),
+                "Content-Range": f"bytes {start}-{stop - 1}/{result.file_size}",
+            },
         )
 
     @app.patch("/conversations/{conversation_id}/files/{filename:path}")
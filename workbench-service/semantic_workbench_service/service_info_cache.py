@@ -0,0 +1,137 @@
+import asyncio
+import dataclasses
+import logging
+import time
+from typing import Awaitable, Callable, Iterable
+
+from semantic_workbench_api_model.assistant_model import ServiceInfoModel
+
+logger = logging.getLogger(__name__)
+
+ServiceInfoKey = tuple[str, str]
+"""
+The assistant service id and url of a registration.
+"""
+
+
+@dataclasses.dataclass
+class ServiceInfoCacheMetrics:
+    size: int
+    hit_count: int
+    miss_count: int
+    stale_count: int
+    timeout_count: int
+    refresh_count: int
+
+
+@dataclasses.dataclass
+class _Entry:
+    info: ServiceInfoModel
+    fetched_at: float
+
+
+class ServiceInfoCache:
+    """
+    Caches the service info of assistant services, by assistant service id and url. Expired entries are refreshed
+    with a single call per service, however many requests are waiting on it. Requests wait up to the timeout for a
+    refresh, and then return the expired entry, if there is one, while the refresh continues in the background.
+    """
+
+    def __init__(self, ttl_seconds: float, timeout_seconds: float) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._timeout_seconds = timeout_seconds
+        self._entries: dict[ServiceInfoKey, _Entry] = {}
+        self._refreshes: dict[ServiceInfoKey, asyncio.Task[ServiceInfoModel]] = {}
+        # incremented on every invalidation, so that values fetched concurrently with a change are not cached
+        self._version = 0
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._stale_count = 0
+        self._timeout_count = 0
+        self._refresh_count = 0
+
+    async def get(
+        self, key: ServiceInfoKey, fetch: Callable[[], Awaitable[ServiceInfoModel]], wait: bool = False
+    ) -> ServiceInfoModel | None:
+        """
+        Returns the service info, refreshing it when it is expired. Returns None when there is no cached entry and
+        the refresh does not complete within the timeout, unless wait is True. Errors from the refresh are raised.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(entry):
+            self._hit_count += 1
+            return entry.info
+
+        self._miss_count += 1
+        refresh = self.refresh(key, fetch)
+        timeout = None if wait and entry is None else self._timeout_seconds
+        try:
+            return await asyncio.wait_for(asyncio.shield(refresh), timeout=timeout)
+        except TimeoutError:
+            self._timeout_count += 1
+            if entry is None:
+                return None
+            self._stale_count += 1
+            return entry.info
+
+    def refresh(
+        self, key: ServiceInfoKey, fetch: Callable[[], Awaitable[ServiceInfoModel]]
+    ) -> asyncio.Task[ServiceInfoModel]:
+        """
+        Starts a refresh of the service info, unless one is already in progress.
+        """
+        task = self._refreshes.get(key)
+        if task is not None:
+            return task
+
+        self._refresh_count += 1
+        version = self._version
+
+        async def _refresh() -> ServiceInfoModel:
+            info = await fetch()
+            if self._version == version:
+                self._entries[key] = _Entry(info=info, fetched_at=time.monotonic())
+            return info
+
+        def _done(task: asyncio.Task[ServiceInfoModel]) -> None:
+            if self._refreshes.get(key) is task:
+                del self._refreshes[key]
+            # retrieves the exception, which is raised to the requests awaiting the refresh, if any
+            if not task.cancelled() and task.exception() is not None:
+                logger.debug("failed to refresh assistant service info; key: %s", key, exc_info=task.exception())
+
+        task = asyncio.create_task(_refresh(), name=f"refresh_service_info_{key[0]}")
+        task.add_done_callback(_done)
+        self._refreshes[key] = task
+        return task
+
+    def expires_within(self, key: ServiceInfoKey, seconds: float) -> bool:
+        entry = self._entries.get(key)
+        return entry is None or time.monotonic() - entry.fetched_at + seconds >= self._ttl_seconds
+
+    def invalidate(self, assistant_service_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == assistant_service_id]:
+            del self._entries[key]
+        self._version += 1
+
+    def retain(self, keys: Iterable[ServiceInfoKey]) -> None:
+        """
+        Removes the entries for all but the given keys, such as those of services that are no longer online.
+        """
+        retained = set(keys)
+        for key in [key for key in self._entries if key not in retained]:
+            del self._entries[key]
+
+    def metrics(self) -> ServiceInfoCacheMetrics:
+        return ServiceInfoCacheMetrics(
+            size=len(self._entries),
+            hit_count=self._hit_count,
+            miss_count=self._miss_count,
+            stale_count=self._stale_count,
+            timeout_count=self._timeout_count,
+            refresh_count=self._refresh_count,
+        )
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.fetched_at >= self._ttl_seconds
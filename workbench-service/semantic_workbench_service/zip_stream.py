@@ -0,0 +1,60 @@
+import asyncio
+import io
+import zipfile
+from typing import AsyncIterable, AsyncIterator
+
+# content is compressed in chunks of this size, off the event loop
+_WRITE_SIZE = 1_024 * 1_024
+
+
+class _Sink(io.RawIOBase):
+    """
+    An unseekable stream that holds the bytes written to it until they are drained.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(entries: AsyncIterable[tuple[str, AsyncIterable[bytes]]]) -> AsyncIterator[bytes]:
+    """
+    Yields a zip archive of the entries, as their content is read, so that the archive is not staged in memory or on
+    disk. Each entry is a name and its content. The entries are written with data descriptors, as their sizes are not
+    known up front, and with zip64 extensions, so that they are not limited to 4GB.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        async for name, content in entries:
+            with zip_file.open(name, mode="w", force_zip64=True) as entry:
+                pending = bytearray()
+                async for chunk in content:
+                    pending += chunk
+                    if len(pending) < _WRITE_SIZE:
+                        continue
+
+                    await asyncio.to_thread(entry.write, bytes(pending))
+                    pending.clear()
+                    if data := sink.drain():
+                        yield data
+
+                if pending:
+                    await asyncio.to_thread(entry.write, bytes(pending))
+
+            if data := sink.drain():
+                yield data
+
+    # the central directory is written when the archive is closed
+    if data := sink.drain():
+        yield data
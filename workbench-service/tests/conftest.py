@@ -214,7 +214,9 @@ def canonical_assistant_service(
 
         # configure assistant client to use a specific transport that directs requests to the assistant app
         monkeypatch.setattr(
-            assistant_service_client, "httpx_transport_factory", lambda: httpx.ASGITransport(app=assistant_app)
+            assistant_service_client,
+            "httpx_transport_factory",
+            lambda **kwargs: httpx.ASGITransport(app=assistant_app),
         )
 
         yield assistant_app
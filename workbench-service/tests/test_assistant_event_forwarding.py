@@ -0,0 +1,188 @@
+import uuid
+
+import httpx
+import pytest
+import sqlalchemy
+from pydantic import HttpUrl
+from semantic_workbench_api_model import assistant_service_client, workbench_model
+from semantic_workbench_service import auth, db, files
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import AssistantController, AssistantServiceRegistrationController
+from semantic_workbench_service.controller.assistant_service_client_pool import AssistantServiceClientPool
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.close_count = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(204)
+
+    async def aclose(self) -> None:
+        self.close_count += 1
+
+
+class MockApiKeyStore:
+    def generate_key_name(self, identifier: str) -> str:
+        return identifier
+
+    async def get(self, key_name: str) -> str | None:
+        return "api-key"
+
+    async def reset(self, key_name: str) -> str:
+        return "api-key"
+
+    async def delete(self, key_name: str) -> None:
+        pass
+
+
+@pytest.fixture
+def transports(monkeypatch: pytest.MonkeyPatch) -> list[RecordingTransport]:
+    transports: list[RecordingTransport] = []
+
+    def transport_factory(limits: httpx.Limits | None = None, http2: bool = False) -> httpx.AsyncBaseTransport:
+        transport = RecordingTransport()
+        transports.append(transport)
+        return transport
+
+    monkeypatch.setattr(assistant_service_client, "httpx_transport_factory", transport_factory)
+    return transports
+
+
+def _registration(assistant_service_url: str) -> db.AssistantServiceRegistration:
+    return db.AssistantServiceRegistration(
+        assistant_service_id="assistant-service",
+        created_by_user_id="user",
+        name="assistant service",
+        description="",
+        api_key_name="api-key-name",
+        assistant_service_url=assistant_service_url,
+    )
+
+
+def _event(conversation_id: uuid.UUID) -> workbench_model.ConversationEvent:
+    return workbench_model.ConversationEvent(
+        conversation_id=conversation_id,
+        correlation_id="",
+        event=workbench_model.ConversationEventType.conversation_updated,
+        data={},
+    )
+
+
+async def test_client_pool_shares_transport_per_service_url(transports: list[RecordingTransport]) -> None:
+    registration = _registration("http://127.0.0.1:3001/")
+    assistants = [
+        db.Assistant(
+            assistant_id=uuid.uuid4(),
+            owner_id="user",
+            assistant_service_id=registration.assistant_service_id,
+            template_id="default",
+            imported_from_assistant_id=None,
+            name=f"assistant {index}",
+            related_assistant_service_registration=registration,
+        )
+        for index in range(3)
+    ]
+
+    pool = AssistantServiceClientPool(api_key_store=MockApiKeyStore())
+    for assistant in assistants:
+        await (await pool.assistant_client(assistant)).post_conversation_event(event=_event(uuid.uuid4()))
+    await pool.service_client(registration)
+
+    assert len(transports) == 1
+    assert len(transports[0].requests) == 3
+
+    await (await pool.assistant_client(assistants[0])).aclose()
+    assert transports[0].close_count == 0
+
+    await pool.service_client(_registration("http://127.0.0.1:3002/"))
+    assert len(transports) == 2
+
+    async with pool:
+        pass
+    assert [transport.close_count for transport in transports] == [1, 1]
+
+
+async def test_forward_events_to_assistant_caches_assistant(
+    db_settings: DBSettings, storage_settings: files.StorageSettings, transports: list[RecordingTransport]
+) -> None:
+    statements: list[str] = []
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+
+        registration = _registration("http://127.0.0.1:3001/")
+        assistant = db.Assistant(
+            owner_id="user",
+            assistant_service_id=registration.assistant_service_id,
+            template_id="default",
+            imported_from_assistant_id=None,
+            name="assistant",
+        )
+        assistant_id = assistant.assistant_id
+        async with db.create_session(engine) as session:
+            session.add(db.User(user_id="user", name="user"))
+            session.add(registration)
+            session.add(assistant)
+            await session.commit()
+
+        sqlalchemy.event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda _conn, _cursor, statement, *args: statements.append(statement),
+        )
+
+        async def notify_event(_) -> None:
+            pass
+
+        async with AssistantServiceClientPool(api_key_store=MockApiKeyStore()) as client_pool:
+            controller = AssistantController(
+                get_session=lambda: db.create_session(engine),
+                notify_event=notify_event,
+                client_pool=client_pool,
+                file_storage=files.Storage(storage_settings),
+            )
+
+            conversation_id = uuid.uuid4()
+            await controller.forward_event_to_assistant(assistant_id=assistant_id, event=_event(conversation_id))
+            assert len(statements) > 0
+
+            # the assistant is not loaded again for later events
+            statements.clear()
+            await controller.forward_events_to_assistant(
+                assistant_id=assistant_id, events=[_event(conversation_id), _event(conversation_id)]
+            )
+            assert statements == []
+
+            # the assistant is loaded again after its service url changes
+            registration_controller = AssistantServiceRegistrationController(
+                get_session=lambda: db.create_session(engine),
+                notify_event=notify_event,
+                api_key_store=MockApiKeyStore(),
+                client_pool=client_pool,
+                assistant_controller=controller,
+            )
+            await registration_controller.update_assistant_service_url(
+                assistant_service_principal=auth.AssistantServicePrincipal(
+                    assistant_service_id=registration.assistant_service_id
+                ),
+                assistant_service_id=registration.assistant_service_id,
+                update_assistant_service_url=workbench_model.UpdateAssistantServiceRegistrationUrl(
+                    name=registration.name,
+                    description=registration.description,
+                    url=HttpUrl("http://127.0.0.1:3002/"),
+                    online_expires_in_seconds=60,
+                ),
+            )
+            await controller.forward_event_to_assistant(assistant_id=assistant_id, event=_event(conversation_id))
+
+        requests = transports[0].requests
+        assert [request.url.path for request in requests] == [
+            f"/{assistant_id}/conversations/{conversation_id}/events",
+            f"/{assistant_id}/events",
+        ]
+        assert [str(request.url) for request in transports[1].requests] == [
+            f"http://127.0.0.1:3002/{assistant_id}/conversations/{conversation_id}/events",
+        ]
@@ -0,0 +1,82 @@
+import logging
+import os
+import time
+
+import pytest
+from fastapi import Request
+from jose import jwt
+from semantic_workbench_service import auth, middleware
+
+from .types import MockUser
+
+logger = logging.getLogger(__name__)
+
+# set WORKBENCH_PYTEST_BENCHMARK_AUTH_REQUEST_COUNT=100000 for the full benchmark
+REQUEST_COUNT = int(os.environ.get("WORKBENCH_PYTEST_BENCHMARK_AUTH_REQUEST_COUNT") or 2_000)
+
+
+async def _api_key_source(assistant_service_id: str) -> str | None:
+    return None
+
+
+async def _authenticate_repeatedly(test_user: MockUser, request_count: int) -> tuple[float, float]:
+    """
+    Authenticates a request repeatedly, validating the token for every request and then from cached principals,
+    returning the durations of each.
+    """
+    token = jwt.encode(
+        claims={
+            "tid": test_user.tenant_id,
+            "oid": test_user.object_id,
+            "name": test_user.name,
+            "appid": test_user.app_id,
+            "exp": int(time.time()) + 60 * 60,
+        },
+        key="",
+        algorithm=test_user.token_algo,
+    )
+    request = Request(
+        scope={
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+    async def authenticate() -> auth.Principal | None:
+        return await middleware.principal_from_request(request, api_key_source=_api_key_source)
+
+    # every request validates the token, as before principals were cached
+    start = time.perf_counter()
+    for _ in range(request_count):
+        middleware._user_principal_cache.clear()
+        principal = await authenticate()
+    uncached_duration = time.perf_counter() - start
+    assert principal == auth.UserPrincipal(user_id=test_user.id, name=test_user.name)
+    assert len(middleware._user_principal_cache) == 1
+
+    start = time.perf_counter()
+    for _ in range(request_count):
+        principal = await authenticate()
+    cached_duration = time.perf_counter() - start
+    assert principal == auth.UserPrincipal(user_id=test_user.id, name=test_user.name)
+    assert len(middleware._user_principal_cache) == 1
+
+    return uncached_duration, cached_duration
+
+
+async def test_auth_middleware_caches_principals(test_user: MockUser) -> None:
+    await _authenticate_repeatedly(test_user, request_count=10)
+
+
+@pytest.mark.benchmark
+async def test_auth_middleware_overhead_benchmark(test_user: MockUser) -> None:
+    uncached_duration, cached_duration = await _authenticate_repeatedly(test_user, request_count=REQUEST_COUNT)
+
+    logger.info(
+        "auth middleware benchmark; requests: %d, uncached: %.1fus/request, cached: %.1fus/request",
+        REQUEST_COUNT,
+        uncached_duration / REQUEST_COUNT * 1_000_000,
+        cached_duration / REQUEST_COUNT * 1_000_000,
+    )
@@ -0,0 +1,68 @@
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import sqlalchemy
+from semantic_workbench_api_model.workbench_model import ConversationEventType, NewConversationMessage
+from semantic_workbench_service import auth, db
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import ConversationController
+from semantic_workbench_service.event import ConversationEventQueueItem
+
+
+async def test_message_created_event_links_previous_message(db_settings: DBSettings) -> None:
+    user_principal = auth.UserPrincipal(user_id="test-user", name="test user")
+    conversation_id = uuid.uuid4()
+    other_conversation_id = uuid.uuid4()
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+
+        async with engine.begin() as connection:
+            await connection.execute(
+                sqlalchemy.insert(db.User), [{"user_id": user_principal.user_id, "name": user_principal.name}]
+            )
+            for id in (conversation_id, other_conversation_id):
+                await connection.execute(
+                    sqlalchemy.insert(db.Conversation),
+                    [{"conversation_id": id, "owner_id": user_principal.user_id, "title": "test", "metadata": {}}],
+                )
+                await connection.execute(
+                    sqlalchemy.insert(db.UserParticipant),
+                    [
+                        {
+                            "conversation_id": id,
+                            "user_id": user_principal.user_id,
+                            "name": user_principal.name,
+                            "conversation_permission": "read_write",
+                        }
+                    ],
+                )
+
+        notify_event = AsyncMock()
+        controller = ConversationController(
+            get_session=lambda: db.create_session(engine),
+            notify_event=notify_event,
+            assistant_controller=Mock(),
+        )
+
+        first, _ = await controller.create_conversation_message(
+            user_principal, conversation_id, NewConversationMessage(content="first")
+        )
+        await controller.create_conversation_message(
+            user_principal, other_conversation_id, NewConversationMessage(content="other")
+        )
+        await controller.create_conversation_message(
+            user_principal, conversation_id, NewConversationMessage(content="second")
+        )
+
+    events = [
+        call.args[0].event
+        for call in notify_event.await_args_list
+        if isinstance(call.args[0], ConversationEventQueueItem)
+        and call.args[0].event.event == ConversationEventType.message_created
+    ]
+    assert [(event.conversation_id, event.data["previous_message_id"]) for event in events] == [
+        (conversation_id, None),
+        (other_conversation_id, None),
+        (conversation_id, str(first.id)),
+    ]
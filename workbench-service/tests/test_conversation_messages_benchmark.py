@@ -0,0 +1,182 @@
+import logging
+import os
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import sqlalchemy
+from semantic_workbench_api_model.workbench_model import ConversationMessageList, MessageType
+from semantic_workbench_service import auth, db
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import ConversationController
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# set WORKBENCH_PYTEST_BENCHMARK_MESSAGE_COUNT=1000000 for the full benchmark
+MESSAGE_COUNT = int(os.environ.get("WORKBENCH_PYTEST_BENCHMARK_MESSAGE_COUNT") or 50_000)
+CONVERSATION_COUNT = 10
+# the benchmarked conversation holds 1 in every SPARSE_INTERVAL messages in the table
+SPARSE_INTERVAL = 100
+
+
+async def _populate(engine: AsyncEngine, user_principal: auth.UserPrincipal, message_count: int) -> list[uuid.UUID]:
+    conversation_ids = [uuid.uuid4() for _ in range(CONVERSATION_COUNT)]
+
+    async with engine.begin() as connection:
+        await connection.execute(
+            sqlalchemy.insert(db.User),
+            [{"user_id": user_principal.user_id, "name": user_principal.name}],
+        )
+        await connection.execute(
+            sqlalchemy.insert(db.Conversation),
+            [
+                {"conversation_id": conversation_id, "owner_id": user_principal.user_id, "title": "benchmark"}
+                for conversation_id in conversation_ids
+            ],
+        )
+        await connection.execute(
+            sqlalchemy.insert(db.UserParticipant),
+            [
+                {
+                    "conversation_id": conversation_id,
+                    "user_id": user_principal.user_id,
+                    "name": user_principal.name,
+                    "conversation_permission": "read_write",
+                }
+                for conversation_id in conversation_ids
+            ],
+        )
+
+    # messages for the conversations are interleaved, as they would be in a shared table, with the first
+    # conversation receiving few of them
+    batch_size = 10_000
+    for batch_start in range(0, message_count, batch_size):
+        async with engine.begin() as connection:
+            await connection.execute(
+                sqlalchemy.insert(db.ConversationMessage),
+                [
+                    {
+                        "message_id": uuid.uuid4(),
+                        "conversation_id": (
+                            conversation_ids[0]
+                            if index % SPARSE_INTERVAL == 0
+                            else conversation_ids[1 + index % (CONVERSATION_COUNT - 1)]
+                        ),
+                        "sender_participant_id": user_principal.user_id,
+                        "sender_participant_role": "user",
+                        "message_type": MessageType.chat
+                        if index % 3 or index % SPARSE_INTERVAL == 0
+                        else MessageType.log,
+                        "content": f"message {index}",
+                        "content_type": "text/plain",
+                        "metadata": {},
+                        "filenames": [],
+                    }
+                    for index in range(batch_start, min(batch_start + batch_size, message_count))
+                ],
+            )
+
+    return conversation_ids
+
+
+async def _page_backwards(
+    get_page: Callable[[ConversationMessageList | None], Awaitable[ConversationMessageList]], page_count: int
+) -> tuple[list[uuid.UUID], list[float]]:
+    message_ids: list[uuid.UUID] = []
+    durations: list[float] = []
+    page = None
+    for _ in range(page_count):
+        start = time.perf_counter()
+        page = await get_page(page)
+        durations.append(time.perf_counter() - start)
+        message_ids = [m.id for m in page.messages] + message_ids
+
+    return message_ids, durations
+
+
+async def _page_messages(
+    db_settings: DBSettings, message_count: int, page_size: int
+) -> tuple[list[float], list[float], list[float]]:
+    """
+    Pages backwards through the messages of a conversation, by cursor and by message id, and by cursor without the
+    conversation indexes, asserting that each returns the same messages and returning the page durations of each.
+    """
+    page_count = min(20, message_count // SPARSE_INTERVAL // page_size)
+    user_principal = auth.UserPrincipal(user_id="benchmark-user", name="benchmark user")
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+
+        start = time.perf_counter()
+        conversation_ids = await _populate(engine, user_principal, message_count)
+        logger.info("populated messages; count: %d, duration: %.2fs", message_count, time.perf_counter() - start)
+
+        controller = ConversationController(
+            get_session=lambda: db.create_session(engine),
+            notify_event=AsyncMock(),
+            assistant_controller=Mock(),
+        )
+        conversation_id = conversation_ids[0]
+
+        async def page_by_cursor(previous: ConversationMessageList | None) -> ConversationMessageList:
+            return await controller.get_messages(
+                principal=user_principal,
+                conversation_id=conversation_id,
+                message_types=[MessageType.chat],
+                before_cursor=previous.first_cursor if previous else None,
+                limit=page_size,
+            )
+
+        async def page_by_message_id(previous: ConversationMessageList | None) -> ConversationMessageList:
+            return await controller.get_messages(
+                principal=user_principal,
+                conversation_id=conversation_id,
+                message_types=[MessageType.chat],
+                before=previous.messages[0].id if previous else None,
+                limit=page_size,
+            )
+
+        cursor_message_ids, cursor_durations = await _page_backwards(page_by_cursor, page_count)
+        message_id_message_ids, message_id_durations = await _page_backwards(page_by_message_id, page_count)
+
+        assert page_count > 0
+        assert len(cursor_message_ids) == page_size * page_count
+        assert len(set(cursor_message_ids)) == len(cursor_message_ids)
+        assert cursor_message_ids == message_id_message_ids
+
+        # for comparison, without the conversation indexes
+        async with engine.begin() as connection:
+            await connection.execute(sqlalchemy.text("DROP INDEX ix_conversationmessage_conversation_id_sequence"))
+            await connection.execute(
+                sqlalchemy.text("DROP INDEX ix_conversationmessage_conversation_id_message_type_sequence")
+            )
+
+        unindexed_message_ids, unindexed_durations = await _page_backwards(page_by_cursor, page_count)
+        assert unindexed_message_ids == cursor_message_ids
+
+    return cursor_durations, message_id_durations, unindexed_durations
+
+
+async def test_get_messages_paging(db_settings: DBSettings) -> None:
+    await _page_messages(db_settings, message_count=3_000, page_size=10)
+
+
+@pytest.mark.benchmark
+async def test_get_messages_paging_benchmark(db_settings: DBSettings) -> None:
+    cursor_durations, message_id_durations, unindexed_durations = await _page_messages(
+        db_settings, message_count=MESSAGE_COUNT, page_size=100
+    )
+
+    logger.info(
+        "get_messages paging benchmark; messages: %d, pages: %d, median page duration; cursor: %.2fms,"
+        " message id: %.2fms, cursor without indexes: %.2fms",
+        MESSAGE_COUNT,
+        len(cursor_durations),
+        statistics.median(cursor_durations) * 1_000,
+        statistics.median(message_id_durations) * 1_000,
+        statistics.median(unindexed_durations) * 1_000,
+    )
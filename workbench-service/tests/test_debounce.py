@@ -0,0 +1,82 @@
+import asyncio
+
+from semantic_workbench_service.debounce import KeyedDebouncer
+
+
+async def test_debouncer_coalesces_calls_for_a_key() -> None:
+    debouncer = KeyedDebouncer[str](max_concurrency=10)
+    calls: list[tuple[str, int]] = []
+    release = asyncio.Event()
+
+    async def call(key: str, value: int) -> None:
+        calls.append((key, value))
+        await release.wait()
+
+    for value in range(5):
+        debouncer.schedule("a", lambda value=value: call("a", value), delay_seconds=0.01)
+    debouncer.schedule("b", lambda: call("b", 0), delay_seconds=0.01)
+
+    await asyncio.sleep(0.05)
+    # only the latest call for each key runs
+    assert sorted(calls) == [("a", 4), ("b", 0)]
+
+    # calls scheduled while one is running are coalesced, and run once it completes
+    for value in range(5, 10):
+        debouncer.schedule("a", lambda value=value: call("a", value))
+    await asyncio.sleep(0.05)
+    assert len(calls) == 2
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert sorted(calls) == [("a", 4), ("a", 9), ("b", 0)]
+
+
+async def test_debouncer_bounds_concurrency() -> None:
+    debouncer = KeyedDebouncer[int](max_concurrency=2)
+    running = 0
+    max_running = 0
+
+    async def call() -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for key in range(10):
+        debouncer.schedule(key, call)
+
+    await asyncio.sleep(0.2)
+    assert max_running == 2
+
+
+async def test_debouncer_continues_after_errors() -> None:
+    debouncer = KeyedDebouncer[str](max_concurrency=1)
+    calls: list[str] = []
+
+    async def failing_call() -> None:
+        calls.append("failing")
+        raise RuntimeError("error")
+
+    async def call() -> None:
+        calls.append("call")
+
+    debouncer.schedule("a", failing_call)
+    await asyncio.sleep(0.01)
+    debouncer.schedule("a", call)
+    await asyncio.sleep(0.01)
+
+    assert calls == ["failing", "call"]
+
+
+async def test_debouncer_aclose_cancels_calls() -> None:
+    debouncer = KeyedDebouncer[str](max_concurrency=1)
+    calls: list[str] = []
+
+    async def call() -> None:
+        calls.append("call")
+
+    debouncer.schedule("a", call, delay_seconds=60)
+    await debouncer.aclose()
+
+    assert calls == []
@@ -0,0 +1,249 @@
+import logging
+import os
+import time
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import sqlalchemy
+from semantic_workbench_api_model.workbench_model import NewConversation
+from semantic_workbench_service import auth, db, files
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import AssistantController
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# set WORKBENCH_PYTEST_BENCHMARK_DUPLICATE_MESSAGE_COUNT=100000 for the full benchmark
+MESSAGE_COUNT = int(os.environ.get("WORKBENCH_PYTEST_BENCHMARK_DUPLICATE_MESSAGE_COUNT") or 5_000)
+# 1 in every DEBUG_INTERVAL messages has debug data
+DEBUG_INTERVAL = 3
+FILE_COUNT = 20
+
+
+async def _populate(engine: AsyncEngine, user_principal: auth.UserPrincipal, message_count: int) -> uuid.UUID:
+    conversation_id = uuid.uuid4()
+    async with engine.begin() as connection:
+        await connection.execute(
+            sqlalchemy.insert(db.User), [{"user_id": user_principal.user_id, "name": user_principal.name}]
+        )
+        await connection.execute(
+            sqlalchemy.insert(db.Conversation),
+            [
+                {
+                    "conversation_id": conversation_id,
+                    "owner_id": user_principal.user_id,
+                    "title": "benchmark",
+                    "metadata": {},
+                }
+            ],
+        )
+        await connection.execute(
+            sqlalchemy.insert(db.UserParticipant),
+            [
+                {
+                    "conversation_id": conversation_id,
+                    "user_id": user_principal.user_id,
+                    "name": user_principal.name,
+                    "conversation_permission": "read_write",
+                }
+            ],
+        )
+
+        message_ids = [uuid.uuid4() for _ in range(message_count)]
+        await connection.execute(
+            sqlalchemy.insert(db.ConversationMessage),
+            [
+                {
+                    "message_id": message_id,
+                    "conversation_id": conversation_id,
+                    "sender_participant_id": user_principal.user_id,
+                    "sender_participant_role": "user",
+                    "message_type": "chat",
+                    "content": f"message {index}",
+                    "content_type": "text/plain",
+                    "metadata": {"index": index},
+                    "filenames": [],
+                }
+                for index, message_id in enumerate(message_ids)
+            ],
+        )
+        await connection.execute(
+            sqlalchemy.insert(db.ConversationMessageDebug),
+            [
+                {"message_id": message_id, "data": {"index": index}}
+                for index, message_id in enumerate(message_ids)
+                if index % DEBUG_INTERVAL == 0
+            ],
+        )
+
+        file_ids = [uuid.uuid4() for _ in range(FILE_COUNT)]
+        await connection.execute(
+            sqlalchemy.insert(db.File),
+            [
+                {
+                    "file_id": file_id,
+                    "conversation_id": conversation_id,
+                    "filename": f"{index}.txt",
+                    "current_version": 2,
+                }
+                for index, file_id in enumerate(file_ids)
+            ],
+        )
+        await connection.execute(
+            sqlalchemy.insert(db.FileVersion),
+            [
+                {
+                    "file_id": file_id,
+                    "version": version,
+                    "participant_id": user_principal.user_id,
+                    "participant_role": "user",
+                    "metadata": {},
+                    "content_type": "text/plain",
+                    "file_size": 0,
+                    "storage_filename": f"{file_id.hex}_{version}",
+                    "content_hash": uuid.uuid4().hex,
+                }
+                for file_id in file_ids
+                for version in (1, 2)
+            ],
+        )
+
+    return conversation_id
+
+
+async def _duplicate_per_row(session: AsyncSession, conversation_id: uuid.UUID) -> uuid.UUID:
+    """
+    The prior implementation of duplicate_conversation, which copies each row through the ORM.
+    """
+    original_conversation = (
+        await session.exec(select(db.Conversation).where(db.Conversation.conversation_id == conversation_id))
+    ).one()
+    conversation = db.Conversation(
+        owner_id=original_conversation.owner_id, title="per row", meta_data=original_conversation.meta_data
+    )
+    session.add(conversation)
+    await session.flush()
+
+    messages = await session.exec(
+        select(db.ConversationMessage)
+        .where(db.ConversationMessage.conversation_id == conversation_id)
+        .order_by(col(db.ConversationMessage.sequence))
+    )
+    message_id_old_to_new = {}
+    for message in messages:
+        new_message_id = uuid.uuid4()
+        message_id_old_to_new[message.message_id] = new_message_id
+        session.add(
+            db.ConversationMessage(
+                **message.model_dump(exclude={"message_id", "conversation_id", "sequence"}),
+                message_id=new_message_id,
+                conversation_id=conversation.conversation_id,
+            )
+        )
+
+    for old_message_id, new_message_id in message_id_old_to_new.items():
+        message_debugs = await session.exec(
+            select(db.ConversationMessageDebug).where(db.ConversationMessageDebug.message_id == old_message_id)
+        )
+        for debug in message_debugs:
+            session.add(
+                db.ConversationMessageDebug(**debug.model_dump(exclude={"message_id"}), message_id=new_message_id)
+            )
+
+    await session.commit()
+    return conversation.conversation_id
+
+
+async def _conversation_content(session: AsyncSession, conversation_id: uuid.UUID) -> tuple[list, list, list]:
+    messages = (
+        await session.exec(
+            select(db.ConversationMessage.content, db.ConversationMessage.meta_data, db.ConversationMessageDebug.data)
+            .join(db.ConversationMessageDebug, isouter=True)
+            .where(db.ConversationMessage.conversation_id == conversation_id)
+            .order_by(col(db.ConversationMessage.sequence))
+        )
+    ).all()
+    file_versions = (
+        await session.exec(
+            select(db.File.filename, db.FileVersion.version, db.FileVersion.content_hash)
+            .join(db.File)
+            .where(db.File.conversation_id == conversation_id)
+            .order_by(col(db.File.filename), col(db.FileVersion.version))
+        )
+    ).all()
+    participants = (
+        await session.exec(
+            select(db.UserParticipant.user_id).where(db.UserParticipant.conversation_id == conversation_id)
+        )
+    ).all()
+    return list(messages), list(file_versions), list(participants)
+
+
+async def _duplicate_conversation(
+    db_settings: DBSettings, storage_settings: files.StorageSettings, message_count: int
+) -> tuple[float, float]:
+    """
+    Duplicates a conversation per row, as before, and with set-based statements, asserting that the duplicate has the
+    content of the original and returning the durations of each.
+    """
+    user_principal = auth.UserPrincipal(user_id="benchmark-user", name="benchmark user")
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+        conversation_id = await _populate(engine, user_principal, message_count)
+
+        controller = AssistantController(
+            get_session=lambda: db.create_session(engine),
+            notify_event=AsyncMock(),
+            client_pool=Mock(),
+            file_storage=files.Storage(storage_settings),
+        )
+
+        start = time.perf_counter()
+        async with db.create_session(engine) as session:
+            await _duplicate_per_row(session, conversation_id)
+        per_row_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = await controller.duplicate_conversation(
+            principal=user_principal, conversation_id=conversation_id, new_conversation=NewConversation()
+        )
+        set_based_duration = time.perf_counter() - start
+
+        # the temporary table is dropped, so the conversation can be duplicated again on the same connection
+        await controller.duplicate_conversation(
+            principal=user_principal, conversation_id=conversation_id, new_conversation=NewConversation()
+        )
+
+        async with db.create_session(engine) as session:
+            original = await _conversation_content(session, conversation_id)
+            duplicate = await _conversation_content(session, result.conversation_ids[0])
+
+        assert len(original[0]) == message_count
+        assert len(original[1]) == FILE_COUNT * 2
+        assert duplicate == original
+
+    return per_row_duration, set_based_duration
+
+
+async def test_duplicate_conversation(db_settings: DBSettings, storage_settings: files.StorageSettings) -> None:
+    await _duplicate_conversation(db_settings, storage_settings, message_count=50)
+
+
+@pytest.mark.benchmark
+async def test_duplicate_conversation_benchmark(
+    db_settings: DBSettings, storage_settings: files.StorageSettings
+) -> None:
+    per_row_duration, set_based_duration = await _duplicate_conversation(
+        db_settings, storage_settings, message_count=MESSAGE_COUNT
+    )
+
+    logger.info(
+        "duplicate_conversation benchmark; messages: %d, per row: %.2fs, set based: %.2fs",
+        MESSAGE_COUNT,
+        per_row_duration,
+        set_based_duration,
+    )
@@ -0,0 +1,185 @@
+import asyncio
+import datetime
+import logging
+import multiprocessing
+import multiprocessing.queues
+import multiprocessing.synchronize
+import statistics
+import uuid
+
+import pytest
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service import db
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.event import ConversationEventQueueItem
+from semantic_workbench_service.event_bus import (
+    EventBusSettings,
+    InMemoryEventBus,
+    NotificationAssembler,
+    PostgreSQLEventBus,
+    encode_notifications,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_queue_item(content: str = "") -> ConversationEventQueueItem:
+    return ConversationEventQueueItem(
+        event=ConversationEvent(
+            conversation_id=uuid.uuid4(),
+            event=ConversationEventType.message_created,
+            data={"message": {"content": content}},
+        ),
+        event_audience={"user"},
+    )
+
+
+async def test_in_memory_event_bus_delivers_to_subscribers() -> None:
+    bus = InMemoryEventBus()
+    received_1: list[ConversationEventQueueItem] = []
+    received_2: list[ConversationEventQueueItem] = []
+
+    async def failing_handler(queue_item: ConversationEventQueueItem) -> None:
+        raise RuntimeError("subscriber failure")
+
+    async def handler_1(queue_item: ConversationEventQueueItem) -> None:
+        received_1.append(queue_item)
+
+    async def handler_2(queue_item: ConversationEventQueueItem) -> None:
+        received_2.append(queue_item)
+
+    bus.subscribe(failing_handler)
+    bus.subscribe(handler_1)
+    bus.subscribe(handler_2)
+
+    queue_item = create_queue_item()
+    await bus.publish(queue_item)
+
+    # a failing subscriber does not prevent delivery to the others
+    assert received_1 == [queue_item]
+    assert received_2 == [queue_item]
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["", "short", "非ascii ✓ " * 3_000, "x" * 50_000],
+    ids=["empty", "short", "non-ascii", "large"],
+)
+def test_notifications_round_trip(content: str) -> None:
+    queue_item = create_queue_item(content)
+
+    payloads = encode_notifications(origin="replica", queue_item=queue_item)
+    assert all(len(payload.encode("utf-8")) < 8_000 for payload in payloads)
+
+    assembler = NotificationAssembler()
+    results = [assembler.add(payload) for payload in payloads]
+
+    assert all(origin == "replica" for origin, _ in results)
+    assert all(item is None for _, item in results[:-1])
+    assert results[-1][1] == queue_item
+
+
+def test_notifications_interleaved() -> None:
+    queue_item_1 = create_queue_item("a" * 20_000)
+    queue_item_2 = create_queue_item("b" * 20_000)
+
+    payloads_1 = encode_notifications(origin="replica-1", queue_item=queue_item_1)
+    payloads_2 = encode_notifications(origin="replica-2", queue_item=queue_item_2)
+
+    assembler = NotificationAssembler()
+    completed = []
+    for payload_1, payload_2 in zip(payloads_1, payloads_2):
+        for payload in (payload_2, payload_1):
+            _, item = assembler.add(payload)
+            if item is not None:
+                completed.append(item)
+
+    assert completed == [queue_item_2, queue_item_1]
+
+
+def _run_replica(
+    db_url: str,
+    ready: multiprocessing.synchronize.Event,
+    results: multiprocessing.queues.Queue,
+    count: int,
+) -> None:
+    async def listen() -> None:
+        received = 0
+        done = asyncio.Event()
+        bus = PostgreSQLEventBus(settings=EventBusSettings(type="postgresql"))
+
+        async def handler(queue_item: ConversationEventQueueItem) -> None:
+            nonlocal received
+            latency = datetime.datetime.now(datetime.UTC) - queue_item.event.timestamp
+            results.put(latency.total_seconds())
+            received += 1
+            if received == count:
+                done.set()
+
+        bus.subscribe(handler)
+
+        async with db.create_engine(DBSettings(url=db_url, postgresql_ssl_mode="disable")) as engine:
+            async with bus.start(engine):
+                ready.set()
+                await asyncio.wait_for(done.wait(), timeout=30)
+
+    asyncio.run(listen())
+
+
+async def test_postgresql_event_bus_multiple_replicas(db_settings: DBSettings, db_type: str) -> None:
+    if db_type != "postgresql":
+        pytest.skip("requires --dbtype=postgresql")
+
+    replica_count = 3
+    event_count = 200
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    readies = [context.Event() for _ in range(replica_count)]
+    replicas = [
+        context.Process(target=_run_replica, args=(db_settings.url, ready, results, event_count), daemon=True)
+        for ready in readies
+    ]
+    for replica in replicas:
+        replica.start()
+
+    try:
+        for ready in readies:
+            assert await asyncio.to_thread(ready.wait, 60)
+
+        publisher = PostgreSQLEventBus(settings=EventBusSettings(type="postgresql"))
+        local_received: list[ConversationEventQueueItem] = []
+
+        async def local_handler(queue_item: ConversationEventQueueItem) -> None:
+            local_received.append(queue_item)
+
+        publisher.subscribe(local_handler)
+
+        async with db.create_engine(db_settings) as engine, publisher.start(engine):
+            published = [create_queue_item(f"message {i} " * (i % 5) * 1_000) for i in range(event_count)]
+            for queue_item in published:
+                await publisher.publish(queue_item)
+
+            # the publishing replica receives each event exactly once, directly
+            assert local_received == published
+
+            latencies = [await asyncio.to_thread(results.get, True, 30) for _ in range(replica_count * event_count)]
+
+        for replica in replicas:
+            await asyncio.to_thread(replica.join, 30)
+            assert replica.exitcode == 0
+
+    finally:
+        for replica in replicas:
+            if replica.is_alive():
+                replica.kill()
+
+    latencies.sort()
+    logger.warning(
+        "event bus fan-out latency; replicas: %d, events: %d, p50: %.4fs, p95: %.4fs, max: %.4fs",
+        replica_count,
+        event_count,
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.95)],
+        latencies[-1],
+    )
@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service.config import WebServiceSettings
+from semantic_workbench_service.event_history import EventHistory
+from semantic_workbench_service.event_subscribers import SubscriberRegistry
+
+
+def create_event(conversation_id: uuid.UUID) -> ConversationEvent:
+    return ConversationEvent(conversation_id=conversation_id, event=ConversationEventType.message_created)
+
+
+def test_event_history_events_after() -> None:
+    history = EventHistory[uuid.UUID](max_events=10, max_keys=10)
+    conversation_id = uuid.uuid4()
+
+    events = [create_event(conversation_id) for _ in range(5)]
+    sequences = [history.append(conversation_id, event) for event in events]
+
+    assert sequences == [0, 1, 2, 3, 4]
+    assert history.events_after(conversation_id, events[1].id) == events[2:]
+    assert history.events_after(conversation_id, events[-1].id) == []
+    assert history.events_after(conversation_id, "unknown") is None
+    assert history.events_after(uuid.uuid4(), events[1].id) is None
+
+
+def test_event_history_bounded_per_key() -> None:
+    history = EventHistory[uuid.UUID](max_events=3, max_keys=10)
+    conversation_id = uuid.uuid4()
+
+    events = [create_event(conversation_id) for _ in range(5)]
+    for event in events:
+        history.append(conversation_id, event)
+
+    # the oldest events have fallen out of the history
+    assert history.events_after(conversation_id, events[0].id) is None
+    assert history.events_after(conversation_id, events[1].id) is None
+    assert history.events_after(conversation_id, events[2].id) == events[3:]
+
+
+def test_event_history_evicts_least_recently_used_keys() -> None:
+    history = EventHistory[uuid.UUID](max_events=3, max_keys=2)
+    conversation_ids = [uuid.uuid4() for _ in range(3)]
+    events = {conversation_id: create_event(conversation_id) for conversation_id in conversation_ids}
+
+    history.append(conversation_ids[0], events[conversation_ids[0]])
+    history.append(conversation_ids[1], events[conversation_ids[1]])
+    # use the first, so that the second is the least recently used
+    assert history.events_after(conversation_ids[0], events[conversation_ids[0]].id) == []
+    history.append(conversation_ids[2], events[conversation_ids[2]])
+
+    assert set(history.keys()) == {conversation_ids[0], conversation_ids[2]}
+    assert history.events_after(conversation_ids[1], events[conversation_ids[1]].id) is None
+
+
+async def test_event_history_replays_events_missed_by_disconnected_subscriber() -> None:
+    settings = WebServiceSettings()
+    history = EventHistory[uuid.UUID](max_events=settings.sse_event_history_size, max_keys=10)
+    registry = SubscriberRegistry[uuid.UUID](
+        name="test",
+        max_queue_size=settings.sse_subscriber_queue_size,
+        slow_subscriber_policy=settings.sse_slow_subscriber_policy,
+    )
+    conversation_id = uuid.uuid4()
+
+    received_event = create_event(conversation_id)
+    history.append(conversation_id, received_event)
+    subscription = registry.subscribe(conversation_id)
+    missed_events = []
+    while not subscription.disconnected:
+        event = create_event(conversation_id)
+        history.append(conversation_id, event)
+        registry.publish(conversation_id, event)
+        missed_events.append(event)
+
+    # reconnecting with the id of the last event received
+    assert history.events_after(conversation_id, received_event.id) == missed_events
+
+
+def test_event_history_must_cover_subscriber_queue() -> None:
+    with pytest.raises(ValueError):
+        WebServiceSettings(sse_event_history_size=100, sse_subscriber_queue_size=1_000)
+
+    WebServiceSettings(sse_event_history_size=100, sse_subscriber_queue_size=1_000, sse_slow_subscriber_policy="drop")
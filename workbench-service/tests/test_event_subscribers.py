@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+import uuid
+
+import pytest
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service.event_subscribers import SubscriberRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def create_event(conversation_id: uuid.UUID) -> ConversationEvent:
+    return ConversationEvent(conversation_id=conversation_id, event=ConversationEventType.message_created)
+
+
+async def test_subscriber_registry_publish() -> None:
+    registry = SubscriberRegistry[uuid.UUID](name="test", max_queue_size=10, slow_subscriber_policy="drop")
+    conversation_id = uuid.uuid4()
+    other_conversation_id = uuid.uuid4()
+
+    subscription_1 = registry.subscribe(conversation_id)
+    subscription_2 = registry.subscribe(conversation_id)
+    other_subscription = registry.subscribe(other_conversation_id)
+
+    event = create_event(conversation_id)
+    assert registry.publish(conversation_id, event) == 2
+
+    assert subscription_1.queue.get_nowait() == event
+    assert subscription_2.queue.get_nowait() == event
+    assert other_subscription.queue.empty()
+
+    registry.unsubscribe(conversation_id, subscription_1)
+    registry.unsubscribe(other_conversation_id, other_subscription)
+    assert registry.keys() == [conversation_id]
+    assert registry.publish(conversation_id, create_event(conversation_id)) == 1
+    assert registry.publish(other_conversation_id, create_event(other_conversation_id)) == 0
+
+
+async def test_subscriber_registry_initial_events_exceed_queue_size() -> None:
+    registry = SubscriberRegistry[uuid.UUID](name="test", max_queue_size=2, slow_subscriber_policy="disconnect")
+    conversation_id = uuid.uuid4()
+    missed_events = [create_event(conversation_id) for _ in range(5)]
+
+    subscription = registry.subscribe(conversation_id, initial_events=missed_events)
+
+    assert [subscription.queue.get_nowait() for _ in range(5)] == missed_events
+    assert not subscription.disconnected
+
+
+async def test_subscriber_registry_drops_events_for_slow_subscriber() -> None:
+    registry = SubscriberRegistry[uuid.UUID](name="test", max_queue_size=2, slow_subscriber_policy="drop")
+    conversation_id = uuid.uuid4()
+
+    slow_subscription = registry.subscribe(conversation_id)
+    fast_subscription = registry.subscribe(conversation_id)
+
+    events = [create_event(conversation_id) for _ in range(4)]
+    received = []
+    for event in events:
+        registry.publish(conversation_id, event)
+        received.append(fast_subscription.queue.get_nowait())
+
+    # the fast subscriber is unaffected by the slow one
+    assert received == events
+    assert [slow_subscription.queue.get_nowait() for _ in range(2)] == events[:2]
+    assert slow_subscription.dropped_count == 2
+    assert not slow_subscription.disconnected
+
+    metrics = registry.metrics()
+    assert metrics.subscriber_count == 2
+    assert metrics.delivered_count == 6
+    assert metrics.dropped_count == 2
+    assert metrics.disconnected_count == 0
+
+
+async def test_subscriber_registry_disconnects_slow_subscriber() -> None:
+    registry = SubscriberRegistry[uuid.UUID](name="test", max_queue_size=2, slow_subscriber_policy="disconnect")
+    conversation_id = uuid.uuid4()
+
+    slow_subscriptions = [registry.subscribe(conversation_id) for _ in range(3)]
+    fast_subscription = registry.subscribe(conversation_id)
+
+    for _ in range(3):
+        registry.publish(conversation_id, create_event(conversation_id))
+        fast_subscription.queue.get_nowait()
+
+    # all slow subscribers are removed, including those removed while publishing to the same snapshot
+    assert all(subscription.disconnected for subscription in slow_subscriptions)
+    assert not fast_subscription.disconnected
+    assert registry.publish(conversation_id, create_event(conversation_id)) == 1
+
+    metrics = registry.metrics()
+    assert metrics.subscriber_count == 1
+    assert metrics.max_queue_depth == 1
+    assert metrics.disconnected_count == 3
+
+
+async def _fan_out(subscriber_count: int, event_count: int, batch_size: int = 100) -> tuple[float, float]:
+    """
+    Publishes the events to the subscribers, in batches, returning the publish and end-to-end durations.
+    """
+    registry = SubscriberRegistry[uuid.UUID](name="test", max_queue_size=1_000, slow_subscriber_policy="drop")
+    conversation_id = uuid.uuid4()
+    received_counts = [0] * subscriber_count
+
+    async def consume(index: int) -> None:
+        subscription = registry.subscribe(conversation_id)
+        while received_counts[index] < event_count:
+            await subscription.queue.get()
+            received_counts[index] += 1
+
+    consumers = [asyncio.create_task(consume(index)) for index in range(subscriber_count)]
+    await asyncio.sleep(0)
+    assert registry.metrics().subscriber_count == subscriber_count
+
+    events = [create_event(conversation_id) for _ in range(event_count)]
+
+    publish_duration = 0.0
+    start = time.perf_counter()
+    for batch_start in range(0, event_count, batch_size):
+        publish_start = time.perf_counter()
+        for event in events[batch_start : batch_start + batch_size]:
+            registry.publish(conversation_id, event)
+        publish_duration += time.perf_counter() - publish_start
+        # yield to the consumers between batches, as the event loop would between incoming events
+        await asyncio.sleep(0)
+
+    await asyncio.wait_for(asyncio.gather(*consumers), timeout=120)
+    duration = time.perf_counter() - start
+
+    metrics = registry.metrics()
+    assert metrics.dropped_count == 0
+    assert metrics.delivered_count == subscriber_count * event_count
+
+    return publish_duration, duration
+
+
+async def test_subscriber_registry_fan_out() -> None:
+    await _fan_out(subscriber_count=10, event_count=500)
+
+
+@pytest.mark.benchmark
+async def test_subscriber_registry_fan_out_throughput() -> None:
+    subscriber_count = 1_000
+    event_count = 2_000
+
+    publish_duration, duration = await _fan_out(subscriber_count=subscriber_count, event_count=event_count)
+
+    logger.info(
+        "sse fan-out throughput; subscribers: %d, events: %d, publish events/s: %.0f, end-to-end events/s: %.0f,"
+        " end-to-end deliveries/s: %.0f",
+        subscriber_count,
+        event_count,
+        event_count / publish_duration,
+        event_count / duration,
+        subscriber_count * event_count / duration,
+    )
@@ -0,0 +1,171 @@
+import logging
+import os
+import pathlib
+import tempfile
+import time
+import uuid
+import zipfile
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import sqlalchemy
+from semantic_workbench_service import auth, db, files
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import AssistantController
+
+logger = logging.getLogger(__name__)
+
+# set WORKBENCH_PYTEST_BENCHMARK_EXPORT_SIZE_MB=4096 for the full benchmark
+EXPORT_SIZE_MB = int(os.environ.get("WORKBENCH_PYTEST_BENCHMARK_EXPORT_SIZE_MB") or 128)
+FILE_COUNT = 4
+MESSAGE_COUNT = 20_000
+RSS_CEILING_MB = 100
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="requires /proc to measure the resident set size")
+async def test_export_conversations_streams_with_bounded_memory(
+    db_settings: DBSettings, storage_settings: files.StorageSettings
+) -> None:
+    user_principal = auth.UserPrincipal(user_id="benchmark-user", name="benchmark user")
+    conversation_id = uuid.uuid4()
+    file_storage = files.Storage(storage_settings)
+
+    # the content is a repeated random block, which deflate cannot compress, so the archive is as large as the content
+    block = os.urandom(1_024 * 1_024)
+    file_size = EXPORT_SIZE_MB // FILE_COUNT * len(block)
+    content_hashes = [uuid.uuid4().hex for _ in range(FILE_COUNT)]
+    for content_hash in content_hashes:
+        blob_path = file_storage.blob_path(content_hash)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        with blob_path.open("wb") as f:
+            for _ in range(file_size // len(block)):
+                f.write(block)
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+
+        async with engine.begin() as connection:
+            await connection.execute(
+                sqlalchemy.insert(db.User), [{"user_id": user_principal.user_id, "name": user_principal.name}]
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.Conversation),
+                [
+                    {
+                        "conversation_id": conversation_id,
+                        "owner_id": user_principal.user_id,
+                        "title": "benchmark",
+                        "metadata": {},
+                    }
+                ],
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.UserParticipant),
+                [
+                    {
+                        "conversation_id": conversation_id,
+                        "user_id": user_principal.user_id,
+                        "name": user_principal.name,
+                        "conversation_permission": "read_write",
+                    }
+                ],
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.ConversationMessage),
+                [
+                    {
+                        "message_id": uuid.uuid4(),
+                        "conversation_id": conversation_id,
+                        "sender_participant_id": user_principal.user_id,
+                        "sender_participant_role": "user",
+                        "message_type": "chat",
+                        "content": f"message {index}",
+                        "content_type": "text/plain",
+                        "metadata": {},
+                        "filenames": [],
+                    }
+                    for index in range(MESSAGE_COUNT)
+                ],
+            )
+            file_ids = [uuid.uuid4() for _ in range(FILE_COUNT)]
+            await connection.execute(
+                sqlalchemy.insert(db.File),
+                [
+                    {
+                        "file_id": file_id,
+                        "conversation_id": conversation_id,
+                        "filename": f"{index}.bin",
+                        "current_version": 1,
+                    }
+                    for index, file_id in enumerate(file_ids)
+                ],
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.FileVersion),
+                [
+                    {
+                        "file_id": file_id,
+                        "version": 1,
+                        "participant_id": user_principal.user_id,
+                        "participant_role": "user",
+                        "metadata": {},
+                        "content_type": "application/octet-stream",
+                        "file_size": file_size,
+                        "storage_filename": f"{file_id.hex}_1",
+                        "content_hash": content_hash,
+                    }
+                    for file_id, content_hash in zip(file_ids, content_hashes)
+                ],
+            )
+
+        controller = AssistantController(
+            get_session=lambda: db.create_session(engine),
+            notify_event=AsyncMock(),
+            client_pool=Mock(),
+            file_storage=file_storage,
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = pathlib.Path(temp_dir) / "export.zip"
+
+            baseline_rss = _rss_bytes()
+            max_rss = baseline_rss
+            first_byte_duration = None
+            start = time.perf_counter()
+
+            result = await controller.export_conversations(
+                user_principal=user_principal, conversation_ids={conversation_id}
+            )
+            with zip_path.open("wb") as f:
+                async for chunk in result.stream:
+                    if first_byte_duration is None:
+                        first_byte_duration = time.perf_counter() - start
+                    f.write(chunk)
+                    max_rss = max(max_rss, _rss_bytes())
+
+            duration = time.perf_counter() - start
+
+            with zipfile.ZipFile(zip_path) as zip_file:
+                sizes = {info.filename: info.file_size for info in zip_file.infolist()}
+                with zip_file.open(AssistantController.EXPORT_WORKBENCH_FILENAME) as workbench_file:
+                    assert sum(1 for line in workbench_file if b'"ConversationMessage"' in line) == MESSAGE_COUNT
+
+            assert sorted(size for name, size in sizes.items() if name.startswith("files/")) == [file_size] * FILE_COUNT
+            zip_size = zip_path.stat().st_size
+
+    assert first_byte_duration is not None
+    rss_growth_mb = (max_rss - baseline_rss) / 1_024 / 1_024
+    logger.info(
+        "export benchmark; archive size: %.1fMB, duration: %.2fs, first byte: %.3fs, rss growth: %.1fMB",
+        zip_size / 1_024 / 1_024,
+        duration,
+        first_byte_duration,
+        rss_growth_mb,
+    )
+    assert rss_growth_mb < RSS_CEILING_MB
@@ -42,3 +42,66 @@ def test_write_read_delete_file(storage_settings: files.StorageSettings) -> None
 
     with pytest.raises(FileNotFoundError), file_storage.read_file(namespace=conversation_id, filename=filename) as f:
         pass
+
+
+def test_write_blob_stores_content_once(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    content_hash, size = file_storage.write_blob(content=io.BytesIO(b"content"))
+    assert size == len(b"content")
+    assert file_storage.write_blob(content=io.BytesIO(b"content")) == (content_hash, size)
+
+    other_hash, _ = file_storage.write_blob(content=io.BytesIO(b"other content"))
+    assert other_hash != content_hash
+
+    assert sorted(file_storage.list_blobs(older_than_seconds=0)) == sorted([content_hash, other_hash])
+    assert list(file_storage.list_blobs(older_than_seconds=60)) == []
+
+    with file_storage.read_blob(content_hash) as f:
+        assert f.read() == b"content"
+
+    file_storage.delete_blob(content_hash)
+    assert not file_storage.blob_exists(content_hash)
+    assert file_storage.blob_exists(other_hash)
+
+
+def test_import_file_as_blob(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    file_storage.write_file(namespace="conversation_id", filename="filename", content=io.BytesIO(b"content"))
+    path = file_storage.path_for(namespace="conversation_id", filename="filename")
+
+    content_hash, size = file_storage.import_file_as_blob(path)
+    assert (content_hash, size) == file_storage.write_blob(content=io.BytesIO(b"content"))
+    assert list(file_storage.list_namespaces()) == ["conversation_id"]
+
+    # the blob remains when the file it was imported from is removed
+    path.unlink()
+    with file_storage.read_blob(content_hash) as f:
+        assert f.read() == b"content"
+
+
+@pytest.mark.parametrize(
+    ("start", "stop", "chunk_size", "expected"),
+    [
+        (0, None, 4, b"hello world"),
+        (6, None, 4, b"world"),
+        (0, 5, 2, b"hello"),
+        (4, 7, 1, b"o w"),
+        (6, 100, 4, b"world"),
+    ],
+)
+async def test_read_chunks(
+    storage_settings: files.StorageSettings, start: int, stop: int | None, chunk_size: int, expected: bytes
+) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+    content_hash, _ = file_storage.write_blob(content=io.BytesIO(b"hello world"))
+
+    chunks = [
+        chunk
+        async for chunk in files.read_chunks(
+            file_storage.blob_path(content_hash), start=start, stop=stop, chunk_size=chunk_size
+        )
+    ]
+    assert b"".join(chunks) == expected
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
@@ -0,0 +1,180 @@
+import io
+import logging
+import os
+import time
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import sqlalchemy
+from semantic_workbench_service import auth, db, files
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import AssistantController
+from sqlmodel import col, func, select
+
+logger = logging.getLogger(__name__)
+
+# set WORKBENCH_PYTEST_BENCHMARK_IMPORT_MESSAGE_COUNT=100000 for the full benchmark
+MESSAGE_COUNT = int(os.environ.get("WORKBENCH_PYTEST_BENCHMARK_IMPORT_MESSAGE_COUNT") or 10_000)
+FILE_COUNT = 10
+
+
+async def _import_conversation(
+    db_settings: DBSettings, storage_settings: files.StorageSettings, message_count: int
+) -> tuple[float, dict[str, int]]:
+    """
+    Exports a conversation and imports it, asserting that the import has the content of the export and returning the
+    duration of the import and its record counts.
+    """
+    user_principal = auth.UserPrincipal(user_id="benchmark-user", name="benchmark user")
+    conversation_id = uuid.uuid4()
+    file_storage = files.Storage(storage_settings)
+
+    content_hashes = [file_storage.write_blob(io.BytesIO(f"file {index}".encode()))[0] for index in range(FILE_COUNT)]
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+
+        async with engine.begin() as connection:
+            await connection.execute(
+                sqlalchemy.insert(db.User), [{"user_id": user_principal.user_id, "name": user_principal.name}]
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.Conversation),
+                [
+                    {
+                        "conversation_id": conversation_id,
+                        "owner_id": user_principal.user_id,
+                        "title": "benchmark",
+                        "metadata": {},
+                    }
+                ],
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.UserParticipant),
+                [
+                    {
+                        "conversation_id": conversation_id,
+                        "user_id": user_principal.user_id,
+                        "name": user_principal.name,
+                        "conversation_permission": "read_write",
+                    }
+                ],
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.ConversationMessage),
+                [
+                    {
+                        "message_id": uuid.uuid4(),
+                        "conversation_id": conversation_id,
+                        "sender_participant_id": user_principal.user_id,
+                        "sender_participant_role": "user",
+                        "message_type": "chat",
+                        "content": f"message {index}",
+                        "content_type": "text/plain",
+                        "metadata": {"index": index},
+                        "filenames": [],
+                    }
+                    for index in range(message_count)
+                ],
+            )
+            file_ids = [uuid.uuid4() for _ in range(FILE_COUNT)]
+            await connection.execute(
+                sqlalchemy.insert(db.File),
+                [
+                    {
+                        "file_id": file_id,
+                        "conversation_id": conversation_id,
+                        "filename": f"{index}.txt",
+                        "current_version": 1,
+                    }
+                    for index, file_id in enumerate(file_ids)
+                ],
+            )
+            await connection.execute(
+                sqlalchemy.insert(db.FileVersion),
+                [
+                    {
+                        "file_id": file_id,
+                        "version": 1,
+                        "participant_id": user_principal.user_id,
+                        "participant_role": "user",
+                        "metadata": {},
+                        "content_type": "text/plain",
+                        "file_size": 0,
+                        "storage_filename": f"{file_id.hex}_1",
+                        "content_hash": content_hash,
+                    }
+                    for file_id, content_hash in zip(file_ids, content_hashes)
+                ],
+            )
+
+        controller = AssistantController(
+            get_session=lambda: db.create_session(engine),
+            notify_event=AsyncMock(),
+            client_pool=Mock(),
+            file_storage=file_storage,
+        )
+
+        export_result = await controller.export_conversations(
+            user_principal=user_principal, conversation_ids={conversation_id}
+        )
+        export = io.BytesIO()
+        async for chunk in export_result.stream:
+            export.write(chunk)
+
+        start = time.perf_counter()
+        export.seek(0)
+        import_result = await controller.import_conversations(from_export=export, user_principal=user_principal)
+        duration = time.perf_counter() - start
+
+        assert len(import_result.conversation_ids) == 1
+        assert import_result.record_counts["ConversationMessage"] == message_count
+        assert import_result.record_counts["FileVersion"] == FILE_COUNT
+        assert import_result.file_count == FILE_COUNT
+
+        new_conversation_id = import_result.conversation_ids[0]
+        async with db.create_session(engine) as session:
+            conversation = (
+                await session.exec(
+                    select(db.Conversation).where(db.Conversation.conversation_id == new_conversation_id)
+                )
+            ).one()
+            assert conversation.title == "benchmark (1)"
+
+            imported_message_count = (
+                await session.exec(
+                    select(func.count())
+                    .select_from(db.ConversationMessage)
+                    .where(db.ConversationMessage.conversation_id == new_conversation_id)
+                )
+            ).one()
+            assert imported_message_count == message_count
+
+            imported_hashes = (
+                await session.exec(
+                    select(db.FileVersion.content_hash)
+                    .join(db.File)
+                    .where(db.File.conversation_id == new_conversation_id)
+                    .order_by(col(db.File.filename))
+                )
+            ).all()
+            assert list(imported_hashes) == content_hashes
+
+    return duration, import_result.record_counts
+
+
+async def test_import_conversations(db_settings: DBSettings, storage_settings: files.StorageSettings) -> None:
+    await _import_conversation(db_settings, storage_settings, message_count=100)
+
+
+@pytest.mark.benchmark
+async def test_import_conversations_benchmark(db_settings: DBSettings, storage_settings: files.StorageSettings) -> None:
+    duration, record_counts = await _import_conversation(db_settings, storage_settings, message_count=MESSAGE_COUNT)
+
+    logger.info(
+        "import benchmark; messages: %d, duration: %.2fs, record counts: %s",
+        MESSAGE_COUNT,
+        duration,
+        record_counts,
+    )
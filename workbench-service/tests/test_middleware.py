@@ -1,6 +1,9 @@
+import asyncio
+import time
 import uuid
 
 import fastapi
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from jose import jwt
@@ -178,3 +181,67 @@ def test_auth_middleware_allows_anonymous_excluded_paths():
         http_response = client.get("/")
 
         assert http_response.status_code == 200
+
+
+def test_auth_middleware_caches_user_principal_until_token_expires(
+    test_user: MockUser, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    decode_count = 0
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        nonlocal decode_count
+        decode_count += 1
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+
+    app = fastapi.FastAPI()
+    app.add_middleware(middleware.AuthMiddleware, api_key_source=mock_api_key_source())
+
+    claims = {"tid": test_user.tenant_id, "oid": test_user.object_id, "name": test_user.name, "appid": test_user.app_id}
+    expiring_token = jwt.encode(claims={**claims, "exp": int(time.time()) + 60}, key="", algorithm=test_user.token_algo)
+
+    with TestClient(app) as client:
+        for _ in range(3):
+            http_response = client.get("/", headers={"Authorization": f"Bearer {expiring_token}"})
+            assert http_response.status_code == 404
+        assert decode_count == 1
+
+        # tokens without an expiration are validated on every request
+        for _ in range(2):
+            http_response = client.get("/", headers=test_user.authorization_headers)
+            assert http_response.status_code == 404
+        assert decode_count == 3
+
+        # cached principals are not used once the settings they were validated by change
+        monkeypatch.setattr(settings.auth, "allowed_app_id", "other-app-id")
+        http_response = client.get("/", headers={"Authorization": f"Bearer {expiring_token}"})
+        assert http_response.status_code == 401
+        assert http_response.json()["detail"].lower() == "invalid app"
+
+
+async def test_json_web_key_set_fetches_once_for_concurrent_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    fetch_count = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal fetch_count
+        fetch_count += 1
+        if fetch_count > 1:
+            return httpx.Response(status_code=500)
+        return httpx.Response(status_code=200, json={"keys": [{"kid": "key"}]})
+
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient", lambda *args, **kwargs: async_client(transport=httpx.MockTransport(handler))
+    )
+
+    key_set = middleware._JsonWebKeySet("https://keys.example.com")
+    # the keys expire as soon as they are fetched
+    results = await asyncio.gather(*[key_set.get(ttl_seconds=0) for _ in range(10)])
+    assert results == [{"keys": [{"kid": "key"}]}] * 10
+    assert fetch_count == 1
+
+    # expired keys are used when they cannot be fetched again
+    assert await key_set.get(ttl_seconds=60) == {"keys": [{"kid": "key"}]}
+    assert fetch_count == 2
@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service.participant_cache import ConversationParticipantCache
+
+
+async def test_participant_cache_hits_and_misses() -> None:
+    cache = ConversationParticipantCache[list[str]](max_size=10, ttl_seconds=60)
+    conversation_id = uuid.uuid4()
+    load_count = 0
+
+    async def load() -> list[str]:
+        nonlocal load_count
+        load_count += 1
+        return [f"assistant-{load_count}"]
+
+    assert await cache.get(conversation_id, load) == ["assistant-1"]
+    assert await cache.get(conversation_id, load) == ["assistant-1"]
+    assert await cache.get(uuid.uuid4(), load) == ["assistant-2"]
+
+    metrics = cache.metrics()
+    assert metrics.size == 2
+    assert metrics.hit_count == 1
+    assert metrics.miss_count == 2
+
+
+async def test_participant_cache_invalidated_by_participant_events() -> None:
+    cache = ConversationParticipantCache[list[str]](max_size=10, ttl_seconds=60)
+    conversation_id = uuid.uuid4()
+    values = iter([["before"], ["after"]])
+
+    async def load() -> list[str]:
+        return next(values)
+
+    assert await cache.get(conversation_id, load) == ["before"]
+
+    cache.invalidate_for_event(
+        ConversationEvent(conversation_id=conversation_id, event=ConversationEventType.message_created)
+    )
+    assert await cache.get(conversation_id, load) == ["before"]
+
+    cache.invalidate_for_event(
+        ConversationEvent(conversation_id=conversation_id, event=ConversationEventType.participant_updated)
+    )
+    assert await cache.get(conversation_id, load) == ["after"]
+    assert cache.metrics().invalidation_count == 1
+
+
+async def test_participant_cache_does_not_cache_value_loaded_during_invalidation() -> None:
+    cache = ConversationParticipantCache[list[str]](max_size=10, ttl_seconds=60)
+    conversation_id = uuid.uuid4()
+    loading = asyncio.Event()
+    invalidated = asyncio.Event()
+
+    async def stale_load() -> list[str]:
+        loading.set()
+        await invalidated.wait()
+        return ["stale"]
+
+    async def fresh_load() -> list[str]:
+        return ["fresh"]
+
+    task = asyncio.create_task(cache.get(conversation_id, stale_load))
+    await loading.wait()
+    cache.invalidate(conversation_id)
+    invalidated.set()
+
+    # the caller that started loading before the change still gets its value, but it is not cached
+    assert await task == ["stale"]
+    assert await cache.get(conversation_id, fresh_load) == ["fresh"]
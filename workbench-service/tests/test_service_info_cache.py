@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from semantic_workbench_api_model.assistant_model import ServiceInfoModel
+from semantic_workbench_service.service_info_cache import ServiceInfoCache
+
+KEY = ("assistant-service", "http://127.0.0.1:3001/")
+
+
+def _service_info(name: str) -> ServiceInfoModel:
+    return ServiceInfoModel(assistant_service_id="assistant-service", name=name, templates=[], metadata={})
+
+
+async def test_service_info_cache_hits_and_coalesces_refreshes() -> None:
+    cache = ServiceInfoCache(ttl_seconds=60, timeout_seconds=1)
+    fetch_count = 0
+    release = asyncio.Event()
+
+    async def fetch() -> ServiceInfoModel:
+        nonlocal fetch_count
+        fetch_count += 1
+        await release.wait()
+        return _service_info(f"info-{fetch_count}")
+
+    pending = [asyncio.create_task(cache.get(KEY, fetch)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    infos = await asyncio.gather(*pending)
+
+    assert {info.name for info in infos if info is not None} == {"info-1"}
+    assert fetch_count == 1
+
+    info = await cache.get(KEY, fetch)
+    assert info is not None
+    assert info.name == "info-1"
+
+    metrics = cache.metrics()
+    assert metrics.size == 1
+    assert metrics.hit_count == 1
+    assert metrics.miss_count == 10
+    assert metrics.refresh_count == 1
+
+
+async def test_service_info_cache_returns_stale_info_on_timeout() -> None:
+    cache = ServiceInfoCache(ttl_seconds=0, timeout_seconds=0.01)
+    release = asyncio.Event()
+    names = iter(["before", "after"])
+
+    async def fetch() -> ServiceInfoModel:
+        name = next(names)
+        if name == "after":
+            await release.wait()
+        return _service_info(name)
+
+    info = await cache.get(KEY, fetch)
+    assert info is not None
+    assert info.name == "before"
+
+    # the service is slow to respond, so the expired info is returned while the refresh continues
+    info = await cache.get(KEY, fetch)
+    assert info is not None
+    assert info.name == "before"
+    assert cache.metrics().stale_count == 1
+
+    release.set()
+    await cache.refresh(KEY, fetch)
+    assert cache.metrics().refresh_count == 2
+
+
+async def test_service_info_cache_without_entry_on_timeout() -> None:
+    cache = ServiceInfoCache(ttl_seconds=60, timeout_seconds=0.01)
+    release = asyncio.Event()
+
+    async def fetch() -> ServiceInfoModel:
+        await release.wait()
+        return _service_info("info")
+
+    assert await cache.get(KEY, fetch) is None
+    assert cache.metrics().timeout_count == 1
+
+    release.set()
+    info = await cache.get(KEY, fetch, wait=True)
+    assert info is not None
+    assert info.name == "info"
+
+
+async def test_service_info_cache_raises_fetch_errors() -> None:
+    cache = ServiceInfoCache(ttl_seconds=60, timeout_seconds=1)
+
+    async def fetch() -> ServiceInfoModel:
+        raise RuntimeError("service error")
+
+    with pytest.raises(RuntimeError):
+        await cache.get(KEY, fetch)
+    assert cache.metrics().size == 0
+
+
+async def test_service_info_cache_invalidate_and_retain() -> None:
+    cache = ServiceInfoCache(ttl_seconds=60, timeout_seconds=1)
+    other_key = ("other-service", "http://127.0.0.1:3002/")
+
+    async def fetch() -> ServiceInfoModel:
+        return _service_info("info")
+
+    await cache.get(KEY, fetch)
+    await cache.get(other_key, fetch)
+    assert not cache.expires_within(KEY, 30)
+    assert cache.expires_within(KEY, 60)
+
+    cache.invalidate("assistant-service")
+    assert cache.expires_within(KEY, 0)
+    assert cache.metrics().size == 1
+
+    cache.retain([KEY])
+    assert cache.metrics().size == 0
+
+
+async def test_service_info_cache_does_not_cache_info_fetched_during_invalidation() -> None:
+    cache = ServiceInfoCache(ttl_seconds=60, timeout_seconds=1)
+    release = asyncio.Event()
+
+    async def fetch() -> ServiceInfoModel:
+        await release.wait()
+        return _service_info("stale")
+
+    refresh = cache.refresh(KEY, fetch)
+    await asyncio.sleep(0)
+    cache.invalidate("assistant-service")
+    release.set()
+    await refresh
+
+    assert cache.metrics().size == 0
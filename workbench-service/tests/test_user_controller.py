@@ -0,0 +1,47 @@
+import uuid
+
+import sqlalchemy
+from semantic_workbench_api_model import workbench_model
+from semantic_workbench_service import auth, db
+from semantic_workbench_service.config import DBSettings
+from semantic_workbench_service.controller import UserController, user
+from sqlmodel import select
+
+
+async def test_add_or_update_user_from_skips_unchanged_users(db_settings: DBSettings) -> None:
+    user_id = uuid.uuid4().hex
+    statements: list[str] = []
+
+    async with db.create_engine(db_settings) as engine:
+        await db.bootstrap_db(engine, settings=db_settings)
+
+        sqlalchemy.event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda _conn, _cursor, statement, *args: statements.append(statement),
+        )
+
+        async def add_or_update(principal: auth.UserPrincipal) -> int:
+            statements.clear()
+            async with db.create_session(engine) as session:
+                await user.add_or_update_user_from(session=session, user_principal=principal)
+            return len([statement for statement in statements if "user" in statement.lower()])
+
+        assert await add_or_update(auth.UserPrincipal(user_id=user_id, name="name")) > 0
+        # unchanged users are not written again
+        assert await add_or_update(auth.UserPrincipal(user_id=user_id, name="name")) == 0
+        assert await add_or_update(auth.UserPrincipal(user_id=user_id, name="new name")) > 0
+        assert await add_or_update(auth.UserPrincipal(user_id=user_id, name="new name")) == 0
+
+        # users updated through the controller are written again, with the name of the principal
+        controller = UserController(get_session=lambda: db.create_session(engine))
+        await controller.update_user(
+            user_principal=auth.UserPrincipal(user_id=user_id, name="new name"),
+            user_id=user_id,
+            update_user=workbench_model.UpdateUser(name="updated name"),
+        )
+        assert await add_or_update(auth.UserPrincipal(user_id=user_id, name="new name")) > 0
+
+        async with db.create_session(engine) as session:
+            user_record = (await session.exec(select(db.User).where(db.User.user_id == user_id))).one()
+            assert user_record.name == "new name"
@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import functools
 import io
 import json
 import logging
@@ -18,6 +19,7 @@ from fastapi.testclient import TestClient
 from pydantic import HttpUrl
 from pytest_httpx import HTTPXMock
 from semantic_workbench_api_model import workbench_model, workbench_service_client
+from semantic_workbench_service import auth, controller, db, files
 
 from .types import MockUser
 
@@ -153,19 +155,6 @@ def test_create_conversation(workbench_service: FastAPI, test_user: MockUser):
         assert exclude_system_keys(get_conversation_response.metadata) == new_conversation.metadata
 
 
-class AsyncContextManagerMock:
-    def __init__(self, mock: Mock) -> None:
-        self.mock = mock
-
-    async def __aenter__(self):
-        """Enter async context manager."""
-        return self.mock
-
-    async def __aexit__(self, exc_type, exc, tb):
-        """Exit async context manager."""
-        pass
-
-
 def test_create_conversation_and_retitle(
     workbench_service: FastAPI, test_user: MockUser, monkeypatch: pytest.MonkeyPatch
 ):
@@ -181,13 +170,16 @@ def test_create_conversation_and_retitle(
     mock_client.beta.chat.completions.parse = AsyncMock()
     mock_client.beta.chat.completions.parse.return_value = mock_parsed_completion
 
+    mock_client.close = AsyncMock()
+
     mock_create_client = Mock(spec=openai_client.create_client)
-    mock_create_client.return_value = AsyncContextManagerMock(mock_client)
+    mock_create_client.return_value = mock_client
 
     monkeypatch.setattr(openai_client, "create_client", mock_create_client)
 
     monkeypatch.setattr(semantic_workbench_service.settings.service, "azure_openai_endpoint", "https://something/")
     monkeypatch.setattr(semantic_workbench_service.settings.service, "azure_openai_deployment", "something")
+    monkeypatch.setattr(semantic_workbench_service.settings.service, "conversation_retitle_delay_seconds", 0)
 
     with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
         new_conversation = workbench_model.NewConversation(metadata={"test": "value"})
@@ -221,6 +213,10 @@ def test_create_conversation_and_retitle(
         get_conversation_response = workbench_model.Conversation.model_validate(http_response.json())
         assert get_conversation_response.title == "A sweet title"
 
+    # the client is shared by retitles, and closed with the service
+    assert mock_create_client.call_count == 1
+    mock_client.close.assert_awaited_once()
+
 
 def test_create_update_conversation(workbench_service: FastAPI, test_user: MockUser):
     with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
@@ -855,6 +851,50 @@ def test_create_conversation_send_user_message(workbench_service: FastAPI, test_
         message = messages.messages[1]
         assert message.id == message_log_id
 
+        # page backwards with cursors
+        http_response = client.get(f"/conversations/{conversation_id}/messages", params={"limit": 2})
+        assert httpx.codes.is_success(http_response.status_code)
+        messages = workbench_model.ConversationMessageList.model_validate(http_response.json())
+        assert [m.id for m in messages.messages] == [message_two_id, message_log_id]
+        assert messages.first_cursor is not None
+
+        http_response = client.get(
+            f"/conversations/{conversation_id}/messages", params={"before_cursor": messages.first_cursor}
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+        messages = workbench_model.ConversationMessageList.model_validate(http_response.json())
+        assert [m.id for m in messages.messages] == [message_id]
+
+        # page forwards with cursors
+        assert messages.last_cursor is not None
+        http_response = client.get(
+            f"/conversations/{conversation_id}/messages", params={"after_cursor": messages.last_cursor}
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+        messages = workbench_model.ConversationMessageList.model_validate(http_response.json())
+        assert [m.id for m in messages.messages] == [message_two_id, message_log_id]
+
+        http_response = client.get(f"/conversations/{conversation_id}/messages", params={"after_cursor": "invalid"})
+        assert http_response.status_code == httpx.codes.BAD_REQUEST
+
+        # stream messages as ndjson
+        def stream_message_ids(params: dict) -> list[uuid.UUID]:
+            http_response = client.get(f"/conversations/{conversation_id}/messages-stream", params=params)
+            assert httpx.codes.is_success(http_response.status_code)
+            assert http_response.headers["content-type"] == "application/x-ndjson"
+            return [
+                workbench_model.ConversationMessage.model_validate_json(line).id
+                for line in http_response.text.splitlines()
+            ]
+
+        assert stream_message_ids({}) == [message_id, message_two_id, message_log_id]
+        assert stream_message_ids({"after": str(message_id)}) == [message_two_id, message_log_id]
+        assert stream_message_ids({"after_cursor": messages.first_cursor}) == [message_log_id]
+        assert stream_message_ids({"message_type": "chat"}) == [message_id, message_two_id]
+
+        http_response = client.get(f"/conversations/{uuid.uuid4()}/messages-stream")
+        assert http_response.status_code == httpx.codes.NOT_FOUND
+
         # get messages by type
         http_response = client.get(f"/conversations/{conversation_id}/messages", params={"message_type": "chat"})
         assert httpx.codes.is_success(http_response.status_code)
@@ -1076,6 +1116,223 @@ def test_create_conversation_write_read_delete_file(
         assert http_response.status_code == httpx.codes.NOT_FOUND
 
 
+@pytest.mark.parametrize(
+    ("range_header", "expected_status", "expected_content", "expected_content_range"),
+    [
+        ("bytes=0-4", httpx.codes.PARTIAL_CONTENT, "hello", "bytes 0-4/12"),
+        ("bytes=6-", httpx.codes.PARTIAL_CONTENT, "world\n", "bytes 6-11/12"),
+        ("bytes=-6", httpx.codes.PARTIAL_CONTENT, "world\n", "bytes 6-11/12"),
+        ("bytes=6-100", httpx.codes.PARTIAL_CONTENT, "world\n", "bytes 6-11/12"),
+        ("bytes=12-", httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE, None, "bytes */12"),
+        ("bytes=0-1,4-5", httpx.codes.OK, "hello world\n", None),
+        ("lines=0-1", httpx.codes.OK, "hello world\n", None),
+    ],
+)
+def test_download_file_range(
+    workbench_service: FastAPI,
+    test_user: MockUser,
+    range_header: str,
+    expected_status: int,
+    expected_content: str | None,
+    expected_content_range: str | None,
+) -> None:
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation_id = http_response.json()["id"]
+
+        payload = [("files", ("test.txt", "hello world\n", "text/plain"))]
+        http_response = client.put(f"/conversations/{conversation_id}/files", files=payload)
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}/files/test.txt", headers={"Range": range_header})
+        assert http_response.status_code == expected_status
+        assert http_response.headers.get("content-range") == expected_content_range
+        if expected_content is not None:
+            assert http_response.text == expected_content
+
+
+def test_download_file_etag(
+    workbench_service: FastAPI,
+    test_user: MockUser,
+) -> None:
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation_id = http_response.json()["id"]
+
+        payload = [("files", ("test.txt", "hello world\n", "text/plain"))]
+        http_response = client.put(f"/conversations/{conversation_id}/files", files=payload)
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}/files/test.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.headers["content-length"] == "12"
+        assert http_response.headers["accept-ranges"] == "bytes"
+        etag = http_response.headers["etag"]
+
+        # unchanged content is not sent again
+        http_response = client.get(f"/conversations/{conversation_id}/files/test.txt", headers={"If-None-Match": etag})
+        assert http_response.status_code == httpx.codes.NOT_MODIFIED
+        assert http_response.content == b""
+
+        # a range is not returned for a stale If-Range validator
+        http_response = client.get(
+            f"/conversations/{conversation_id}/files/test.txt",
+            headers={"Range": "bytes=0-4", "If-Range": '"stale"'},
+        )
+        assert http_response.status_code == httpx.codes.OK
+        assert http_response.text == "hello world\n"
+
+        # a new version has a new etag
+        payload = [("files", ("test.txt", "hello again\n", "text/plain"))]
+        http_response = client.put(f"/conversations/{conversation_id}/files", files=payload)
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}/files/test.txt", headers={"If-None-Match": etag})
+        assert http_response.status_code == httpx.codes.OK
+        assert http_response.text == "hello again\n"
+        assert http_response.headers["etag"] != etag
+
+        # prior versions keep their etag
+        http_response = client.get(
+            f"/conversations/{conversation_id}/files/test.txt", params={"version": 1}, headers={"If-None-Match": etag}
+        )
+        assert http_response.status_code == httpx.codes.NOT_MODIFIED
+
+
+def test_files_share_blobs_and_are_garbage_collected(
+    workbench_service: FastAPI,
+    test_user: MockUser,
+    storage_settings: files.StorageSettings,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    file_storage = files.Storage(storage_settings)
+    file_controller = controller.FileController(
+        get_session=lambda: db.create_session(workbench_service.state.db_engine),
+        notify_event=AsyncMock(),
+        file_storage=file_storage,
+        file_storage_settings=storage_settings,
+    )
+    assistant_controller = controller.AssistantController(
+        get_session=lambda: db.create_session(workbench_service.state.db_engine),
+        notify_event=AsyncMock(),
+        client_pool=Mock(),
+        file_storage=file_storage,
+    )
+
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        conversation_ids = []
+        for title in ("test-conversation-1", "test-conversation-2"):
+            http_response = client.post("/conversations", json={"title": title})
+            assert httpx.codes.is_success(http_response.status_code)
+            conversation_ids.append(http_response.json()["id"])
+
+            payload = [
+                ("files", ("test.txt", "hello world\n", "text/plain")),
+                ("files", ("copy.txt", "hello world\n", "text/plain")),
+            ]
+            http_response = client.put(f"/conversations/{conversation_ids[-1]}/files", files=payload)
+            assert httpx.codes.is_success(http_response.status_code)
+
+        duplicate_result = client.portal.call(
+            functools.partial(
+                assistant_controller.duplicate_conversation,
+                principal=auth.UserPrincipal(user_id=test_user.id, name=test_user.name),
+                conversation_id=uuid.UUID(conversation_ids[0]),
+                new_conversation=workbench_model.NewConversation(title="duplicate"),
+            )
+        )
+        duplicate_id = duplicate_result.conversation_ids[0]
+
+        http_response = client.get(f"/conversations/{duplicate_id}/files/copy.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.text == "hello world\n"
+
+        # identical content is stored once, and is not copied for the duplicate conversation
+        assert len(list(file_storage.list_blobs(older_than_seconds=0))) == 1
+        assert list(file_storage.list_namespaces()) == []
+
+        http_response = client.put(
+            f"/conversations/{conversation_ids[0]}/files",
+            files=[("files", ("test.txt", "hello again\n", "text/plain"))],
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+        http_response = client.delete(f"/conversations/{conversation_ids[0]}/files/test.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+
+        # blobs within the grace period are retained
+        monkeypatch.setattr(storage_settings, "blob_gc_grace_period_seconds", 60)
+        result = client.portal.call(file_controller.collect_garbage)
+        assert result.deleted_blob_count == 0
+        assert len(list(file_storage.list_blobs(older_than_seconds=0))) == 2
+
+        monkeypatch.setattr(storage_settings, "blob_gc_grace_period_seconds", 0)
+        result = client.portal.call(file_controller.collect_garbage)
+        assert result.deleted_blob_count == 1
+        assert len(list(file_storage.list_blobs(older_than_seconds=0))) == 1
+
+        for conversation_id in (*conversation_ids, duplicate_id):
+            http_response = client.get(f"/conversations/{conversation_id}/files/copy.txt")
+            assert httpx.codes.is_success(http_response.status_code)
+            assert http_response.text == "hello world\n"
+
+
+def test_garbage_collection_retains_blobs_referenced_during_collection(
+    workbench_service: FastAPI,
+    test_user: MockUser,
+    storage_settings: files.StorageSettings,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    file_storage = files.Storage(storage_settings)
+    file_controller = controller.FileController(
+        get_session=lambda: db.create_session(workbench_service.state.db_engine),
+        notify_event=AsyncMock(),
+        file_storage=file_storage,
+        file_storage_settings=storage_settings,
+    )
+    monkeypatch.setattr(storage_settings, "blob_gc_grace_period_seconds", 0)
+
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation_id = http_response.json()["id"]
+
+        payload = [("files", ("test.txt", "hello world\n", "text/plain"))]
+        http_response = client.put(f"/conversations/{conversation_id}/files", files=payload)
+        assert httpx.codes.is_success(http_response.status_code)
+        http_response = client.delete(f"/conversations/{conversation_id}/files/test.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+
+        # an upload of the same content, deduplicated onto the unreferenced blob, after its references are read
+        referenced_hashes = file_controller._referenced_hashes
+        upload_count = 0
+
+        async def referenced_hashes_then_upload(content_hashes: list[str]) -> set[str]:
+            nonlocal upload_count
+            result = await referenced_hashes(content_hashes)
+            if upload_count == 0:
+                upload_count += 1
+                payload = [("files", ("again.txt", "hello world\n", "text/plain"))]
+                http_response = await asyncio.to_thread(
+                    client.put, f"/conversations/{conversation_id}/files", files=payload
+                )
+                assert httpx.codes.is_success(http_response.status_code)
+            return result
+
+        monkeypatch.setattr(file_controller, "_referenced_hashes", referenced_hashes_then_upload)
+
+        result = client.portal.call(file_controller.collect_garbage)
+        assert upload_count == 1
+        assert result.deleted_blob_count == 0
+
+        http_response = client.get(f"/conversations/{conversation_id}/files/again.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.text == "hello world\n"
+        assert len(list(file_storage.list_blobs(older_than_seconds=0))) == 1
+        assert list(file_storage.list_tombstones()) == []
+
+
 @pytest.mark.httpx_mock(can_send_already_matched_responses=True)
 def test_create_assistant_export_import_data(
     workbench_service: FastAPI,
@@ -1152,8 +1409,8 @@ def test_create_assistant_export_import_data(
         assert httpx.codes.is_success(http_response.status_code)
 
         assert http_response.headers["content-type"] == "application/zip"
-        assert "content-length" in http_response.headers
-        assert int(http_response.headers["content-length"]) > 0
+        assert http_response.headers["content-disposition"].startswith("attachment; filename=")
+        assert len(http_response.content) > 0
 
         logging.info("response: %s", http_response.content)
 
@@ -1280,8 +1537,8 @@ def test_create_assistant_conversations_export_import_conversations(
         assert httpx.codes.is_success(http_response.status_code)
 
         assert http_response.headers["content-type"] == "application/zip"
-        assert "content-length" in http_response.headers
-        assert int(http_response.headers["content-length"]) > 0
+        assert http_response.headers["content-disposition"].startswith("attachment; filename=")
+        assert len(http_response.content) > 0
 
         logging.info("response: %s", http_response.content)
 
@@ -1577,6 +1834,66 @@ def test_conversation_not_visible_to_non_participants(
         assert http_response.status_code == httpx.codes.NOT_FOUND
 
 
+async def _first_server_sent_event(app: FastAPI, path: str, headers: dict[str, str]) -> str:
+    """
+    Requests the SSE stream at the path, returning the first event, after which the client disconnects.
+    """
+    body = b""
+    request_sent = False
+    event_received = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await event_received.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal body
+        if message["type"] == "http.response.body":
+            body += message.get("body", b"").replace(b"\r\n", b"\n")
+            if b"\n\n" in body:
+                event_received.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=10)
+    return body.decode().split("\n\n")[0]
+
+
+def test_server_sent_events_history_unavailable(workbench_service: FastAPI, test_user: MockUser) -> None:
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        new_conversation = workbench_model.NewConversation(title="test-conversation")
+        http_response = client.post("/conversations", json=new_conversation.model_dump(mode="json"))
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation = workbench_model.Conversation.model_validate(http_response.json())
+
+        # clients reconnecting with an event id that is not in the history are told to refetch
+        for path in (f"/conversations/{conversation.id}/events", "/events"):
+            event = client.portal.call(
+                _first_server_sent_event,
+                workbench_service,
+                path,
+                {**test_user.authorization_headers, "Last-Event-ID": "unknown-event-id"},
+            )
+            assert "event: history.unavailable" in event.splitlines()
+            assert 'data: {"last_event_id": "unknown-event-id"}' in event.splitlines()
+
+
 def test_create_assistant_service_registration(workbench_service: FastAPI, test_user: MockUser) -> None:
     with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
         new_assistant_service = workbench_model.NewAssistantServiceRegistration(